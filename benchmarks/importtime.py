@@ -0,0 +1,53 @@
+"""
+@Title   : import-time benchmark of the pystoned package
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+# python benchmarks/importtime.py [limit in seconds]
+# fails (exit status 1) if `import pystoned` loads a heavy dependency or takes longer than the limit
+
+import os
+import subprocess
+import sys
+
+HEAVY = ['pyomo', 'scipy', 'sklearn', 'matplotlib', 'mpl_toolkits', 'pandas']
+
+CODE = """
+import sys, time
+start = time.perf_counter()
+import pystoned
+print(time.perf_counter() - start)
+print(" ".join(sorted(set(m.split(".")[0] for m in sys.modules))))
+"""
+
+
+def measure(repeat=5):
+    # best of repeat fresh interpreters
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root + os.pathsep + os.environ.get("PYTHONPATH", ""))
+
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", CODE], env=env, capture_output=True, text=True, check=True)
+        seconds, modules = out.stdout.splitlines()[-2:]
+        seconds = float(seconds)
+        if best is None or seconds < best:
+            best = seconds
+
+    return best, modules.split()
+
+
+if __name__ == '__main__':
+    limit = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+
+    seconds, modules = measure()
+    loaded = [m for m in HEAVY if m in modules]
+
+    print("import pystoned: %.1f ms" % (1000 * seconds))
+    if loaded:
+        print("heavy dependencies loaded at import: %s" % ", ".join(loaded))
+    if loaded or seconds > limit:
+        sys.exit(1)
@@ -0,0 +1,166 @@
+"""
+@Title   : measure the bytes per constraint, nonzero and variable of the memory planner
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+# python benchmarks/planner.py [largest number of rows and of variables of the solves]
+# builds CNLS (m = 1, 3), CNLSDDF and DEA models of several sizes, one fresh process per model:
+#   build  = peak of the python allocations (tracemalloc) while the pyomo model is built
+#   solver = increase of the peak resident memory of a second fresh process (without pyomo) while
+#            HiGHS reads and solves the model written as an LP file
+# fits the bytes per constraint, nonzero and variable (nonnegative least squares on the size()
+# counts of the models) and prints them next to planner.BUILD and planner.SOLVER, with the
+# predicted/measured ratio of each model. planner.SOLVER leaves out the fixed memory of HiGHS
+# (about 4 MB) and the models on which its QP solver runs out of the pattern (cnls m = 1, n = 6400).
+
+import os
+import sys
+import tempfile
+import multiprocessing
+import numpy as np
+from scipy.optimize import nnls
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pystoned import planner, CNLS, CNLSDDF, DEA
+
+KEYS = ('constraint', 'nonzero', 'variable')
+
+# (estimator, number of inputs, numbers of DMUs)
+MODELS = [
+    ("cnls", 1, [100, 400, 1600, 6400]),
+    ("cnls", 3, [20, 40, 100, 200]),
+    ("cnlsddf", 2, [20, 40, 100, 200]),
+    ("dea", 2, [20, 40, 100, 200]),
+]
+
+
+def build(estimator, n, m):
+    # the model of the estimator on random data
+
+    rng = np.random.default_rng(0)
+    x = rng.uniform(1, 10, (n, m))
+    y = np.sum(x, axis=1) ** 0.5 * rng.uniform(0.7, 1.0, n)
+    if m == 1:
+        x = x[:, 0]
+
+    if estimator == "cnls":
+        return CNLS.cnls(y, x, "addi", "prod", "vrs")
+    if estimator == "cnlsddf":
+        return CNLSDDF.cnlsddf(y, x, "prod", [1.0] * m, [1.0])
+    return DEA.dea(y, x, "io", "vrs")
+
+
+def _build(queue, estimator, n, m, path):
+    # bytes of the build; the model is written to path for the solve (path = None: no solve)
+
+    import tracemalloc
+
+    tracemalloc.start()
+    model = build(estimator, n, m)
+    used = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    if path is not None:
+        model.write(path, io_options={'symbolic_solver_labels': False})
+
+    return used
+
+
+def _solve(queue, estimator, n, m, path):
+    # bytes of the solve: growth of the peak resident memory from the loaded solver to the solution
+
+    import resource
+    import highspy
+
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", False)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    h.readModel(path)
+    h.run()
+
+    # ru_maxrss is in kilobytes on Linux
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) * 1024
+
+
+def _measure(queue, task, *args):
+
+    try:
+        queue.put(("ok", task(queue, *args)))
+    except Exception as err:
+        queue.put(("error", err))
+
+
+def _fresh(task, *args):
+    # task(*args) in a fresh process
+
+    queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_measure, args=(queue, task) + args)
+    proc.start()
+    status, result = queue.get()
+    proc.join()
+
+    if status == "error":
+        raise result
+
+    return result
+
+
+def measure(estimator, n, m, solve):
+    # bytes of the build and of the solve (None if not solved)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.lp") if solve else None
+        used = _fresh(_build, estimator, n, m, path)
+        grown = _fresh(_solve, estimator, n, m, path) if solve else None
+
+    return used, grown
+
+
+def fitted(counts, used):
+    # bytes per constraint, nonzero and variable
+
+    coef, _ = nnls(np.asarray(counts, dtype=float), np.asarray(used, dtype=float))
+
+    return dict(zip(KEYS, coef))
+
+
+def main(argv):
+
+    largest = int(argv[1]) if len(argv) > 1 else None
+
+    counts, builds, solves, solved = [], [], [], []
+    for estimator, m, sizes in MODELS:
+        for n in sizes:
+            sz = planner.size(estimator, n, m)
+            small = largest is None or max(sz['constraints'], sz['variables']) <= largest
+            used, grown = measure(estimator, n, m, small)
+            row = [sz[key + 's'] for key in KEYS]
+            counts.append(row)
+            builds.append(used)
+            if grown is not None:
+                solved.append(row)
+                solves.append(grown)
+            print("%-8s n=%-5d m=%d  rows=%-8d nonzeros=%-9d build=%6.1f MB solve=%s" % (
+                estimator, n, m, sz['constraints'], sz['nonzeros'], used / 1e6,
+                "-" if grown is None else "%.1f MB" % (grown / 1e6)))
+
+    for name, rows, used, current in (("BUILD", counts, builds, planner.BUILD),
+                                      ("SOLVER", solved, solves, planner.SOLVER)):
+        if len(used) < len(KEYS):
+            continue
+        coef = fitted(rows, used)
+        pred = np.asarray(rows, dtype=float) @ np.array([current[key] for key in KEYS])
+        ratio = pred / np.maximum(np.asarray(used, dtype=float), 1.0)
+        print("%s measured: %s" % (name, ", ".join("%s %.0f" % (key, coef[key]) for key in KEYS)))
+        print("%s planner : %s" % (name, ", ".join("%s %d" % (key, current[key]) for key in KEYS)))
+        print("%s planner/measured per model: %s" % (name, " ".join("%.2f" % r for r in ratio)))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,58 @@
+"""
+@Title   : solver iterations of CNLS with and without data scaling
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+# python benchmarks/scaling.py [solver] [number of DMUs]
+# cost frontier of TOTEX on Energy, Length and Customers (Data/energy.txt), solved on the raw data and
+# with solver.fit(..., scale=True); prints the iterations of both solves and the largest difference
+# of the estimates
+
+import os
+import sys
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pystoned import CNLS, solver as slv
+
+
+def energy(n=None):
+    # TOTEX and the inputs Energy, Length, Customers; the columns are separated by tabs
+
+    rows = []
+    with open(os.path.join(ROOT, "Data", "energy.txt")) as f:
+        next(f)
+        for line in f:
+            rows.append([float(v) for v in line.split()])
+    data = np.array(rows)[:n]
+
+    return data[:, 3], data[:, 4:7]
+
+
+def main(argv):
+
+    solver = argv[1] if len(argv) > 1 else "mosek"
+    n = int(argv[2]) if len(argv) > 2 else None
+
+    y, x = energy(n)
+
+    results = {}
+    for scale in (False, True):
+        trace = {}
+        est = slv.fit(CNLS.cnls, y, x, "addi", "cost", "vrs", solver=solver, callback=trace.update, scale=scale)
+        results[scale] = est
+        print("scale=%-5s iterations=%s objective=%.6g" % (scale, trace.get('iterations'), est['objective']))
+
+    raw, scaled = results[False], results[True]
+    diff = np.max(np.abs(raw['e'] - scaled['e'])) / np.max(np.abs(y))
+    print("largest difference of the residuals (relative to max y): %.2e" % diff)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -7,6 +7,7 @@
 
 # Import of the pyomo module
 from pyomo.environ import *
+from . import afriat
 
 
 def ccnls(y, x):
@@ -51,12 +52,7 @@ def ccnls(y, x):
 
         model.reg = Constraint(model.i, rule=reg_rule, doc='regression equation')
 
-        def concav_rule(model, i, h):
-            if i == h:
-               return Constraint.Skip
-            return model.a[i] + model.b[i] * x[i] <= model.a[h] + model.b[h] * x[i]
-
-        model.concav = Constraint(model.i, model.h, rule=concav_rule, doc='concavity constraint')
+        afriat.sorted1d(model, x, "prod", "vrs", 'concav')
 
     if m > 1:
 
@@ -7,15 +7,24 @@
 
 # Import of the pyomo module
 from pyomo.environ import *
+from . import afriat, dupx
+import numpy as np
 
 
-def cnls(y, x, cet, fun, rts):
+def cnls(y, x, cet, fun, rts, dup=False):
     # cet     = "addi" : Additive composite error term
     #         = "mult" : Multiplicative composite error term
     # fun     = "prod" : production frontier
     #         = "cost" : cost frontier
     # rts     = "vrs"  : variable returns to scale
     #         = "crs"  : constant returns to scale
+    # dup     = True   : DMUs with identical inputs share one hyperplane; the model has one residual
+    #                    per distinct input vector, weighted by the number of DMUs
+    #                    (solver.values() returns the estimates per DMU)
+
+    if dup:
+        yg, xu, grp, w, dev = dupx.collapse(y, x, cet)
+        return dupx.weigh(cnls(yg, xu, cet, fun, rts), grp, w, dev)
 
     # transform data
     x = x.tolist()
@@ -41,6 +50,9 @@ def cnls(y, x, cet, fun, rts):
         # Alias
         model.h = SetOf(model.i)
 
+        # Parameters (mutable: the data can be changed between solves, see solver.resolve)
+        model.y = Param(model.i, initialize=dict(enumerate(y)), mutable=True, doc='output')
+
         # Variables
         model.a = Var(model.i, doc='alpha')
         model.b = Var(model.i, bounds=(0.0, None), doc='beta')
@@ -60,29 +72,19 @@ def cnls(y, x, cet, fun, rts):
 
                 # Constraints
                 def reg_rule(model, i):
-                    return y[i] == model.a[i] + model.b[i] * x[i] + model.e[i]
+                    return model.y[i] == model.a[i] + model.b[i] * x[i] + model.e[i]
 
                 model.reg = Constraint(model.i, rule=reg_rule, doc='regression equation')
 
                 # production model
                 if fun == "prod":
 
-                    def concav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] <= model.a[h] + model.b[h] * x[i]
-
-                    model.concav = Constraint(model.i, model.h, rule=concav_rule, doc='concavity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'concav')
 
                 # cost model
                 if fun == "cost":
 
-                    def convex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] >= model.a[h] + model.b[h] * x[i]
-
-                    model.convex = Constraint(model.i, model.h, rule=convex_rule, doc='convexity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'convex')
 
         # Multiplicative composite error term
         if cet == "mult":
@@ -97,7 +99,7 @@ def cnls(y, x, cet, fun, rts):
 
                 # Constraints
                 def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + model.e[i]
+                    return log(model.y[i]) == log(model.f[i] + 1) + model.e[i]
 
                 model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
 
@@ -108,28 +110,18 @@ def cnls(y, x, cet, fun, rts):
 
                 # production model
                 if fun == "prod":
-                    def qconcav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] <= model.a[h] + model.b[h] * x[i]
-
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'qconcav')
 
                 # cost model
                 if fun == "cost":
 
-                    def qconvex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] >= model.a[h] + model.b[h] * x[i]
-
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'qconvex')
 
             if rts == "crs":
 
                 # Constraints
                 def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + model.e[i]
+                    return log(model.y[i]) == log(model.f[i] + 1) + model.e[i]
 
                 model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
 
@@ -140,22 +132,12 @@ def cnls(y, x, cet, fun, rts):
 
                 # production model
                 if fun == "prod":
-                    def qconcav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.b[i] * x[i] <= model.b[h] * x[i]
-
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'qconcav')
 
                 # cost model
                 if fun == "cost":
 
-                    def qconvex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.b[i] * x[i] >= model.b[h] * x[i]
-
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'qconvex')
 
     if m > 1:
 
@@ -166,6 +148,9 @@ def cnls(y, x, cet, fun, rts):
         # Alias
         model.h = SetOf(model.i)
 
+        # Parameters (mutable: the data can be changed between solves, see solver.resolve)
+        model.y = Param(model.i, initialize=dict(enumerate(y)), mutable=True, doc='output')
+
         # Variables
         model.a = Var(model.i, doc='alpha')
         model.b = Var(model.i, model.j, bounds=(0.0, None), doc='beta')
@@ -186,7 +171,7 @@ def cnls(y, x, cet, fun, rts):
                 # Constraints
                 def reg_rule(model, i):
                     arow = x[i]
-                    return y[i] == model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) + model.e[i]
+                    return model.y[i] == model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) + model.e[i]
 
                 model.reg = Constraint(model.i, rule=reg_rule, doc='regression equation')
 
@@ -227,7 +212,7 @@ def cnls(y, x, cet, fun, rts):
 
                 # Constraints
                 def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + model.e[i]
+                    return log(model.y[i]) == log(model.f[i] + 1) + model.e[i]
 
                 model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
 
@@ -264,7 +249,7 @@ def cnls(y, x, cet, fun, rts):
 
                 # Constraints
                 def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + model.e[i]
+                    return log(model.y[i]) == log(model.f[i] + 1) + model.e[i]
 
                 model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
 
@@ -298,3 +283,125 @@ def cnls(y, x, cet, fun, rts):
                     model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
 
     return model
+
+
+def cnlsadd(model, y, x, ynew, xnew, cet, fun, rts):
+    # model   = (solved) model returned by cnls(y, x, cet, fun, rts)
+    # ynew    = outputs of the appended DMUs
+    # xnew    = inputs of the appended DMUs
+    # only the variables and constraints that involve the appended DMUs are added;
+    # the previous solution is kept as the starting point of the next solve
+
+    if cet not in ("addi", "mult"):
+        raise ValueError("cet must be \"addi\" or \"mult\", got %r" % (cet,))
+    if fun not in ("prod", "cost"):
+        raise ValueError("fun must be \"prod\" or \"cost\", got %r" % (fun,))
+    if rts not in ("vrs", "crs"):
+        raise ValueError("rts must be \"vrs\" or \"crs\", got %r" % (rts,))
+
+    # cnls() builds the additive model only under vrs
+    if cet == "addi" and rts == "crs":
+        raise ValueError("cnlsadd: cnls() has no additive model with rts=\"crs\" to extend")
+
+    # number of DMUs before the update
+    n0 = len(y)
+
+    # transform data
+    x = np.concatenate([np.asarray(x, dtype=float).reshape(n0, -1),
+                        np.asarray(xnew, dtype=float).reshape(len(ynew), -1)])
+    y = np.concatenate([np.asarray(y, dtype=float).reshape(-1), np.asarray(ynew, dtype=float).reshape(-1)])
+
+    # number of DMUs after the update
+    n = len(y)
+
+    # number of inputs
+    m = x.shape[1]
+
+    # hyperplane of DMU h evaluated at the inputs of DMU i
+    xrow = x[:, 0].tolist() if m == 1 else x.tolist()
+
+    def hyper(i, h):
+        if m == 1:
+            bx = model.b[h] * xrow[i]
+        else:
+            bx = sum(model.b[h, j] * xrow[i][j] for j in model.j)
+        if rts == "crs":
+            return bx
+        return model.a[h] + bx
+
+    # warm start: the appended DMUs take the hyperplane of the current frontier at their inputs
+    alpha = np.array([model.a[h].value for h in range(n0)], dtype=float)
+    if m == 1:
+        beta = np.array([[model.b[h].value] for h in range(n0)], dtype=float)
+    else:
+        beta = np.array([[model.b[h, j].value for j in range(m)] for h in range(n0)], dtype=float)
+    if rts == "crs":
+        alpha = np.zeros(n0)
+
+    warm = not (np.isnan(alpha).any() or np.isnan(beta).any())
+    if warm:
+        fit = alpha[None, :] + x[n0:] @ beta.T
+        if fun == "prod":
+            h0 = np.argmin(fit, axis=1)
+        if fun == "cost":
+            h0 = np.argmax(fit, axis=1)
+        start = fit[np.arange(n - n0), h0]
+
+    for i in range(n0, n):
+        model.i.add(i)
+        model.y[i] = y[i]
+
+        if warm:
+            model.a[i].value = alpha[h0[i - n0]]
+            if m == 1:
+                model.b[i].value = beta[h0[i - n0], 0]
+            else:
+                for j in range(m):
+                    model.b[i, j].value = beta[h0[i - n0], j]
+            if cet == "addi":
+                model.e[i].value = y[i] - start[i - n0]
+            if cet == "mult" and start[i - n0] > 0:
+                model.f[i].value = start[i - n0] - 1
+                model.e[i].value = np.log(y[i]) - np.log(start[i - n0])
+
+    # Objective function
+    model.objective.set_value(sum(model.e[i] * model.e[i] for i in model.i))
+
+    # Additive composite error term
+    if cet == "addi":
+
+        for i in range(n0, n):
+            model.reg.add(i, model.y[i] == hyper(i, i) + model.e[i])
+
+        if fun == "prod":
+            shape = model.concav
+        if fun == "cost":
+            shape = model.convex
+
+    # Multiplicative composite error term
+    if cet == "mult":
+
+        for i in range(n0, n):
+            model.qreg.add(i, log(model.y[i]) == log(model.f[i] + 1) + model.e[i])
+            model.qlog.add(i, model.f[i] == hyper(i, i) - 1)
+
+        if fun == "prod":
+            shape = model.qconcav
+        if fun == "cost":
+            shape = model.qconvex
+
+    # concavity/convexity constraints between the appended DMUs and all DMUs
+    for i in range(n0, n):
+        for h in range(n):
+            if i == h:
+                continue
+            if fun == "prod":
+                shape.add((i, h), hyper(i, i) <= hyper(i, h))
+                if h < n0:
+                    shape.add((h, i), hyper(h, h) <= hyper(h, i))
+            if fun == "cost":
+                shape.add((i, h), hyper(i, i) >= hyper(i, h))
+                if h < n0:
+                    shape.add((h, i), hyper(h, h) >= hyper(h, i))
+
+    return model
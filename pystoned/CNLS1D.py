@@ -0,0 +1,210 @@
+"""
+@Title   : Exact single-input CNLS and C2NLS without an optimization solver
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+from scipy.linalg import solveh_banded
+import numpy as np
+
+
+def cnls1d(y, x, fun, rts):
+    # additive CNLS with one input (cet = "addi"): the estimates of CNLS.cnls(y, x, "addi", fun, rts)
+    # fun     = "prod" : production frontier
+    #         = "cost" : cost frontier
+    # rts     = "vrs"  : variable returns to scale
+    #         = "crs"  : constant returns to scale
+    # returns the dictionary of solver.values(): alpha 'a', beta 'b' and residuals 'e'
+    # the fitted values are unique; at a kink of the frontier any slope between those of the two
+    # segments is optimal, the slope of the segment to the right of the DMU is returned
+
+    # transform data
+    y = np.asarray(y, dtype=float).reshape(-1)
+    x = np.asarray(x, dtype=float).reshape(-1)
+
+    if rts == "crs":
+        # the concavity/convexity constraints give all DMUs the same ray through the origin
+        beta = max(np.dot(x, y) / np.dot(x, x), 0.0)
+        return {'a': np.zeros(len(y)), 'b': np.full(len(y), beta), 'e': y - beta * x}
+
+    # tied inputs share the fitted value: weighted means of the outputs
+    xs, inv, w = np.unique(x, return_inverse=True, return_counts=True)
+    ys = np.bincount(inv, weights=y) / w
+
+    if fun == "prod":
+        g = concave(xs, ys, w)
+
+    # convex nondecreasing g(x) = -h(-x) with h concave nondecreasing
+    if fun == "cost":
+        g = -concave(-xs[::-1], -ys[::-1], w[::-1])[::-1]
+
+    # nonnegative beta (up to rounding on the flat parts of the frontier)
+    beta = np.maximum(_slopes(xs, g), 0.0)
+
+    fit = g[inv]
+    b = beta[inv]
+
+    return {'a': fit - b * x, 'b': b, 'e': y - fit}
+
+
+def ccnls1d(y, x):
+    # C2NLS with one input: the estimates of CCNLS.ccnls(y, x)
+    # every DMU lies on or below the frontier, so the least squares frontier is the smallest
+    # concave nondecreasing function above the data: the upper hull of the DMUs, flat beyond the
+    # largest output
+
+    # transform data
+    y = np.asarray(y, dtype=float).reshape(-1)
+    x = np.asarray(x, dtype=float).reshape(-1)
+
+    # highest output of each input level
+    xs, inv = np.unique(x, return_inverse=True)
+    top = np.full(len(xs), -np.inf)
+    np.maximum.at(top, inv, y)
+
+    # upper hull up to the input level of the largest output
+    star = np.argmax(top)
+    hx, hy = _upperhull(xs[:star + 1], top[:star + 1])
+    g = np.where(xs <= xs[star], np.interp(xs, hx, hy), top[star])
+    # nonnegative beta (up to rounding on the flat parts of the frontier)
+    beta = np.maximum(_slopes(xs, g), 0.0)
+
+    fit = g[inv]
+    b = beta[inv]
+
+    return {'a': fit - b * x, 'b': b, 'e': y - fit}
+
+
+def concave(x, y, w, tol=1e-12, maxiter=None):
+    # weighted least squares concave nondecreasing fit at the sorted distinct points x
+    # g(x) = c + sum_k d_k * min(x - x_k, 0) with d_k >= 0: a nonnegative least squares problem in
+    # the hinge functions, solved exactly by the active set method of Lawson and Hanson; the fit of
+    # a set of hinges is a linear spline with knots at the hinges (a tridiagonal system)
+
+    n = len(x)
+    if n == 1:
+        return y.copy()
+
+    if maxiter is None:
+        maxiter = 10 * n
+
+    w = np.asarray(w, dtype=float)
+
+    # bound of the gradient of a hinge (Cauchy-Schwarz), for the stopping rule
+    scale = np.sqrt(np.dot(w, y * y) * np.sum(w)) * (x[-1] - x[0]) + 1e-300
+
+    knots = []
+    g = np.full(n, np.dot(w, y) / np.sum(w))
+
+    for it in range(maxiter):
+        # hinge with the steepest descent of the sum of squares
+        grad = _gradient(x, w * (y - g))
+        grad[0] = -np.inf
+        grad[knots] = -np.inf
+        k = int(np.argmax(grad))
+        if grad[k] <= tol * scale:
+            break
+        knots = sorted(knots + [k])
+
+        while True:
+            new = _spline(x, y, w, knots)
+            d = _hinges(x, new)[knots]
+            if np.all(d > 0):
+                g = new
+                break
+
+            # step back to the first hinge that reaches zero and drop it
+            old = _hinges(x, g)[knots]
+            neg = d <= 0
+            ratio = np.full(len(knots), np.inf)
+            ratio[neg] = old[neg] / (old[neg] - d[neg])
+            t = np.min(ratio)
+            g = g + t * (new - g)
+            knots = [k for k, r in zip(knots, ratio) if r > t]
+
+    return g
+
+
+def _gradient(x, wr):
+    # sum_i w_i r_i h_k(x_i) for every hinge k: the hinge at x_k is zero at and right of x_k
+
+    s0 = np.concatenate([[0.0], np.cumsum(wr)[:-1]])
+    s1 = np.concatenate([[0.0], np.cumsum(wr * x)[:-1]])
+
+    return s1 - x * s0
+
+
+def _hinges(x, g):
+    # coefficients of the hinges of a linear spline: the decrease of the slope at each point,
+    # the slope of the last segment for the last point (its hinge is linear)
+
+    s = np.diff(g) / np.diff(x)
+    d = np.empty(len(x))
+    d[0] = 0.0
+    d[1:-1] = s[:-1] - s[1:]
+    d[-1] = s[-1]
+
+    return d
+
+
+def _spline(x, y, w, knots):
+    # weighted least squares linear spline with knots at the hinges: free on the first segment,
+    # flat after the last knot unless the last point is a (linear) hinge
+
+    n = len(x)
+
+    nodes = np.unique(np.concatenate([[0], knots, [n - 1]])).astype(int)
+    flat = (n - 1) not in knots
+
+    # segment of each point and its position in the segment
+    seg = np.clip(np.searchsorted(nodes, np.arange(n), side="right") - 1, 0, len(nodes) - 2)
+    lam = (x - x[nodes[seg]]) / (x[nodes[seg + 1]] - x[nodes[seg]])
+
+    left = seg
+    right = seg + 1
+    if flat:
+        # the last two nodes share their value
+        right = np.minimum(right, len(nodes) - 2)
+    p = len(nodes) - 1 if flat else len(nodes)
+
+    ql = 1.0 - lam
+    qr = lam
+    same = left == right
+
+    # tridiagonal normal equations in upper banded form
+    ab = np.zeros((2, p))
+    ab[1] = (np.bincount(left, w * ql * ql, p) + np.bincount(right, w * qr * qr, p)
+             + np.bincount(left, 2 * w * ql * qr * same, p))
+    ab[0, 1:] = np.bincount(left, w * ql * qr * ~same, p)[:-1]
+    rhs = np.bincount(left, w * ql * y, p) + np.bincount(right, w * qr * y, p)
+
+    v = solveh_banded(ab, rhs)
+
+    return v[left] * ql + v[right] * qr
+
+
+def _slopes(x, g):
+    # slope of the segment to the right of each point, to the left for the last point
+
+    if len(x) == 1:
+        return np.zeros(1)
+
+    s = np.diff(g) / np.diff(x)
+
+    return np.concatenate([s, s[-1:]])
+
+
+def _upperhull(u, v):
+    # vertices of the upper concave hull of the points (u, v), u sorted and distinct
+
+    hu = []
+    hv = []
+    for k in range(len(u)):
+        while len(hu) >= 2 and (hu[-1] - hu[-2]) * (v[k] - hv[-2]) - (hv[-1] - hv[-2]) * (u[k] - hu[-2]) >= 0:
+            hu.pop()
+            hv.pop()
+        hu.append(u[k])
+        hv.append(v[k])
+
+    return np.array(hu), np.array(hv)
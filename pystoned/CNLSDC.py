@@ -0,0 +1,292 @@
+"""
+@Title   : Divide-and-conquer Convex Nonparametric Least Square (CNLS) for large samples
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+# Import of the pyomo module
+from pyomo.environ import *
+from . import executor, shared
+from . import solver as slv
+from itertools import repeat
+from scipy.cluster.vq import kmeans2
+import numpy as np
+import warnings
+
+
+def cnlsdc(y, x, fun, rts, size=1000, solver="ipopt", options=None, workers=None, near=None, tol=1e-6, maxiter=50):
+    # additive CNLS estimated in blocks and merged (cet = "addi")
+    # fun     = "prod" : production frontier
+    #         = "cost" : cost frontier
+    # rts     = "vrs"  : variable returns to scale
+    #         = "crs"  : constant returns to scale
+    # size    = target number of DMUs per block; the blocks are k-means clusters in x
+    # solver  = QP solver of the blocks and the merge problem (the default of solver.fit())
+    # workers = number of processes fitting the blocks (None: one per CPU, 1: sequential), or an
+    #           executor (executor.get())
+    # near    = number of candidate hyperplanes per DMU in the first merge problem (default m+2)
+    # tol     = largest violation of concavity/convexity accepted in the merged frontier
+    # maxiter = maximum number of merge iterations (at least 1)
+    # the merge adds the violated concavity/convexity constraints until none is left, so the
+    # result is the CNLS estimate of the whole sample; 'converged' is False (and a warning is
+    # issued) when violations are left after maxiter iterations
+
+    # transform data
+    y = np.asarray(y, dtype=float).reshape(-1)
+
+    # number of DMUs
+    n = len(y)
+
+    x = np.asarray(x, dtype=float).reshape(n, -1)
+
+    # number of inputs
+    m = x.shape[1]
+
+    if near is None:
+        near = m + 2
+
+    if maxiter < 1:
+        raise ValueError("maxiter must be at least 1, got %s" % maxiter)
+
+    label = blocks(x, size)
+
+    # fit the blocks: full CNLS within each block
+    idx = [np.flatnonzero(label == k) for k in np.unique(label)]
+
+    if workers == 1 or len(idx) == 1:
+        fits = [_block(y[i], x[i], fun, rts, solver, options) for i in idx]
+    elif executor.threaded(workers):
+        # in-process and thread executors use the arrays as they are
+        fits = list(workers.map(_block, [y[i] for i in idx], [x[i] for i in idx], repeat(fun), repeat(rts),
+                                repeat(solver), repeat(options)))
+    else:
+        # the workers get the indices of their block, the data is shared with them
+        with shared.plane(inline=executor.remote(workers), y=y, x=x) as handle:
+            with executor.pool(workers) as pool:
+                fits = list(pool.map(_shared, repeat(handle), idx, repeat(fun), repeat(rts), repeat(solver),
+                                     repeat(options)))
+
+    a = np.zeros(n)
+    b = np.zeros((n, m))
+    for i, (ak, bk) in zip(idx, fits):
+        a[i] = ak
+        b[i] = bk
+
+    # merge: the constraints between each DMU and the candidate hyperplanes nearest to it
+    pairs = candidates(a, b, x, fun, near)
+
+    model = frontier(y, x, pairs, fun, rts)
+    start(model, y, x, a, b)
+
+    converged = False
+    for it in range(maxiter):
+        slv.solve(model, solver, options, warmstart=True)
+        a, b = estimates(model, n, m, rts)
+
+        # add the violated constraints
+        new = violated(a, b, x, fun, tol, near, pairs)
+        if not new:
+            converged = True
+            break
+        pairs.update(new)
+        for i, h in new:
+            model.afriat.add(rule(model, x, i, h, fun, rts))
+
+    if not converged:
+        warnings.warn("cnlsdc: %d concavity/convexity violations larger than %g are left after %d merge "
+                      "iterations; the frontier is not the CNLS estimate" % (len(new), tol, maxiter),
+                      RuntimeWarning)
+
+    est = slv.values(model)
+    if 'a' not in est:
+        est['a'] = np.zeros(n)
+    if m == 1:
+        est['b'] = est['b'][:, 0]
+    est['block'] = label
+    est['iterations'] = np.array(it + 1)
+    est['converged'] = np.array(converged)
+
+    return est
+
+
+def blocks(x, size):
+    # block label of each DMU: k-means clusters of the standardized inputs
+
+    n = len(x)
+    k = int(np.ceil(n / size))
+    if k <= 1:
+        return np.zeros(n, dtype=int)
+
+    sd = np.std(x, axis=0)
+    sd[sd == 0] = 1.0
+    _, label = kmeans2(x / sd, k, minit="++", seed=0)
+
+    # drop the empty clusters
+    return np.unique(label, return_inverse=True)[1]
+
+
+def _shared(handle, idx, fun, rts, solver, options):
+    # block idx of the shared data
+
+    data = shared.attach(handle)
+    y = data['y'][idx]
+    x = data['x'][idx]
+    del data
+    shared.detach(handle)
+
+    return _block(y, x, fun, rts, solver, options)
+
+
+def _block(y, x, fun, rts, solver, options):
+    # CNLS estimate of one block with all concavity/convexity constraints
+
+    n, m = x.shape
+    pairs = {(i, h) for i in range(n) for h in range(n) if i != h}
+
+    model = frontier(y, x, pairs, fun, rts)
+    slv.solve(model, solver, options)
+
+    return estimates(model, n, m, rts)
+
+
+def frontier(y, x, pairs, fun, rts):
+    # additive CNLS with the concavity/convexity constraints of the pairs (i, h) only
+
+    n, m = x.shape
+
+    # Creation of a Concrete Model
+    model = ConcreteModel()
+
+    # Set
+    model.i = Set(initialize=range(n))
+    model.j = Set(initialize=range(m))
+
+    # Variables
+    if rts == "vrs":
+        model.a = Var(model.i, doc='alpha')
+    model.b = Var(model.i, model.j, bounds=(0.0, None), doc='beta')
+    model.e = Var(model.i, doc='residuals')
+
+    # Objective function
+    def objective_rule(model):
+        return sum(model.e[i] * model.e[i] for i in model.i)
+
+    model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
+
+    # Constraints
+    def reg_rule(model, i):
+        return y[i] == hyper(model, x, i, i, rts) + model.e[i]
+
+    model.reg = Constraint(model.i, rule=reg_rule, doc='regression equation')
+
+    model.afriat = ConstraintList(doc='concavity/convexity constraints')
+    for i, h in sorted(pairs):
+        model.afriat.add(rule(model, x, i, h, fun, rts))
+
+    return model
+
+
+def hyper(model, x, i, h, rts):
+    # hyperplane of DMU h evaluated at the inputs of DMU i
+
+    arow = x[i]
+    if rts == "vrs":
+        return model.a[h] + quicksum(model.b[h, j] * arow[j] for j in model.j)
+    return quicksum(model.b[h, j] * arow[j] for j in model.j)
+
+
+def rule(model, x, i, h, fun, rts):
+    # concavity (prod) or convexity (cost) constraint between DMUs i and h
+
+    if fun == "cost":
+        return hyper(model, x, i, i, rts) >= hyper(model, x, i, h, rts)
+    return hyper(model, x, i, i, rts) <= hyper(model, x, i, h, rts)
+
+
+def start(model, y, x, a, b):
+    # starting point: the block estimates
+
+    for i in model.i:
+        if hasattr(model, "a"):
+            model.a[i].value = a[i]
+        for j in model.j:
+            model.b[i, j].value = b[i, j]
+        model.e[i].value = y[i] - a[i] - np.dot(b[i], x[i])
+
+
+def estimates(model, n, m, rts):
+    # current alpha (zero under crs) and beta (n x m)
+
+    if rts == "vrs":
+        a = np.array([model.a[i].value for i in range(n)], dtype=float)
+    else:
+        a = np.zeros(n)
+    b = np.array([[model.b[i, j].value for j in range(m)] for i in range(n)], dtype=float)
+
+    return a, b
+
+
+def _planes(a, b):
+    # distinct hyperplanes and one DMU owning each of them
+
+    planes, owner = np.unique(np.column_stack([a, b]), axis=0, return_index=True)
+
+    return planes, owner
+
+
+def candidates(a, b, x, fun, near, chunk=None):
+    # pairs (i, h): the near hyperplanes with the lowest (prod) or highest (cost) value at x_i
+
+    planes, owner = _planes(a, b)
+    near = min(near, len(planes))
+
+    if chunk is None:
+        chunk = max(1, 1000000 // len(planes))
+
+    pairs = set()
+    for s in range(0, len(x), chunk):
+        val = planes[:, 0] + x[s:s + chunk] @ planes[:, 1:].T
+        if fun == "cost":
+            val = -val
+        top = np.argpartition(val, near - 1, axis=1)[:, :near]
+        for r, row in enumerate(top):
+            i = s + r
+            pairs.update((i, int(owner[k])) for k in row if owner[k] != i)
+
+    return pairs
+
+
+def violated(a, b, x, fun, tol, near, pairs=(), chunk=None):
+    # pairs (i, h) violating concavity (prod) or convexity (cost) at x_i by more than tol,
+    # at most the near most violated hyperplanes per DMU among those not in pairs (the constraints
+    # of the model: they may exceed tol by the feasibility tolerance of the solver)
+
+    planes, owner, plane = np.unique(np.column_stack([a, b]), axis=0, return_index=True, return_inverse=True)
+    plane = plane.reshape(-1)
+    near = min(near, len(planes))
+
+    # hyperplanes already constrained at each DMU (plane: the distinct hyperplane of each DMU)
+    known = {}
+    for i, h in pairs:
+        known.setdefault(i, []).append(plane[h])
+
+    if chunk is None:
+        chunk = max(1, 1000000 // len(planes))
+
+    found = []
+    for s in range(0, len(x), chunk):
+        xs = x[s:s + chunk]
+        own = a[s:s + chunk] + np.sum(b[s:s + chunk] * xs, axis=1)
+        val = planes[:, 0] + xs @ planes[:, 1:].T
+        if fun == "cost":
+            gap = val - own[:, None]
+        else:
+            gap = own[:, None] - val
+        for r in range(len(xs)):
+            gap[r, known.get(s + r, [])] = -np.inf
+        top = np.argpartition(-gap, near - 1, axis=1)[:, :near]
+        for r, row in enumerate(top):
+            found.extend((s + r, int(owner[k])) for k in row if gap[r, k] > tol)
+
+    return found
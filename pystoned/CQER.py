@@ -7,15 +7,22 @@
 
 # Import of the pyomo module
 from pyomo.environ import *
+from . import afriat, dupx
 
 
-def cqr(y, x, tau, cet, fun, rts):
+def cqr(y, x, tau, cet, fun, rts, dup=False):
     # cet     = "addi" : Additive composite error term
     #         = "mult" : Multiplicative composite error term
     # fun     = "prod" : production frontier
     #         = "cost" : cost frontier
     # rts     = "vrs"  : variable returns to scale
     #         = "crs"  : constant returns to scale
+    # dup     = True   : DMUs with identical inputs share one hyperplane (one per distinct input
+    #                    vector); the residuals stay per DMU
+
+    if dup:
+        yg, xu, grp, w, dev = dupx.collapse(y, x, cet)
+        return dupx.share(cqr(yg, xu, tau, cet, fun, rts), y, xu, grp, "cqr", cet, rts)
 
     # transform data
     x = x.tolist()
@@ -41,6 +48,10 @@ def cqr(y, x, tau, cet, fun, rts):
         # Alias
         model.h = SetOf(model.i)
 
+        # Parameters (mutable: the data can be changed between solves, see solver.resolve)
+        model.y = Param(model.i, initialize=dict(enumerate(y)), mutable=True, doc='output')
+        model.tau = Param(initialize=tau, mutable=True, doc='quantile/expectile')
+
         # Variables
         model.a = Var(model.i, doc='alpha')
         model.b = Var(model.i, bounds=(0.0, None), doc='beta')
@@ -53,7 +64,7 @@ def cqr(y, x, tau, cet, fun, rts):
 
             # Objective function
             def objective_rule(model):
-                return tau * sum(model.ep[i] for i in model.i) + (1 - tau) * sum(model.em[i] for i in model.i)
+                return model.tau * sum(model.ep[i] for i in model.i) + (1 - model.tau) * sum(model.em[i] for i in model.i)
 
             model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
 
@@ -61,36 +72,26 @@ def cqr(y, x, tau, cet, fun, rts):
 
                 # Constraints
                 def reg_rule(model, i):
-                    return y[i] == model.a[i] + model.b[i] * x[i] + model.ep[i] - model.em[i]
+                    return model.y[i] == model.a[i] + model.b[i] * x[i] + model.ep[i] - model.em[i]
 
                 model.reg = Constraint(model.i, rule=reg_rule, doc='regression equation')
 
                 # production model
                 if fun == "prod":
 
-                    def concav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] <= model.a[h] + model.b[h] * x[i]
-
-                    model.concav = Constraint(model.i, model.h, rule=concav_rule, doc='concavity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'concav')
 
                 # cost model
                 if fun == "cost":
 
-                    def convex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] >= model.a[h] + model.b[h] * x[i]
-
-                    model.convex = Constraint(model.i, model.h, rule=convex_rule, doc='convexity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'convex')
 
         # Multiplicative composite error term
         if cet == "mult":
 
             # Objectivr function
             def objective_rule(model):
-                return tau * sum(model.ep[i] for i in model.i) + (1 - tau) * sum(model.em[i] for i in model.i)
+                return model.tau * sum(model.ep[i] for i in model.i) + (1 - model.tau) * sum(model.em[i] for i in model.i)
 
             model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
 
@@ -98,7 +99,7 @@ def cqr(y, x, tau, cet, fun, rts):
 
                 # Constraints
                 def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
+                    return log(model.y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
 
                 model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
 
@@ -110,28 +111,18 @@ def cqr(y, x, tau, cet, fun, rts):
                 # production model
                 if fun == "prod":
 
-                    def qconcav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] <= model.a[h] + model.b[h] * x[i]
-
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'qconcav')
 
                 # cost model
                 if fun == "cost":
 
-                    def qconvex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] >= model.a[h] + model.b[h] * x[i]
-
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'qconvex')
 
             if rts == "crs":
 
                 # Constraints
                 def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
+                    return log(model.y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
 
                 model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
 
@@ -143,22 +134,12 @@ def cqr(y, x, tau, cet, fun, rts):
                 # production model
                 if fun == "prod":
 
-                    def qconcav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.b[i] * x[i] <= model.b[h] * x[i]
-
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'qconcav')
 
                 # cost model
                 if fun == "cost":
 
-                    def qconvex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.b[i] * x[i] >= model.b[h] * x[i]
-
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'qconvex')
 
     if m > 1:
 
@@ -169,6 +150,10 @@ def cqr(y, x, tau, cet, fun, rts):
         # Alias
         model.h = SetOf(model.i)
 
+        # Parameters (mutable: the data can be changed between solves, see solver.resolve)
+        model.y = Param(model.i, initialize=dict(enumerate(y)), mutable=True, doc='output')
+        model.tau = Param(initialize=tau, mutable=True, doc='quantile/expectile')
+
         # Variables
         model.a = Var(model.i, doc='alpha')
         model.b = Var(model.i, model.j, bounds=(0.0, None), doc='beta')
@@ -181,7 +166,7 @@ def cqr(y, x, tau, cet, fun, rts):
 
             # Objective function
             def objective_rule(model):
-                return tau * sum(model.ep[i] for i in model.i) + (1 - tau) * sum(model.em[i] for i in model.i)
+                return model.tau * sum(model.ep[i] for i in model.i) + (1 - model.tau) * sum(model.em[i] for i in model.i)
 
             model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
 
@@ -190,7 +175,7 @@ def cqr(y, x, tau, cet, fun, rts):
                 # Constraints
                 def reg_rule(model, i):
                     arow = x[i]
-                    return y[i] == model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) + model.ep[i] - model.em[i]
+                    return model.y[i] == model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) + model.ep[i] - model.em[i]
 
                 model.reg = Constraint(model.i, rule=reg_rule, doc='regression equation')
 
@@ -223,7 +208,7 @@ def cqr(y, x, tau, cet, fun, rts):
 
             # Objectivr function
             def objective_rule(model):
-                return tau * sum(model.ep[i] for i in model.i) + (1 - tau) * sum(model.em[i] for i in model.i)
+                return model.tau * sum(model.ep[i] for i in model.i) + (1 - model.tau) * sum(model.em[i] for i in model.i)
 
             model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
 
@@ -231,7 +216,7 @@ def cqr(y, x, tau, cet, fun, rts):
 
                 # Constraints
                 def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
+                    return log(model.y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
 
                 model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
 
@@ -269,7 +254,7 @@ def cqr(y, x, tau, cet, fun, rts):
 
                 # Constraints
                 def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
+                    return log(model.y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
 
                 model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
 
@@ -306,13 +291,18 @@ def cqr(y, x, tau, cet, fun, rts):
     return model
 
 
-def cer(y, x, tau, cet, fun, rts):
+def cer(y, x, tau, cet, fun, rts, dup=False):
     # cet     = "addi" : Additive composite error term
     #         = "mult" : Multiplicative composite error term
     # fun     = "prod" : production frontier
     #         = "cost" : cost frontier
     # rts     = "vrs"  : variable returns to scale
     #         = "crs"  : constant returns to scale
+    # dup     = True   : as in cqr()
+
+    if dup:
+        yg, xu, grp, w, dev = dupx.collapse(y, x, cet)
+        return dupx.share(cer(yg.tolist(), xu.tolist(), tau, cet, fun, rts), y, xu, grp, "cer", cet, rts)
 
     # number of DMUS
     n = len(y)
@@ -334,6 +324,10 @@ def cer(y, x, tau, cet, fun, rts):
         # Alias
         model.h = SetOf(model.i)
 
+        # Parameters (mutable: the data can be changed between solves, see solver.resolve)
+        model.y = Param(model.i, initialize=dict(enumerate(y)), mutable=True, doc='output')
+        model.tau = Param(initialize=tau, mutable=True, doc='quantile/expectile')
+
         # Variables
         model.a = Var(model.i, doc='alpha')
         model.b = Var(model.i, bounds=(0.0, None), doc='beta')
@@ -346,7 +340,7 @@ def cer(y, x, tau, cet, fun, rts):
 
             # Objective function
             def objective_rule(model):
-                return tau * sum(model.ep[i] * model.ep[i] for i in model.i) + (1 - tau) * sum(
+                return model.tau * sum(model.ep[i] * model.ep[i] for i in model.i) + (1 - model.tau) * sum(
                     model.em[i] * model.em[i] for i in model.i)
 
             model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
@@ -355,36 +349,26 @@ def cer(y, x, tau, cet, fun, rts):
 
                 # Constraints
                 def reg_rule(model, i):
-                    return y[i] == model.a[i] + model.b[i] * x[i] + model.ep[i] - model.em[i]
+                    return model.y[i] == model.a[i] + model.b[i] * x[i] + model.ep[i] - model.em[i]
 
                 model.reg = Constraint(model.i, rule=reg_rule, doc='regression equation')
 
                 # production model
                 if fun == "prod":
 
-                    def concav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] <= model.a[h] + model.b[h] * x[i]
-
-                    model.concav = Constraint(model.i, model.h, rule=concav_rule, doc='concavity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'concav')
 
                 # cost model
                 if fun == "cost":
 
-                    def convex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] >= model.a[h] + model.b[h] * x[i]
-
-                    model.convex = Constraint(model.i, model.h, rule=convex_rule, doc='convexity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'convex')
 
         # Multiplicative composite error term
         if cet == "mult":
 
             # Objective function
             def objective_rule(model):
-                return tau * sum(model.ep[i] * model.ep[i] for i in model.i) + (1 - tau) * sum(
+                return model.tau * sum(model.ep[i] * model.ep[i] for i in model.i) + (1 - model.tau) * sum(
                     model.em[i] * model.em[i] for i in model.i)
 
             model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
@@ -393,7 +377,7 @@ def cer(y, x, tau, cet, fun, rts):
 
                 # Constraints
                 def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
+                    return log(model.y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
 
                 model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
 
@@ -405,28 +389,18 @@ def cer(y, x, tau, cet, fun, rts):
                 # production model
                 if fun == "prod":
 
-                    def qconcav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] <= model.a[h] + model.b[h] * x[i]
-
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'qconcav')
 
                 # cost model
                 if fun == "cost":
 
-                    def qconvex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.a[i] + model.b[i] * x[i] >= model.a[h] + model.b[h] * x[i]
-
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'qconvex')
 
             if rts == "crs":
 
                 # Constraints
                 def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
+                    return log(model.y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
 
                 model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
 
@@ -438,22 +412,12 @@ def cer(y, x, tau, cet, fun, rts):
                 # production model
                 if fun == "prod":
 
-                    def qconcav_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.b[i] * x[i] <= model.b[h] * x[i]
-
-                    model.qconcav = Constraint(model.i, model.h, rule=qconcav_rule, doc='concavity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'qconcav')
 
                 # cost model
                 if fun == "cost":
 
-                    def qconvex_rule(model, i, h):
-                        if i == h:
-                            return Constraint.Skip
-                        return model.b[i] * x[i] >= model.b[h] * x[i]
-
-                    model.qconvex = Constraint(model.i, model.h, rule=qconvex_rule, doc='convexity constraint')
+                    afriat.sorted1d(model, x, fun, rts, 'qconvex')
 
     if m > 1:
 
@@ -464,6 +428,10 @@ def cer(y, x, tau, cet, fun, rts):
         # Alias
         model.h = SetOf(model.i)
 
+        # Parameters (mutable: the data can be changed between solves, see solver.resolve)
+        model.y = Param(model.i, initialize=dict(enumerate(y)), mutable=True, doc='output')
+        model.tau = Param(initialize=tau, mutable=True, doc='quantile/expectile')
+
         # Variables
         model.a = Var(model.i, doc='alpha')
         model.b = Var(model.i, model.j, bounds=(0.0, None), doc='beta')
@@ -476,7 +444,7 @@ def cer(y, x, tau, cet, fun, rts):
 
             # Objective function
             def objective_rule(model):
-                return tau * sum(model.ep[i] * model.ep[i] for i in model.i) + (1 - tau) * sum(
+                return model.tau * sum(model.ep[i] * model.ep[i] for i in model.i) + (1 - model.tau) * sum(
                     model.em[i] * model.em[i] for i in model.i)
 
             model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
@@ -486,7 +454,7 @@ def cer(y, x, tau, cet, fun, rts):
                 # Constraints
                 def reg_rule(model, i):
                     arow = x[i]
-                    return y[i] == model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) + model.ep[i] - model.em[
+                    return model.y[i] == model.a[i] + sum(model.b[i, j] * arow[j] for j in model.j) + model.ep[i] - model.em[
                         i]
 
                 model.reg = Constraint(model.i, rule=reg_rule, doc='regression equation')
@@ -520,7 +488,7 @@ def cer(y, x, tau, cet, fun, rts):
 
             # Objective function
             def objective_rule(model):
-                return tau * sum(model.ep[i] * model.ep[i] for i in model.i) + (1 - tau) * sum(
+                return model.tau * sum(model.ep[i] * model.ep[i] for i in model.i) + (1 - model.tau) * sum(
                     model.em[i] * model.em[i] for i in model.i)
 
             model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
@@ -529,7 +497,7 @@ def cer(y, x, tau, cet, fun, rts):
 
                 # Constraints
                 def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
+                    return log(model.y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
 
                 model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
 
@@ -567,7 +535,7 @@ def cer(y, x, tau, cet, fun, rts):
 
                 # Constraints
                 def qreg_rule(model, i):
-                    return log(y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
+                    return log(model.y[i]) == log(model.f[i] + 1) + model.ep[i] - model.em[i]
 
                 model.qreg = Constraint(model.i, rule=qreg_rule, doc='log-transformed regression equation')
 
@@ -8,14 +8,24 @@
 # Import of the pyomo module
 from pyomo.environ import *
 from . import directV
+from . import DEADEC
 import numpy as np
 
 
-def dea(y, x, orient, rts):
+def dea(y, x, orient, rts, screen=None):
     # orient  = "io" : input orientation
     #         = "oo" : output orientation
     # rts     = "vrs": variable returns to scale
     #         = "crs": constant returns to scale
+    # screen  = None : all DMUs are candidate peers
+    #         = "dom": only the DMUs not dominated by another DMU
+    #         = "eff": only the radially efficient DMUs (first pass of small LPs)
+
+    # candidate peers
+    if screen is None:
+        peer = list(range(len(y)))
+    else:
+        peer = DEADEC.peers(y, x, rts, extreme=(screen == "eff")).tolist()
 
     # transform data
     x = x.tolist()
@@ -48,11 +58,13 @@ def dea(y, x, orient, rts):
     model.j = Set(initialize=range(m))
     model.k = Set(initialize=range(p))
 
+    model.r = Set(initialize=peer, doc='candidate peers')
+
     # Alias
     model.io = SetOf(model.i)
 
     # Variables
-    model.lamda = Var(model.io, model.i, bounds=(0.0, None), doc='efficiency')
+    model.lamda = Var(model.io, model.r, bounds=(0.0, None), doc='efficiency')
     model.theta = Var(model.io, doc='intensity variables')
 
     if orient == "io":
@@ -68,13 +80,13 @@ def dea(y, x, orient, rts):
             # Constraints
             def input_rule(model, io, j):
                 arow = x[j]
-                return (model.theta[io] * arow[io]) >= sum(model.lamda[io, i] * arow[i] for i in model.i)
+                return (model.theta[io] * arow[io]) >= sum(model.lamda[io, i] * arow[i] for i in model.r)
 
             model.input = Constraint(model.io, model.j, rule=input_rule, doc='input constraints')
 
             def output_rule(model, io, k):
                 brow = y[k]
-                return sum(model.lamda[io, i] * brow[i] for i in model.i) >= brow[io]
+                return sum(model.lamda[io, i] * brow[i] for i in model.r) >= brow[io]
 
             model.output = Constraint(model.io, model.k, rule=output_rule, doc='output constraints')
 
@@ -89,18 +101,18 @@ def dea(y, x, orient, rts):
             # Constraints
             def input_rule(model, io, j):
                 arow = x[j]
-                return (model.theta[io] * arow[io]) >= sum(model.lamda[io, i] * arow[i] for i in model.i)
+                return (model.theta[io] * arow[io]) >= sum(model.lamda[io, i] * arow[i] for i in model.r)
 
             model.input = Constraint(model.io, model.j, rule=input_rule, doc='input constraints')
 
             def output_rule(model, io, k):
                 brow = y[k]
-                return sum(model.lamda[io, i] * brow[i] for i in model.i) >= brow[io]
+                return sum(model.lamda[io, i] * brow[i] for i in model.r) >= brow[io]
 
             model.output = Constraint(model.io, model.k, rule=output_rule, doc='output constraints')
 
             def vrs_rule(model, io):
-                return sum(model.lamda[io, i] for i in model.i) == 1
+                return sum(model.lamda[io, i] for i in model.r) == 1
 
             model.vrs = Constraint(model.io, rule=vrs_rule, doc='VRS constraints')
 
@@ -117,13 +129,13 @@ def dea(y, x, orient, rts):
             # Constraints
             def input_rule(model, io, j):
                 arow = x[j]
-                return sum(model.lamda[io, i] * arow[i] for i in model.i) <= arow[io]
+                return sum(model.lamda[io, i] * arow[i] for i in model.r) <= arow[io]
 
             model.input = Constraint(model.io, model.j, rule=input_rule, doc='input constraints')
 
             def output_rule(model, io, k):
                 brow = y[k]
-                return model.theta[io] * brow[io] <= sum(model.lamda[io, i] * brow[i] for i in model.i)
+                return model.theta[io] * brow[io] <= sum(model.lamda[io, i] * brow[i] for i in model.r)
 
             model.output = Constraint(model.io, model.k, rule=output_rule, doc='output constraints')
 
@@ -138,27 +150,36 @@ def dea(y, x, orient, rts):
             # Constraints
             def input_rule(model, io, j):
                 arow = x[j]
-                return sum(model.lamda[io, i] * arow[i] for i in model.i) <= arow[io]
+                return sum(model.lamda[io, i] * arow[i] for i in model.r) <= arow[io]
 
             model.input = Constraint(model.io, model.j, rule=input_rule, doc='input constraints')
 
             def output_rule(model, io, k):
                 brow = y[k]
-                return model.theta[io] * brow[io] <= sum(model.lamda[io, i] * brow[i] for i in model.i)
+                return model.theta[io] * brow[io] <= sum(model.lamda[io, i] * brow[i] for i in model.r)
 
             model.output = Constraint(model.io, model.k, rule=output_rule, doc='output constraints')
 
             def vrs_rule(model, io):
-                return sum(model.lamda[io, i] for i in model.i) == 1
+                return sum(model.lamda[io, i] for i in model.r) == 1
 
             model.vrs = Constraint(model.io, rule=vrs_rule, doc='VRS constraints')
 
     return model
 
 
-def deaddf(y, x, gx, gy, rts):
+def deaddf(y, x, gx, gy, rts, screen=None):
     # rts     = "vrs": variable returns to scale
     #         = "crs": constant returns to scale
+    # screen  = None : all DMUs are candidate peers
+    #         = "dom": only the DMUs not dominated by another DMU
+    #         = "eff": only the radially efficient DMUs (first pass of small LPs)
+
+    # candidate peers
+    if screen is None:
+        peer = list(range(len(y)))
+    else:
+        peer = DEADEC.peers(y, x, rts, extreme=(screen == "eff")).tolist()
 
     # transform data
     x = x.tolist()
@@ -205,11 +226,13 @@ def deaddf(y, x, gx, gy, rts):
     model.j = Set(initialize=range(m))
     model.k = Set(initialize=range(p))
 
+    model.r = Set(initialize=peer, doc='candidate peers')
+
     # Alias
     model.io = SetOf(model.i)
 
     # Variables
-    model.lamda = Var(model.io, model.i, bounds=(0.0, None), doc='efficiency')
+    model.lamda = Var(model.io, model.r, bounds=(0.0, None), doc='efficiency')
     model.theta = Var(model.io, doc='intensity variables')
 
     if rts == "crs":
@@ -224,14 +247,14 @@ def deaddf(y, x, gx, gy, rts):
         def input_rule(model, io, j):
             arow = x[j]
             crow = gx[j]
-            return sum(model.lamda[io, i] * arow[i] for i in model.i) <= arow[io] - model.theta[io] * crow[io]
+            return sum(model.lamda[io, i] * arow[i] for i in model.r) <= arow[io] - model.theta[io] * crow[io]
 
         model.input = Constraint(model.io, model.j, rule=input_rule, doc='input constraints')
 
         def output_rule(model, io, k):
             brow = y[k]
             drow = gy[k]
-            return sum(model.lamda[io, i] * brow[i] for i in model.i) >= brow[io] + model.theta[io] * drow[io]
+            return sum(model.lamda[io, i] * brow[i] for i in model.r) >= brow[io] + model.theta[io] * drow[io]
 
         model.output = Constraint(model.io, model.k, rule=output_rule, doc='output constraints')
 
@@ -247,28 +270,36 @@ def deaddf(y, x, gx, gy, rts):
         def input_rule(model, io, j):
             arow = x[j]
             crow = gx[j]
-            return sum(model.lamda[io, i] * arow[i] for i in model.i) <= arow[io] - model.theta[io] * crow[io]
+            return sum(model.lamda[io, i] * arow[i] for i in model.r) <= arow[io] - model.theta[io] * crow[io]
 
         model.input = Constraint(model.io, model.j, rule=input_rule, doc='input constraints')
 
         def output_rule(model, io, k):
             brow = y[k]
             drow = gy[k]
-            return sum(model.lamda[io, i] * brow[i] for i in model.i) >= brow[io] + model.theta[io] * drow[io]
+            return sum(model.lamda[io, i] * brow[i] for i in model.r) >= brow[io] + model.theta[io] * drow[io]
 
         model.output = Constraint(model.io, model.k, rule=output_rule, doc='output constraints')
 
         def vrs_rule(model, io):
-            return sum(model.lamda[io, i] for i in model.i) == 1
+            return sum(model.lamda[io, i] for i in model.r) == 1
 
         model.vrs = Constraint(model.io, rule=vrs_rule, doc='VRS constraints')
 
     return model
 
 
-def deaddfb(y, x, b, gx, gy, gb, rts):
+def deaddfb(y, x, b, gx, gy, gb, rts, screen=None):
     # rts     = "vrs": variable returns to scale
     #         = "crs": constant returns to scale
+    # screen  = None : all DMUs are candidate peers
+    #         = "dom": only the DMUs not dominated by another DMU with the same undesirable outputs
+
+    # candidate peers
+    if screen is None:
+        peer = list(range(len(y)))
+    else:
+        peer = DEADEC.peers(y, x, rts, b=b).tolist()
 
     # transform data
     x = x.tolist()
@@ -331,11 +362,13 @@ def deaddfb(y, x, b, gx, gy, gb, rts):
     model.k = Set(initialize=range(p))
     model.l = Set(initialize=range(q))
 
+    model.r = Set(initialize=peer, doc='candidate peers')
+
     # Alias
     model.io = SetOf(model.i)
 
     # Variables
-    model.lamda = Var(model.io, model.i, bounds=(0.0, None), doc='efficiency')
+    model.lamda = Var(model.io, model.r, bounds=(0.0, None), doc='efficiency')
     model.theta = Var(model.io, doc='intensity variables')
 
     if rts == "crs":
@@ -350,21 +383,21 @@ def deaddfb(y, x, b, gx, gy, gb, rts):
         def input_rule(model, io, j):
             arow = x[j]
             crow = gx[j]
-            return arow[io] - model.theta[io] * crow[io] >= sum(model.lamda[io, i] * arow[i] for i in model.i)
+            return arow[io] - model.theta[io] * crow[io] >= sum(model.lamda[io, i] * arow[i] for i in model.r)
 
         model.input = Constraint(model.io, model.j, rule=input_rule, doc='input constraints')
 
         def output_rule(model, io, k):
             brow = y[k]
             drow = gy[k]
-            return brow[io] + model.theta[io] * drow[io] <= sum(model.lamda[io, i] * brow[i] for i in model.i)
+            return brow[io] + model.theta[io] * drow[io] <= sum(model.lamda[io, i] * brow[i] for i in model.r)
 
         model.output = Constraint(model.io, model.k, rule=output_rule, doc='output constraints')
 
         def bads_rule(model, io, l):
             erow = b[l]
             frow = gb[l]
-            return erow[io] - model.theta[io] * frow[io] == sum(model.lamda[io, i] * erow[i] for i in model.i)
+            return erow[io] - model.theta[io] * frow[io] == sum(model.lamda[io, i] * erow[i] for i in model.r)
 
         model.bads = Constraint(model.io, model.l, rule=bads_rule, doc='bad output constraints')
 
@@ -380,26 +413,26 @@ def deaddfb(y, x, b, gx, gy, gb, rts):
         def input_rule(model, io, j):
             arow = x[j]
             crow = gx[j]
-            return arow[io] - model.theta[io] * crow[io] >= sum(model.lamda[io, i] * arow[i] for i in model.i)
+            return arow[io] - model.theta[io] * crow[io] >= sum(model.lamda[io, i] * arow[i] for i in model.r)
 
         model.input = Constraint(model.io, model.j, rule=input_rule, doc='input constraints')
 
         def output_rule(model, io, k):
             brow = y[k]
             drow = gy[k]
-            return brow[io] + model.theta[io] * drow[io] <= sum(model.lamda[io, i] * brow[i] for i in model.i)
+            return brow[io] + model.theta[io] * drow[io] <= sum(model.lamda[io, i] * brow[i] for i in model.r)
 
         model.output = Constraint(model.io, model.k, rule=output_rule, doc='output constraints')
 
         def bads_rule(model, io, l):
             erow = b[l]
             frow = gb[l]
-            return erow[io] - model.theta[io] * frow[io] == sum(model.lamda[io, i] * erow[i] for i in model.i)
+            return erow[io] - model.theta[io] * frow[io] == sum(model.lamda[io, i] * erow[i] for i in model.r)
 
         model.bads = Constraint(model.io, model.l, rule=bads_rule, doc='bad output constraints')
 
         def vrs_rule(model, io):
-            return sum(model.lamda[io, i] for i in model.i) == 1
+            return sum(model.lamda[io, i] for i in model.r) == 1
 
         model.vrs = Constraint(model.io, rule=vrs_rule, doc='VRS constraints')
 
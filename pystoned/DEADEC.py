@@ -0,0 +1,358 @@
+"""
+@Title   : Decomposed Data Envelopment Analysis (DEA): one small LP per evaluated DMU
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+from . import biMatP, executor, shared
+from . import checkpoint as ckpt
+import numpy as np
+from scipy.optimize import linprog
+
+# DMUs per stored chunk of scores (checkpoint)
+CHUNK = 500
+
+
+def reftech(yref, xref, rts):
+    # rts     = "vrs": variable returns to scale
+    #         = "crs": constant returns to scale
+
+    # transform data
+    yref = np.asarray(yref, dtype=float)
+    n = len(yref)
+    yref = yref.reshape(n, -1)
+    xref = np.asarray(xref, dtype=float).reshape(n, -1)
+
+    idx = peers(yref, xref, rts, extreme=True)
+
+    return {'x': xref[idx], 'y': yref[idx], 'rts': rts, 'idx': idx}
+
+
+def peers(y, x, rts, b=None, extreme=False):
+    # candidate peers of the envelopment models: the DMUs that are not dominated by another DMU
+    # extreme = True: keep only the radially efficient DMUs in a first pass of small LPs; an
+    #           inefficient DMU is dominated by a combination of the others and never changes a score
+    #           (without undesirable outputs b only)
+
+    # transform data
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    y = y.reshape(n, -1)
+    x = np.asarray(x, dtype=float).reshape(n, -1)
+
+    idx = biMatP.nondom(y, x, b)
+
+    if extreme and b is None:
+        theta = np.array([radial(x[idx], y[idx], x[i], y[i], "io", rts) for i in idx])
+        idx = idx[~(theta < 1 - 1e-9)]
+
+    return idx
+
+
+def deascore(tech, y, x, orient):
+    # score the DMUs (y, x) against the reference technology
+    # orient  = "io" : input orientation
+    #         = "oo" : output orientation
+
+    return np.concatenate(list(deastream(tech, y, x, orient)))
+
+
+def deastream(tech, y, x, orient, chunk=1000):
+    # generator of the scores of the DMUs (y, x), chunk DMUs at a time
+
+    # transform data
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    y = y.reshape(n, -1)
+    x = np.asarray(x, dtype=float).reshape(n, -1)
+
+    for start in range(0, n, chunk):
+        y0 = y[start:start + chunk]
+        x0 = x[start:start + chunk]
+
+        # one input and one output: closed-form evaluation of the frontier
+        if x0.shape[1] == 1 and y0.shape[1] == 1:
+            yield hull1d(tech, y0[:, 0], x0[:, 0], orient)
+            continue
+
+        yield np.array([radial(tech['x'], tech['y'], x0[i], y0[i], orient, tech['rts'])
+                        for i in range(len(y0))])
+
+
+def dea(y, x, orient, rts, form="env", supeff=False, workers=1, checkpoint=None):
+    # orient  = "io" : input orientation
+    #         = "oo" : output orientation
+    # rts     = "vrs": variable returns to scale
+    #         = "crs": constant returns to scale
+    # form    = "env" : envelopment form (n intensity variables per DMU)
+    #         = "mult": multiplier form (m+p weights per DMU); the dual of the envelopment LP, with
+    #                   the same dimensions transposed and about the same solution time
+    # supeff  = True : super-efficiency, the evaluated DMU is excluded from its own reference set
+    # workers = number of processes (None: one per CPU) or an executor (executor.get()); the data is
+    #           shared with local processes, not copied
+    # checkpoint = directory where the scores are stored in chunks of DMUs as they are finished; a
+    #              run with the same data and arguments resumes from them
+
+    # transform data
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    y = y.reshape(n, -1)
+    x = np.asarray(x, dtype=float).reshape(n, -1)
+
+    return _parallel({'y': y, 'x': x}, orient, rts, form, supeff, workers, checkpoint)
+
+
+def deaddf(y, x, gx, gy, rts, form="env", supeff=False, workers=1, checkpoint=None):
+    # gx, gy  = directional vectors of the inputs and outputs
+    # form, supeff, workers, checkpoint as in dea()
+
+    # transform data
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    y = y.reshape(n, -1)
+    x = np.asarray(x, dtype=float).reshape(n, -1)
+    gx = np.broadcast_to(np.asarray(gx, dtype=float).reshape(-1, x.shape[1]), x.shape)
+    gy = np.broadcast_to(np.asarray(gy, dtype=float).reshape(-1, y.shape[1]), y.shape)
+
+    return _parallel({'y': y, 'x': x, 'gx': gx, 'gy': gy}, None, rts, form, supeff, workers, checkpoint)
+
+
+def _parallel(data, orient, rts, form, supeff, workers, checkpoint=None):
+    # scores of all DMUs, in chunks of DMUs evaluated by the workers on the shared data
+
+    n = len(data['y'])
+    if checkpoint is None and (workers == 1 or n < 2):
+        return _scores(data, np.arange(n), orient, rts, form, supeff)
+
+    # the same chunks in every run with checkpoints, whatever the number of workers
+    if checkpoint is None:
+        chunks = np.array_split(np.arange(n), min(n, 4 * executor.slots(workers)))
+        directory = None
+    else:
+        chunks = [np.arange(s, min(s + CHUNK, n)) for s in range(0, n, CHUNK)]
+        directory = ckpt.folder(checkpoint, _scores, [data, orient, rts, form, supeff])
+
+    # in-process and thread executors use the arrays as they are
+    if workers == 1 or executor.threaded(workers):
+        parts = ckpt.run(_scores, [(data, idx, orient, rts, form, supeff) for idx in chunks], directory, workers)
+        return np.concatenate(parts)
+
+    with shared.plane(inline=executor.remote(workers), **data) as handle:
+        tasks = [(handle, idx, orient, rts, form, supeff) for idx in chunks]
+        return np.concatenate(ckpt.run(_shared, tasks, directory, workers))
+
+
+def _shared(handle, idx, orient, rts, form, supeff):
+    # one task of a worker: the indices of the DMUs, the data comes from the shared memory
+
+    data = shared.attach(handle)
+    try:
+        return _scores(data, idx, orient, rts, form, supeff)
+    finally:
+        del data
+        shared.detach(handle)
+
+
+def _scores(data, idx, orient, rts, form, supeff):
+    # radial (orient) or directional (data with gx, gy) scores of the DMUs idx
+
+    y = data['y']
+    x = data['x']
+    n = len(y)
+
+    theta = np.empty(len(idx))
+    for k, o in enumerate(idx):
+        ref = _ref(n, o, supeff)
+        if 'gx' in data:
+            if form == "env":
+                theta[k] = ddf(x[ref], y[ref], x[o], y[o], data['gx'][o], data['gy'][o], rts)
+            if form == "mult":
+                theta[k] = ddfmultiplier(x[ref], y[ref], x[o], y[o], data['gx'][o], data['gy'][o], rts)
+        else:
+            if form == "env":
+                theta[k] = radial(x[ref], y[ref], x[o], y[o], orient, rts)
+            if form == "mult":
+                theta[k] = multiplier(x[ref], y[ref], x[o], y[o], orient, rts)
+
+    return theta
+
+
+def _ref(n, o, supeff):
+    # reference DMUs of the evaluated DMU o
+
+    if supeff:
+        return np.arange(n) != o
+
+    return np.ones(n, dtype=bool)
+
+
+def radial(xref, yref, x0, y0, orient, rts):
+    # radial efficiency of one DMU (x0, y0) against the reference DMUs (xref, yref)
+    # variables: [theta, lamda_1, ..., lamda_n]
+
+    n, m = xref.shape
+    p = yref.shape[1]
+
+    c = np.zeros(n + 1)
+
+    if orient == "io":
+        # min theta  s.t.  sum(lamda * xref) <= theta * x0,  sum(lamda * yref) >= y0
+        c[0] = 1.0
+        A = np.block([[-x0.reshape(m, 1), xref.T],
+                      [np.zeros((p, 1)), -yref.T]])
+        b = np.concatenate([np.zeros(m), -y0])
+
+    if orient == "oo":
+        # max theta  s.t.  sum(lamda * xref) <= x0,  sum(lamda * yref) >= theta * y0
+        c[0] = -1.0
+        A = np.block([[np.zeros((m, 1)), xref.T],
+                      [y0.reshape(p, 1), -yref.T]])
+        b = np.concatenate([x0, np.zeros(p)])
+
+    return c[0] * _envelop(c, A, b, n, rts)
+
+
+def ddf(xref, yref, x0, y0, gx, gy, rts):
+    # directional distance of one DMU (x0, y0) against the reference DMUs (xref, yref)
+    # max theta  s.t.  sum(lamda * xref) <= x0 - theta * gx,  sum(lamda * yref) >= y0 + theta * gy
+
+    n, m = xref.shape
+    p = yref.shape[1]
+
+    c = np.zeros(n + 1)
+    c[0] = -1.0
+    A = np.block([[gx.reshape(m, 1), xref.T],
+                  [gy.reshape(p, 1), -yref.T]])
+    b = np.concatenate([x0, -y0])
+
+    return -_envelop(c, A, b, n, rts)
+
+
+def multiplier(xref, yref, x0, y0, orient, rts):
+    # radial efficiency of one DMU in multiplier form (dual of radial())
+    # variables: [v_1, ..., v_m, u_1, ..., u_p, w]; w is the VRS intercept
+
+    n, m = xref.shape
+    p = yref.shape[1]
+
+    if orient == "io":
+        # max u*y0 + w  s.t.  v*x0 = 1,  u*yref - v*xref + w <= 0
+        c = np.concatenate([np.zeros(m), -y0, [-1.0]])
+        Aeq = np.concatenate([x0, np.zeros(p), [0.0]]).reshape(1, -1)
+        A = np.hstack([-xref, yref, np.ones((n, 1))])
+        return -_weights(c, A, Aeq, m, p, rts)
+
+    if orient == "oo":
+        # min v*x0 + w  s.t.  u*y0 = 1,  v*xref - u*yref + w >= 0
+        c = np.concatenate([x0, np.zeros(p), [1.0]])
+        Aeq = np.concatenate([np.zeros(m), y0, [0.0]]).reshape(1, -1)
+        A = np.hstack([-xref, yref, -np.ones((n, 1))])
+        return _weights(c, A, Aeq, m, p, rts)
+
+
+def ddfmultiplier(xref, yref, x0, y0, gx, gy, rts):
+    # directional distance of one DMU in multiplier form (dual of ddf())
+    # min v*x0 - u*y0 + w  s.t.  v*gx + u*gy = 1,  v*xref - u*yref + w >= 0
+
+    n, m = xref.shape
+    p = yref.shape[1]
+
+    c = np.concatenate([x0, -y0, [1.0]])
+    Aeq = np.concatenate([gx, gy, [0.0]]).reshape(1, -1)
+    A = np.hstack([-xref, yref, -np.ones((n, 1))])
+
+    return _weights(c, A, Aeq, m, p, rts)
+
+
+def _envelop(c, A, b, n, rts):
+    # envelopment LP of one DMU: the first variable is free, the intensity variables are nonnegative
+
+    if rts == "vrs":
+        Aeq = np.concatenate([[0.0], np.ones(n)]).reshape(1, -1)
+        beq = np.ones(1)
+    else:
+        Aeq = None
+        beq = None
+
+    bounds = [(None, None)] + [(0.0, None)] * n
+
+    return _solve(c, A, np.asarray(b), Aeq, beq, bounds)
+
+
+def _weights(c, A, Aeq, m, p, rts):
+    # multiplier LP of one DMU: nonnegative weights, free VRS intercept (zero under CRS)
+
+    if rts == "vrs":
+        w = (None, None)
+    else:
+        w = (0.0, 0.0)
+
+    bounds = [(0.0, None)] * (m + p) + [w]
+
+    return _solve(c, A, np.zeros(len(A)), Aeq, np.ones(1), bounds)
+
+
+def _solve(c, A, b, Aeq, beq, bounds):
+    # optimal objective value, nan if the LP is infeasible or unbounded
+
+    res = linprog(c, A_ub=A, b_ub=b, A_eq=Aeq, b_eq=beq, bounds=bounds, method="highs")
+
+    if res.status != 0:
+        return np.nan
+
+    return res.fun
+
+
+def hull1d(tech, y0, x0, orient):
+    # closed-form scores with one input and one output
+
+    xr = tech['x'][:, 0]
+    yr = tech['y'][:, 0]
+
+    if tech['rts'] == "crs":
+        # the frontier is the ray through the DMU with the highest output/input ratio
+        slope = np.max(yr / xr)
+        if orient == "io":
+            return y0 / (slope * x0)
+        if orient == "oo":
+            return slope * x0 / y0
+
+    if orient == "io":
+        # minimal input needed to produce y0: lower convex hull in the (y, x) plane,
+        # flat below the output level of the smallest input
+        ystar = np.max(yr[xr == np.min(xr)])
+        keep = yr >= ystar
+        hy, hx = _lowerhull(yr[keep], xr[keep])
+        need = np.interp(np.maximum(y0, ystar), hy, hx)
+        return np.where(y0 <= hy[-1], need / x0, np.nan)
+
+    if orient == "oo":
+        # maximal output from x0: upper concave hull in the (x, y) plane,
+        # flat beyond the input level of the largest output
+        xstar = np.min(xr[yr == np.max(yr)])
+        keep = xr <= xstar
+        hx, hy = _lowerhull(xr[keep], -yr[keep])
+        most = -np.interp(np.minimum(x0, xstar), hx, hy)
+        return np.where(x0 >= hx[0], most / y0, np.nan)
+
+
+def _lowerhull(u, v):
+    # vertices of the lower convex hull of the points (u, v), sorted by u (monotone chain)
+
+    order = np.lexsort((v, u))
+    u = u[order]
+    v = v[order]
+
+    hu = []
+    hv = []
+    for k in range(len(u)):
+        if hu and u[k] == hu[-1]:
+            continue
+        while len(hu) >= 2 and (hu[-1] - hu[-2]) * (v[k] - hv[-2]) - (hv[-1] - hv[-2]) * (u[k] - hu[-2]) <= 0:
+            hu.pop()
+            hv.pop()
+        hu.append(u[k])
+        hv.append(v[k])
+
+    return np.array(hu), np.array(hv)
@@ -158,4 +158,81 @@ def stoned(y, eps, fun, method, cet):
     if cet == "mult":
        TE = np.exp(-Eu)
 
+    return Eu, TE
+
+
+def stonedgroup(y, eps, group, fun, method, cet):
+    # group   = group label of each DMU (e.g. industry segment)
+    # fun, method, cet as in stoned(); each group is decomposed as stoned(y[g], eps[g], ...)
+    # with the moments and the quasi-likelihood computed for all groups at once
+
+    # transform data
+    y = np.asarray(y, dtype=float).reshape(-1)
+    eps = np.asarray(eps, dtype=float).reshape(-1)
+
+    # group index of each DMU and number of DMUs per group
+    _, g = np.unique(np.asarray(group).reshape(-1), return_inverse=True)
+    cnt = np.bincount(g)
+
+    # mean of the residuals per group
+    mresid = np.bincount(g, eps) / cnt
+
+    if method == "MoM":
+
+        # Average of 2nd/ 3rd central moments per group
+        dev = eps - mresid[g]
+        mM2 = np.bincount(g, dev ** 2) / cnt
+        mM3 = np.bincount(g, dev ** 3) / cnt
+
+        if fun == "prod":
+            mM3 = np.minimum(mM3, 0.0)
+            sigmau = np.cbrt(mM3 / ((2 / math.pi) ** (1 / 2) * (1 - 4 / math.pi)))
+
+        if fun == "cost":
+            mM3 = np.where(mM3 < 0, 0.00001, mM3)
+            sigmau = np.cbrt(-mM3 / ((2 / math.pi) ** (1 / 2) * (1 - 4 / math.pi)))
+
+        # standard deviation sigma_v, mean (mu)
+        with np.errstate(invalid="ignore"):
+            sigmav = np.sqrt(mM2 - ((math.pi - 2) / math.pi) * sigmau ** 2)
+        mu = np.sqrt(sigmau ** 2 * 2 / math.pi)
+
+    if method == "QLE":
+
+        # lambda of all groups in one batched search
+        lamda = qle.qlegroup(eps, g, cnt, fun)
+
+        # sigma, mean (mu), sigma.u and sigma.v as in stoned()
+        sigma = np.sqrt(mresid ** 2 / (1 - (2 * lamda ** 2) / (math.pi * (1 + lamda ** 2))))
+        mu = math.sqrt(2) * sigma * lamda / np.sqrt(math.pi * (1 + lamda ** 2))
+        sigmav = np.sqrt(sigma ** 2 / (1 + lamda ** 2))
+        sigmau = sigmav * lamda
+
+    # parameters of each DMU
+    sigmau = sigmau[g]
+    sigmav = sigmav[g]
+    mu = mu[g]
+
+    # expected value of the inefficiency term u  Eq. (3.28) in Johnson and Kuosmanen (2015)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sigmart = sigmau * sigmav / np.sqrt(sigmau ** 2 + sigmav ** 2)
+
+        if fun == "prod":
+            mus = (eps - mu) * sigmau / (sigmav * np.sqrt(sigmau ** 2 + sigmav ** 2))
+            norpdf = 1 / math.sqrt(2 * math.pi) * np.exp(-mus ** 2 / 2)
+            Eu = sigmart * ((norpdf / (1 - norm.cdf(mus) + 0.000001)) - mus)
+            Etheta = ((y - eps + mu) - Eu) / (y - eps + mu)
+
+        if fun == "cost":
+            mus = (eps + mu) * sigmau / (sigmav * np.sqrt(sigmau ** 2 + sigmav ** 2))
+            norpdf = 1 / math.sqrt(2 * math.pi) * np.exp(-mus ** 2 / 2)
+            Eu = sigmart * ((norpdf / (1 - norm.cdf(-mus) + 0.000001)) + mus)
+            Etheta = (Eu - (y - eps - mu)) / (y - eps - mu)
+
+    if cet == "addi":
+        TE = Etheta
+
+    if cet == "mult":
+        TE = np.exp(-Eu)
+
     return Eu, TE
\ No newline at end of file
@@ -1,35 +1,51 @@
-from . import biMatP
-from . import CCNLS
-from . import CCNLS2
-from . import CERDDF
-from . import CNLS
-from . import CNLSDDF
-from . import CNLSPLOT
-from . import CNLSZ
-from . import CQER
-from . import CQRDDF
-from . import DEA
-from . import directV
-from . import kde
-from . import qle
-from . import ICNLS
-from . import StoNED
+# the submodules (and their dependencies: pyomo, scipy, scikit-learn, matplotlib)
+# are imported on first access, e.g. pystoned.CNLS or from pystoned import CNLS
+import importlib
 
 __all__ = [
+    'afriat',
+    'aio',
     'biMatP',
+    'cache',
+    'checkpoint',
     'CCNLS',
     'CCNLS2',
     'CERDDF',
+    'cli',
     'CNLS',
+    'CNLS1D',
+    'CNLSDC',
     'CNLSDDF',
+    'CNLSMULT',
     'CNLSPLOT',
     'CNLSZ',
     'CQER',
     'CQRDDF',
     'DEA',
+    'DEADEC',
+    'dataio',
     'directV',
+    'dupx',
+    'executor',
     'kde',
+    'lpfile',
+    'planner',
     'qle',
     'ICNLS',
-    'StoNED'
-]
\ No newline at end of file
+    'StoNED',
+    'scaling',
+    'shared',
+    'solver'
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        module = importlib.import_module("." + name, __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,54 @@
+"""
+@Title   : Concavity/convexity (Afriat) constraints of single-input models in linear size
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+# Import of the pyomo module
+from pyomo.environ import *
+import numpy as np
+
+
+def neighbours(x):
+    # pairs (k, l) of DMUs that are next to each other in the order of x, x[k] <= x[l]
+
+    order = np.argsort(np.asarray(x, dtype=float).reshape(-1), kind="stable").tolist()
+
+    return list(zip(order[:-1], order[1:]))
+
+
+def sorted1d(model, x, fun, rts, name):
+    # concavity (fun = "prod") or convexity (fun = "cost") constraints of a single-input model
+    # rts     = "vrs"  : hyperplanes a[i] + b[i] * x
+    #         = "crs"  : hyperplanes b[i] * x
+    # name    = name of the constraint component, e.g. "concav" or "qconvex"
+    # for the neighbours k, l in the order of x, the hyperplanes of k and l satisfy the constraints
+    # of the pairs (k, l) and (l, k), and the slopes are monotone (b[k] >= b[l] under concavity);
+    # this implies the constraints of all n*(n-1) pairs with only 3*(n-1) of them.
+    # The component is indexed by the pairs (i, h) like the full one, so cnlsadd() can extend it.
+
+    def hyper(i, h):
+        if rts == "crs":
+            return model.b[h] * x[i]
+        return model.a[h] + model.b[h] * x[i]
+
+    if fun == "prod":
+        shape = Constraint(model.i, model.h, doc='concavity constraint')
+    if fun == "cost":
+        shape = Constraint(model.i, model.h, doc='convexity constraint')
+    model.add_component(name, shape)
+
+    model.slope = Constraint(model.i, doc='monotone slopes between neighbours')
+
+    for k, l in neighbours(x):
+        if fun == "prod":
+            shape.add((k, l), hyper(k, k) <= hyper(k, l))
+            shape.add((l, k), hyper(l, l) <= hyper(l, k))
+            model.slope.add(k, model.b[k] >= model.b[l])
+        if fun == "cost":
+            shape.add((k, l), hyper(k, k) >= hyper(k, l))
+            shape.add((l, k), hyper(l, l) >= hyper(l, k))
+            model.slope.add(k, model.b[k] <= model.b[l])
+
+    return shape
@@ -0,0 +1,135 @@
+"""
+@Title   : asyncio interface: estimations awaited without blocking the event loop
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+# e.g. in a coroutine:
+#     est = await aio.fit(CNLS.cnls, y, x, "addi", "prod", "vrs", solver="mosek")
+#     gate = aio.gate(8)   # at most 8 estimations at a time, shared by all callers
+#     est = await aio.fit(CNLS.cnls, y, x, "addi", "prod", "vrs", solver="mosek", gate=gate)
+#     with aio.pool(4) as ex:   # reused processes for many short estimations
+#         est = await aio.fit(CNLS.cnls, y, x, "addi", "prod", "vrs", solver="mosek", pool=ex)
+
+from . import cache
+from . import solver as slv
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
+
+# start method of the estimation processes: never fork, the event loop's threads (and their locks)
+# would be copied into the child half-way; forkserver forks from a clean server process that has
+# imported pyomo once, instead of spawning (and importing into) a new interpreter for every call
+if "forkserver" in multiprocessing.get_all_start_methods():
+    CONTEXT = multiprocessing.get_context("forkserver")
+    CONTEXT.set_forkserver_preload(["pystoned.solver"])
+else:
+    CONTEXT = multiprocessing.get_context("spawn")
+
+
+def pool(workers=None):
+    # process pool for call(..., pool=...) started the same way as the processes of call()
+    # workers = number of processes (None: one per CPU)
+
+    return ProcessPoolExecutor(max_workers=workers, mp_context=CONTEXT)
+
+
+def gate(limit):
+    # back-pressure: at most limit estimations run at the same time; the others wait their turn
+
+    return asyncio.Semaphore(limit)
+
+
+async def call(fn, *args, pool=None, gate=None, **kwargs):
+    # fn(*args, **kwargs) off the event loop
+    # pool = None     : a process of its own (CONTEXT), terminated when the awaiting task is cancelled
+    #      = executor : concurrent.futures executor (executor.get()); cancelling the awaiting task
+    #                   cancels the call only if it has not started
+    # gate = semaphore of gate(): waits for a free slot before starting
+
+    if gate is None:
+        return await _call(fn, args, kwargs, pool)
+
+    async with gate:
+        return await _call(fn, args, kwargs, pool)
+
+
+async def fit(estimator, *args, pool=None, gate=None, **kwargs):
+    # solver.fit(estimator, *args, **kwargs): build the model, solve it and return the estimates
+
+    return await call(slv.fit, estimator, *args, pool=pool, gate=gate, **kwargs)
+
+
+async def cached(estimator, *args, pool=None, gate=None, **kwargs):
+    # cache.cached(estimator, *args, **kwargs): stored estimates, or fit and store them
+
+    return await call(cache.cached, estimator, *args, pool=pool, gate=gate, **kwargs)
+
+
+async def fitmany(estimator, arglist, limit=4, pool=None, **kwargs):
+    # estimates of estimator(*args, **kwargs) for each args of arglist, in order, with at most
+    # limit estimations at a time; cancelling fitmany cancels all of them
+
+    g = gate(limit)
+
+    return await asyncio.gather(*[fit(estimator, *args, pool=pool, gate=g, **kwargs) for args in arglist])
+
+
+async def _call(fn, args, kwargs, pool):
+
+    loop = asyncio.get_running_loop()
+
+    if pool is not None:
+        return await asyncio.wrap_future(pool.submit(fn, *args, **kwargs), loop=loop)
+
+    recv, send = CONTEXT.Pipe(duplex=False)
+    proc = CONTEXT.Process(target=_child, args=(send, fn, args, kwargs), daemon=True)
+    proc.start()
+    send.close()
+
+    try:
+        # a thread waits for the result; the pipe is closed when the process ends
+        status, result = await loop.run_in_executor(None, _receive, recv)
+    except asyncio.CancelledError:
+        proc.terminate()
+        raise
+    finally:
+        await loop.run_in_executor(None, _reap, proc)
+        recv.close()
+
+    if status == "error":
+        raise result
+
+    return result
+
+
+def _child(send, fn, args, kwargs):
+
+    try:
+        reply = ("ok", fn(*args, **kwargs))
+    except Exception as err:
+        reply = ("error", err)
+
+    try:
+        send.send(reply)
+    except Exception as err:
+        # the result or the exception cannot be pickled
+        send.send(("error", RuntimeError("%s: %s" % (type(err).__name__, err))))
+    send.close()
+
+
+def _reap(proc):
+
+    proc.join(1)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+
+
+def _receive(recv):
+
+    try:
+        return recv.recv()
+    except (EOFError, OSError):
+        return "error", RuntimeError("the estimation process ended without a result")
@@ -40,3 +40,35 @@ def bimatp(x):
 
     p = p.tolist()
     return p
+
+
+def nondom(y, x, b=None):
+    # indices of the DMUs that are not dominated by another DMU
+    # (no other DMU uses less of every input and produces more of every output; with undesirable
+    # outputs b, only DMUs with the same undesirable outputs are compared)
+
+    # number of DMUs
+    n = len(y)
+
+    # outputs (more is better) and inputs (less is better) in one array
+    u = np.concatenate([np.asarray(y, dtype=float).reshape(n, -1), -np.asarray(x, dtype=float).reshape(n, -1)], axis=1)
+    if b is not None:
+        b = np.asarray(b, dtype=float).reshape(n, -1)
+
+    keep = np.ones(n, dtype=bool)
+
+    # compare a block of DMUs against all DMUs at a time
+    block = max(1, 10 ** 7 // (n * u.shape[1]))
+    for start in range(0, n, block):
+        stop = min(n, start + block)
+        ge = (u[None, :, :] >= u[start:stop, None, :]).all(axis=2)
+        gt = (u[None, :, :] > u[start:stop, None, :]).any(axis=2)
+        if b is not None:
+            ge &= (b[None, :, :] == b[start:stop, None, :]).all(axis=2)
+
+        # identical DMUs: only the first one is kept
+        same = ge & ~gt & (np.arange(n)[None, :] < np.arange(start, stop)[:, None])
+
+        keep[start:stop] = ~((ge & gt) | same).any(axis=1)
+
+    return np.flatnonzero(keep)
@@ -0,0 +1,200 @@
+"""
+@Title   : on-disk cache of the estimates keyed by the data and all arguments
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+from . import solver as slv
+import numpy as np
+import hashlib
+import os
+import tempfile
+import zipfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# bump when the layout of the stored estimates changes
+VERSION = "1"
+
+
+def cached(estimator, *args, solver="ipopt", options=None, cachedir=None, maxsize=2 ** 30, **kwargs):
+    # estimator = pystoned function, e.g. CNLS.cnls, DEA.dea or StoNED.stoned
+    # args      = arguments of the estimator, e.g. y, x, cet, fun, rts
+    # solver    = name of the solver passed to pyomo's SolverFactory
+    # options   = dictionary of solver options
+    # cachedir  = cache directory (default: $PYSTONED_CACHE or ~/.cache/pystoned)
+    # maxsize   = maximum size of the cache directory in bytes
+
+    cachedir = directory(cachedir)
+    os.makedirs(cachedir, exist_ok=True)
+
+    # the progress callback does not change the estimates
+    keyed = {k: v for k, v in kwargs.items() if k != "callback"}
+    path = os.path.join(cachedir, key(estimator, args, keyed, solver, options) + ".npz")
+
+    # return the stored estimates without rebuilding or re-solving the model
+    est = load(path)
+    if est is not None:
+        return est
+
+    est = slv.fit(estimator, *args, solver=solver, options=options, **kwargs)
+
+    store(path, est)
+    evict(cachedir, maxsize)
+
+    return est
+
+
+def directory(cachedir=None):
+    # default cache directory
+
+    if cachedir is None:
+        cachedir = os.environ.get("PYSTONED_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "pystoned"))
+
+    return cachedir
+
+
+def key(estimator, args, kwargs, solver, options):
+    # content hash of the estimator, the data, all arguments and the solver settings; TypeError for
+    # arguments without a faithful key (_feed)
+
+    h = hashlib.sha256()
+    _feed(h, VERSION)
+    _feed(h, estimator.__module__ + "." + estimator.__qualname__)
+    _feed(h, list(args))
+    _feed(h, kwargs)
+    _feed(h, solver)
+    _feed(h, options)
+
+    return h.hexdigest()
+
+
+# values whose repr is the value itself
+SCALARS = (type(None), bool, int, float, complex, str, bytes, np.generic, type(Ellipsis))
+
+
+def _feed(h, obj):
+    # arrays by their bytes, containers item by item, scalars by repr; pandas and other array-likes
+    # as arrays (their repr is truncated); anything else has no faithful key
+
+    if isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        h.update(("nd%s%s" % (arr.dtype.str, arr.shape)).encode())
+        if arr.dtype.hasobject:
+            _feed(h, arr.reshape(-1).tolist())
+        else:
+            h.update(arr.tobytes())
+
+    elif isinstance(obj, SCALARS):
+        h.update(("%s:%r;" % (type(obj).__name__, obj)).encode())
+
+    elif isinstance(obj, (list, tuple)):
+        h.update(("%s%d" % (type(obj).__name__, len(obj))).encode())
+        for item in obj:
+            _feed(h, item)
+
+    elif isinstance(obj, dict):
+        h.update(("dict%d" % len(obj)).encode())
+        for k in sorted(obj, key=repr):
+            _feed(h, k)
+            _feed(h, obj[k])
+
+    elif isinstance(obj, (set, frozenset)):
+        h.update(("set%d" % len(obj)).encode())
+        for item in sorted(obj, key=repr):
+            _feed(h, item)
+
+    elif hasattr(obj, "__array__"):
+        # pandas Series/DataFrame: the values and the column names
+        h.update(type(obj).__name__.encode())
+        _feed(h, np.asarray(obj))
+        if hasattr(obj, "columns"):
+            _feed(h, [str(c) for c in obj.columns])
+
+    else:
+        raise TypeError("cannot key an argument of type %s: pass arrays, numbers, strings or lists, "
+                        "tuples and dictionaries of them" % type(obj).__name__)
+
+
+def load(path):
+    # read the stored estimates, or None if they are not (or no longer) in the cache
+
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            est = {k: data[k] for k in data.files}
+    except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile):
+        return None
+
+    # mark as recently used (least recently used eviction)
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    # estimators returning a tuple of arrays, e.g. StoNED.stoned
+    if "__tuple__" in est:
+        return tuple(est["arr_%d" % k] for k in range(int(est["__tuple__"])))
+
+    return est
+
+
+def store(path, est):
+    # write to a temporary file first so that concurrent readers never see a partial file
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if isinstance(est, tuple):
+                np.savez(f, *[np.asarray(v) for v in est], __tuple__=np.array(len(est)))
+            else:
+                np.savez(f, **est)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def evict(cachedir, maxsize):
+    # remove the least recently used entries until the cache fits in maxsize bytes
+
+    with open(os.path.join(cachedir, ".lock"), "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+        entries = []
+        for name in os.listdir(cachedir):
+            if not name.endswith(".npz"):
+                continue
+            try:
+                st = os.stat(os.path.join(cachedir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= maxsize:
+                break
+            try:
+                os.remove(os.path.join(cachedir, name))
+            except OSError:
+                pass
+            total -= size
+
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def clear(cachedir=None):
+    # remove all stored estimates
+
+    cachedir = directory(cachedir)
+    if not os.path.isdir(cachedir):
+        return
+
+    evict(cachedir, 0)
@@ -0,0 +1,219 @@
+"""
+@Title   : checkpoints of long runs: finished units are stored and skipped when the run is resumed
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+from . import cache, executor
+from concurrent.futures import as_completed
+import numpy as np
+import json
+import os
+import tempfile
+
+
+def folder(checkpoint, fn, args=(), kwargs=None, key=None):
+    # directory of the checkpoints of one run: a run with other data or arguments never
+    # resumes from it
+    # fn  = named function; the key covers its code, defaults and closure (identity()), but not the
+    #       global variables it reads: pass the data in args/kwargs, or a version of it in key
+    # key = anything else that changes the results (numbers, strings, arrays)
+
+    tag = [identity(fn), key] + list(args)
+    path = os.path.join(checkpoint, cache.key(fn, tag, kwargs or {}, None, None)[:24])
+    os.makedirs(path, exist_ok=True)
+
+    return path
+
+
+def identity(fn):
+    # code, default arguments and closure values of fn, for the key of its checkpoints;
+    # lambdas are rejected: all lambdas of a module have the same name
+
+    if getattr(fn, "__name__", None) == "<lambda>":
+        raise ValueError("the checkpoints of a lambda cannot be told apart; use a named function")
+
+    return _function(fn, set())
+
+
+def _function(fn, seen):
+    # functions among the defaults and closure values by their own code (the repr of a function
+    # or code object holds its address); seen stops at recursive closures
+
+    code = getattr(fn, "__code__", None)
+    if code is None or id(fn) in seen:
+        return getattr(fn, "__qualname__", None)
+    seen.add(id(fn))
+
+    values = list(fn.__defaults__ or ()) + sorted((fn.__kwdefaults__ or {}).items())
+    values += [cell.cell_contents for cell in fn.__closure__ or ()]
+
+    return _code(code), [_function(v, seen) if hasattr(v, "__code__") else v for v in values]
+
+
+def _code(code):
+    # bytecode, names and constants of a code object and of the functions defined in it
+
+    consts = tuple(_code(c) if hasattr(c, "co_code") else c for c in code.co_consts)
+
+    return code.co_code, code.co_names, code.co_varnames, consts
+
+
+def run(fn, tasks, directory=None, workers=1):
+    # results of fn(*task) for the tasks in order
+    # directory = checkpoint directory (folder()): the result of each task is stored when it
+    #             finishes, and the stored results are loaded instead of running their tasks again
+    # workers   = number of processes or an executor (executor.get()); 1 runs the tasks here
+    # the results are arrays, tuples of arrays or dictionaries of arrays
+
+    results = [None] * len(tasks)
+    todo = []
+    for k, task in enumerate(tasks):
+        if directory is not None:
+            results[k] = load(_unit(directory, k))
+        if results[k] is None:
+            todo.append(k)
+
+    done = len(tasks) - len(todo)
+
+    if workers == 1 or len(todo) <= 1:
+        for k in todo:
+            done += 1
+            results[k] = _done(directory, k, fn(*tasks[k]), done)
+        return results
+
+    with executor.pool(workers) as pool:
+        futures = {pool.submit(fn, *tasks[k]): k for k in todo}
+        for future in as_completed(futures):
+            done += 1
+            k = futures[future]
+            results[k] = _done(directory, k, future.result(), done)
+
+    return results
+
+
+def replicate(fn, reps, checkpoint=None, seed=0, workers=1, args=(), kwargs=None, key=None):
+    # bootstrap or Monte Carlo replicates fn(rng, *args, **kwargs), r = 0, ..., reps - 1
+    # rng        = np.random.default_rng([seed, r]): the random numbers of a replicate do not
+    #              depend on the other replicates, so a resumed run gives the same results
+    # checkpoint = directory of the checkpoints (resumed when the same run is started again); fn is
+    #              then a named function and its data is passed in args/kwargs or versioned in key
+    # e.g. def boot(rng, y, x): return slv.fit(CNLS.cnls, ystar(rng, y), x, ...)
+    #      replicate(boot, 500, "ckpt", args=(y, x))
+
+    kwargs = kwargs or {}
+    directory = None
+    if checkpoint is not None:
+        directory = folder(checkpoint, fn, [reps, seed] + list(args), kwargs, key)
+        _state(directory, seed=seed, reps=reps)
+
+    tasks = [(fn, seed, r, args, kwargs) for r in range(reps)]
+
+    return run(_replicate, tasks, directory, workers)
+
+
+def _replicate(fn, seed, r, args, kwargs):
+
+    return fn(np.random.default_rng([seed, r]), *args, **kwargs)
+
+
+def _unit(directory, k):
+
+    return os.path.join(directory, "unit-%d.npz" % k)
+
+
+def _done(directory, k, result, done):
+    # store the result of task k; done = number of finished tasks
+
+    if directory is not None:
+        store(_unit(directory, k), result)
+        _state(directory, done=done)
+
+    return result
+
+
+def _state(directory, **info):
+    # state.json: seed, number of replicates and of finished tasks (for monitoring)
+
+    path = os.path.join(directory, "state.json")
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    state.update(info)
+
+    write(path, json.dumps(state))
+
+
+# python scalars stored as 0-d arrays and given back with their type (numpy scalars: "numpy")
+SCALARS = {'bool': bool, 'int': int, 'float': float, 'complex': complex, 'str': str}
+
+
+def store(path, result):
+    # a dictionary of arrays, an array, a scalar or a tuple of arrays and scalars; the layout and
+    # the python types of the scalars go to '__types__', so that load() gives back the same types.
+    # ValueError for a result that np.load cannot read without pickle (None, ragged lists, objects)
+
+    if isinstance(result, dict):
+        layout, items = "dict", result
+    elif isinstance(result, tuple):
+        layout, items = "tuple", {"arr_%d" % k: v for k, v in enumerate(result)}
+    else:
+        layout, items = "value", {'__array__': result}
+
+    data = {}
+    types = {}
+    for name, val in items.items():
+        try:
+            arr = np.asarray(val)
+        except ValueError:
+            arr = np.empty(0, dtype=object)
+        if arr.dtype.hasobject:
+            raise ValueError("cannot store %s: %r is not an array of numbers or strings"
+                             % ("the result" if layout == "value" else name, val))
+        data[name] = arr
+        if type(val).__name__ in SCALARS:
+            types[name] = type(val).__name__
+        elif isinstance(val, np.generic):
+            types[name] = "numpy"
+
+    data['__types__'] = np.array(json.dumps({'layout': layout, 'scalars': types}))
+    cache.store(path, data)
+
+
+def load(path):
+    # stored result, or None
+
+    result = cache.load(path)
+    if not isinstance(result, dict) or '__types__' not in result:
+        return None
+
+    types = json.loads(str(result.pop('__types__')))
+    for name, kind in types['scalars'].items():
+        if kind == "numpy":
+            result[name] = result[name][()]
+        else:
+            result[name] = SCALARS[kind](result[name].item())
+
+    if types['layout'] == "tuple":
+        return tuple(result["arr_%d" % k] for k in range(len(result)))
+    if types['layout'] == "value":
+        return result['__array__']
+
+    return result
+
+
+def write(path, text):
+    # replace the file at once: a crash never leaves a partial file
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
@@ -0,0 +1,267 @@
+"""
+@Title   : command-line batch runner of estimation jobs
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+from . import CNLS, CNLS1D, CNLSMULT, CNLSZ, CQER, DEA, DEADEC, StoNED
+from . import cache, checkpoint, dataio, executor
+from . import solver as slv
+from concurrent.futures import as_completed
+import numpy as np
+import argparse
+import inspect
+import json
+import os
+import time
+
+# estimators available to the jobs
+ESTIMATORS = {
+    'cnls': CNLS.cnls,
+    'cnls1d': CNLS1D.cnls1d,
+    'ccnls1d': CNLS1D.ccnls1d,
+    'cqr': CQER.cqr,
+    'cer': CQER.cer,
+    'cnlsmult': CNLSMULT.cnlsmult,
+    'cqrmult': CNLSMULT.cqrmult,
+    'cermult': CNLSMULT.cermult,
+    'cnlsz': CNLSZ.cnlsz,
+    'cqrz': CNLSZ.cqrz,
+    'cerz': CNLSZ.cerz,
+    'dea': DEA.dea,
+    'deaddf': DEA.deaddf,
+    'deaddfb': DEA.deaddfb,
+    'deadec': DEADEC.dea,
+}
+
+# columns of the data file
+DATA = ('y', 'x', 'z', 'b')
+
+
+def main(argv=None):
+    # pystoned spec.json [--workers N] [--executor KIND] [--hosts HOST:PORT,...] [--checkpoint DIR]
+    # the job spec is a JSON list of jobs, or {"workers": N, "jobs": [...]}; each job is e.g.
+    #   {"name": "cnls2025", "data": "firms.csv", "y": "output", "x": ["labour", "capital"],
+    #    "estimator": "cnls", "cet": "addi", "fun": "prod", "rts": "vrs",
+    #    "solver": "mosek", "options": {}, "timelimit": 3600, "method": "MoM", "output": "cnls2025.npz"}
+    # "scale": true solves the job on rescaled data (solver.fit(..., scale=True))
+    # one JSON line with the timing, the status, the termination condition and the solver iterations
+    # is printed per job; the exit status is 1 if any job failed, hit a limit or did not converge
+    # --executor socket runs the jobs on worker nodes (python -m pystoned.executor); the data and
+    # output paths of the spec must be valid on the nodes
+    # --checkpoint DIR stores the report of each finished job; a restarted batch prints the stored
+    # reports of the jobs that succeeded (unchanged jobs only) and runs the others
+
+    parser = argparse.ArgumentParser(prog="pystoned", description="run a batch of pystoned estimation jobs")
+    parser.add_argument("spec", help="JSON job spec")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of jobs run concurrently")
+    parser.add_argument("--executor", choices=executor.KINDS, default=None,
+                        help="where the jobs run (default: process)")
+    parser.add_argument("--hosts", default=None, help="comma-separated host:port of the worker nodes (socket)")
+    parser.add_argument("--checkpoint", default=None, help="directory of the reports of the finished jobs")
+    args = parser.parse_args(argv)
+
+    with open(args.spec) as f:
+        spec = json.load(f)
+
+    if isinstance(spec, list):
+        spec = {'jobs': spec}
+
+    # relative paths in the spec are relative to the spec file
+    base = os.path.dirname(os.path.abspath(args.spec))
+    jobs = [_resolve(job, base, k) for k, job in enumerate(spec['jobs'])]
+
+    workers = args.workers or spec.get('workers') or os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    kind = args.executor or spec.get('executor', "process")
+    hosts = args.hosts.split(",") if args.hosts else spec.get('hosts')
+
+    ckpt = args.checkpoint or spec.get('checkpoint')
+    if ckpt is not None:
+        ckpt = os.path.join(base, ckpt) if args.checkpoint is None else ckpt
+        os.makedirs(ckpt, exist_ok=True)
+
+    failed = 0
+    with executor.get(kind, workers, hosts) as pool:
+        futures = {}
+        for job in jobs:
+            report = _finished(ckpt, job)
+            if report is not None:
+                print(json.dumps(report), flush=True)
+                continue
+            futures[pool.submit(run, job)] = job
+
+        for future in as_completed(futures):
+            # the job itself reports its errors; this is the executor failing (a lost worker, a job
+            # that cannot be sent)
+            try:
+                report = future.result()
+            except Exception as err:
+                report = {'job': futures[future].get('name'), 'status': "error",
+                          'error': "%s: %s" % (type(err).__name__, err)}
+            if report['status'] != "ok":
+                failed += 1
+            elif ckpt is not None:
+                checkpoint.write(_report(ckpt, futures[future]), json.dumps(report))
+            print(json.dumps(report), flush=True)
+
+    return 1 if failed else 0
+
+
+def _report(ckpt, job):
+    # file of the report of a job: its name and a hash of its settings and of the size and
+    # modification time of its data file
+
+    try:
+        st = os.stat(job['data'])
+        stamp = [st.st_size, st.st_mtime_ns]
+    except (OSError, KeyError):
+        stamp = None
+
+    return os.path.join(ckpt, "%s-%s.json" % (job['name'], cache.key(run, [job, stamp], {}, None, None)[:16]))
+
+
+def _finished(ckpt, job):
+    # stored report of a job that succeeded, or None
+
+    if ckpt is None:
+        return None
+
+    try:
+        with open(_report(ckpt, job)) as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    report['resumed'] = True
+
+    return report
+
+
+def _resolve(job, base, k):
+
+    job = dict(job)
+    job.setdefault('name', "job%d" % k)
+    for key in ('data', 'output'):
+        if key in job and not os.path.isabs(job[key]):
+            job[key] = os.path.join(base, job[key])
+    for key in ('cache', 'checkpoint'):
+        if isinstance(job.get(key), str) and not os.path.isabs(job[key]):
+            job[key] = os.path.join(base, job[key])
+
+    return job
+
+
+def run(job):
+    # run one job and return its report; errors are reported, not raised
+
+    report = {'job': job.get('name'), 'status': "ok"}
+    start = time.perf_counter()
+
+    try:
+        trace = {}
+        est = estimate(job, trace)
+        report['dropped'] = int(len(est['dropped']))
+        # cells of the data that are not finite numbers, per column
+        if trace.get('coerced'):
+            report['coerced'] = trace['coerced']
+        # iterations of the solver log (not known for cached or solver-free estimates)
+        if 'iterations' in trace:
+            report['iterations'] = trace['iterations']
+        # a job stopped by a limit (with the best solution found) or that did not converge is not
+        # ok: it counts as failed and is run again when resumed
+        if 'status' in trace:
+            report['termination'] = trace['status']
+            if trace['status'] not in [str(cond) for cond in slv.OPTIMAL]:
+                report['status'] = "limit"
+        if 'converged' in est and not est['converged']:
+            report['status'] = "not converged"
+        if job.get('output'):
+            save(job['output'], est)
+            report['output'] = job['output']
+    except Exception as err:
+        report['status'] = "failed"
+        report['error'] = "%s: %s" % (type(err).__name__, err)
+
+    report['seconds'] = round(time.perf_counter() - start, 3)
+
+    return report
+
+
+def estimate(job, trace=None):
+    # estimates of one job as a dictionary of arrays
+    # trace = dictionary updated with the progress of the solve (solver.run callback) and the cells
+    #         of the data that are not finite numbers ('coerced', dataio.read)
+
+    estimator = ESTIMATORS[job['estimator']]
+
+    data = dataio.read(job['data'], job['y'], job['x'], z=job.get('z'), b=job.get('b'),
+                       chunksize=job.get('chunksize', 100000))
+    if trace is not None:
+        trace['coerced'] = data.pop('coerced')
+
+    # arguments of the estimator: data columns first, the remaining ones from the job
+    # (optional arguments such as form or screen keep their default unless given)
+    args = []
+    kwargs = {}
+    for name, par in inspect.signature(estimator).parameters.items():
+        # the solver settings go through solver.fit
+        if name in ('solver', 'options'):
+            continue
+        if par.default is not inspect.Parameter.empty:
+            # optional data columns, e.g. z of cnlsmult
+            if name in DATA and name in data:
+                kwargs[name] = data[name]
+            elif name in job:
+                kwargs[name] = job[name]
+        elif name in DATA:
+            args.append(data[name])
+        elif name in job:
+            args.append(job[name])
+        else:
+            raise ValueError("argument %s of %s is missing" % (name, job['estimator']))
+
+    solver = job.get('solver', "ipopt")
+    options = job.get('options')
+    # rescaled data: solver.fit(..., scale=True), also cached under its own key
+    if job.get('scale'):
+        kwargs['scale'] = True
+
+    # time/iteration limits: the best solution found when a limit is hit (never cached)
+    limits = {'timelimit': job.get('timelimit'), 'iterlimit': job.get('iterlimit')}
+
+    if job.get('cache') and limits == {'timelimit': None, 'iterlimit': None}:
+        cachedir = job['cache'] if isinstance(job['cache'], str) else None
+        est = cache.cached(estimator, *args, solver=solver, options=options, cachedir=cachedir, **kwargs)
+    else:
+        callback = trace.update if trace is not None else None
+        est = slv.fit(estimator, *args, solver=solver, options=options, callback=callback, **limits, **kwargs)
+
+    if not isinstance(est, dict):
+        est = {'theta': np.asarray(est)}
+    est = dict(est)
+
+    # decomposition of the residuals (method = "MoM" or "QLE")
+    if job.get('method'):
+        if 'e' in est:
+            eps = est['e']
+        else:
+            eps = est['ep'] - est['em']
+        est['Eu'], est['TE'] = StoNED.stoned(data['y'], eps, job['fun'], job['method'], job['cet'])
+
+    est['dropped'] = data['dropped']
+
+    return est
+
+
+def save(path, est):
+    # compressed npz file with one array per estimate
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    np.savez_compressed(path, **{k: np.asarray(v) for k, v in est.items()})
+
@@ -0,0 +1,144 @@
+"""
+@Title   : read the estimator inputs (y, x, z, b) from CSV or Parquet files in chunks
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+import numpy as np
+import csv
+import os
+import warnings
+
+# text of the missing cells of a CSV file (other cells that are not numbers are reported)
+MISSING = ("", "NA", "N/A", "NaN", "nan", "null", "NULL", "None")
+
+
+def read(path, y, x, z=None, b=None, chunksize=100000):
+    # path      = .csv or .parquet file
+    # y, x      = column name(s) of the outputs and inputs
+    # z, b      = column name(s) of the z-variables and undesirable outputs (optional)
+    # chunksize = number of rows read at a time; only the selected columns are read
+    # rows with missing, non-numeric or infinite values are dropped and reported in 'dropped'; the
+    # cells that were present but not finite numbers are counted per column in 'coerced' (a warning
+    # is issued when there are any)
+
+    # selected columns of each block
+    blocks = {'y': y, 'x': x, 'z': z, 'b': b}
+    blocks = {key: ([col] if isinstance(col, str) else list(col)) for key, col in blocks.items() if col is not None}
+    cols = [col for key in blocks for col in blocks[key]]
+
+    if os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        chunks = _parquet(path, cols, chunksize)
+    else:
+        chunks = _csv(path, cols, chunksize)
+
+    # keep the complete rows of each chunk
+    kept = []
+    dropped = []
+    coerced = np.zeros(len(cols), dtype=int)
+    start = 0
+    for chunk, bad in chunks:
+        ok = np.isfinite(chunk).all(axis=1)
+        kept.append(chunk[ok])
+        dropped.append(start + np.flatnonzero(~ok))
+        coerced += bad
+        start += len(chunk)
+
+    if coerced.any():
+        warnings.warn("%s: rows with cells that are not finite numbers were dropped (%s)" % (
+            path, ", ".join("%s: %d" % (col, c) for col, c in zip(cols, coerced) if c)), RuntimeWarning)
+
+    data = np.concatenate(kept) if kept else np.empty((0, len(cols)))
+
+    # contiguous float64 arrays in the layout of the estimators:
+    # one column gives a vector, several columns give an (n x k) array
+    out = {}
+    pos = 0
+    for key in blocks:
+        k = len(blocks[key])
+        arr = data[:, pos:pos + k]
+        out[key] = np.ascontiguousarray(arr[:, 0] if k == 1 else arr)
+        pos += k
+
+    out['dropped'] = np.concatenate(dropped) if dropped else np.empty(0, dtype=int)
+    out['coerced'] = {col: int(c) for col, c in zip(cols, coerced) if c}
+
+    return out
+
+
+def _csv(path, cols, chunksize):
+    # chunks of the selected columns and the number of present cells per column that are not
+    # finite numbers; missing and non-numeric values become nan
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+
+    if pd is not None:
+        for frame in pd.read_csv(path, usecols=cols, chunksize=chunksize, dtype=str, keep_default_na=False):
+            chunk = np.empty((len(frame), len(cols)))
+            bad = np.zeros(len(cols), dtype=int)
+            for k, col in enumerate(cols):
+                text = frame[col].str.strip()
+                chunk[:, k] = pd.to_numeric(text, errors="coerce").to_numpy(dtype=float)
+                bad[k] = np.sum(~np.isfinite(chunk[:, k]) & ~text.isin(MISSING).to_numpy())
+            yield chunk, bad
+        return
+
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        missing = [col for col in cols if col not in header]
+        if missing:
+            raise ValueError("columns not found in %s: %s" % (path, ", ".join(missing)))
+        pos = [header.index(col) for col in cols]
+
+        chunk = np.empty((chunksize, len(cols)))
+        bad = np.zeros(len(cols), dtype=int)
+        k = 0
+        for row in reader:
+            for c, p in enumerate(pos):
+                text = row[p].strip() if p < len(row) else ""
+                try:
+                    chunk[k, c] = float(text)
+                except ValueError:
+                    chunk[k, c] = np.nan
+                if text not in MISSING and not np.isfinite(chunk[k, c]):
+                    bad[c] += 1
+            k += 1
+            if k == chunksize:
+                yield chunk.copy(), bad
+                bad = np.zeros(len(cols), dtype=int)
+                k = 0
+        if k > 0:
+            yield chunk[:k].copy(), bad
+
+
+def _parquet(path, cols, chunksize):
+    # chunks of the selected columns (requires pyarrow) and the number of non-null values per
+    # column that are not finite (nan, inf); null values become nan
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("reading Parquet files requires pyarrow")
+
+    pf = pq.ParquetFile(path)
+
+    for col in cols:
+        field = pf.schema_arrow.field(col)
+        if not (pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+                or pa.types.is_decimal(field.type)):
+            raise TypeError("column %s of %s is not numeric (%s)" % (col, path, field.type))
+
+    for batch in pf.iter_batches(batch_size=chunksize, columns=cols):
+        chunk = np.empty((batch.num_rows, len(cols)))
+        bad = np.zeros(len(cols), dtype=int)
+        for k, col in enumerate(cols):
+            arr = batch.column(batch.schema.get_field_index(col)).cast(pa.float64())
+            chunk[:, k] = arr.to_numpy(zero_copy_only=False)
+            bad[k] = np.sum(~np.isfinite(chunk[:, k])) - arr.null_count
+        yield chunk, bad
@@ -0,0 +1,177 @@
+"""
+@Title   : DMUs with identical inputs: one hyperplane per distinct input vector
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+# Import of the pyomo module
+from pyomo.environ import *
+import numpy as np
+
+
+def groups(x):
+    # distinct input vectors (one row each), the group of each DMU and the size of each group
+
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+
+    xu, grp, w = np.unique(x.reshape(n, -1), axis=0, return_inverse=True, return_counts=True)
+
+    return xu, grp.reshape(-1), w
+
+
+def average(v, grp, w):
+    # mean of v (vector or n x q array) in each group and the deviation of each DMU from it
+
+    v = np.asarray(v, dtype=float)
+    if v.ndim == 1:
+        mean = np.bincount(grp, weights=v, minlength=len(w)) / w
+    else:
+        mean = np.column_stack([np.bincount(grp, weights=col, minlength=len(w)) for col in v.T])
+        mean = mean.reshape(len(w), -1) / w[:, None]
+
+    return mean, v - mean[grp]
+
+
+def collapse(y, x, cet):
+    # data of the weighted least squares problem with one DMU per distinct input vector:
+    # the sum of squares of a group sharing the fitted value is w_g * (mean - fit)^2 plus the
+    # within-group sum of squares, so the mean output (geometric mean under cet = "mult") replaces
+    # the outputs of the group
+
+    y = np.asarray(y, dtype=float).reshape(-1)
+    xu, grp, w = groups(x)
+
+    if cet == "mult":
+        ly, dev = average(np.log(y), grp, w)
+        yg = np.exp(ly)
+    else:
+        yg, dev = average(y, grp, w)
+
+    # same layout as the input: a vector with one input
+    if np.ndim(x) == 1:
+        xu = xu[:, 0]
+
+    return yg, xu, grp, w, dev
+
+
+def weigh(model, grp, w, dev):
+    # least squares with one residual per group, weighted by the number of DMUs in the group
+
+    # the within-group sum of squares is a constant: the objective value is that of the DMUs
+    model.w = Param(model.i, initialize=dict(enumerate(w.tolist())), doc='number of DMUs')
+    model.ss = Param(initialize=float(np.dot(dev, dev)), mutable=True, doc='within-group sum of squares')
+    model.objective.set_value(sum(model.w[i] * model.e[i] * model.e[i] for i in model.i) + model.ss)
+
+    # residuals of the DMUs: solver.values() adds the deviations from the group means
+    model.grp = grp
+    model.dev = dev
+
+    return model
+
+
+def regroup(model, y):
+    # group outputs of new data y of a weighted model (solver.update); updates the deviations
+
+    w = np.array([value(model.w[i]) for i in model.i], dtype=float)
+    y = np.asarray(y, dtype=float).reshape(-1)
+
+    # multiplicative composite error term: geometric means
+    if hasattr(model, "qreg"):
+        yg, model.dev = average(np.log(y), model.grp, w)
+        yg = np.exp(yg)
+    else:
+        yg, model.dev = average(y, model.grp, w)
+
+    model.ss = float(np.dot(model.dev, model.dev))
+
+    return yg
+
+
+def share(model, y, x, grp, loss, cet, rts):
+    # quantile/expectile regression: the DMUs of a group share its hyperplane but keep their own
+    # residuals (the asymmetric loss of a group does not reduce to one residual)
+    # model   = cqr/cer model built on one DMU per distinct input vector
+    # loss    = "cqr" : quantile regression
+    #         = "cer" : expectile regression
+    # x       = distinct input vectors
+
+    y = np.asarray(y, dtype=float).reshape(-1)
+    n = len(y)
+    x = np.asarray(x, dtype=float).reshape(len(x), -1).tolist()
+
+    def hyper(model, g):
+        arow = x[g]
+        if model.b.dim() == 1:
+            bx = model.b[g] * arow[0]
+        else:
+            bx = quicksum(model.b[g, j] * arow[j] for j in model.j)
+        if rts == "crs":
+            return bx
+        return model.a[g] + bx
+
+    for name in ("reg", "qreg", "objective", "ep", "em", "y"):
+        if hasattr(model, name):
+            model.del_component(name)
+
+    # Set
+    model.o = Set(initialize=range(n), doc='DMUs')
+
+    # Parameters
+    model.y = Param(model.o, initialize=dict(enumerate(y.tolist())), mutable=True, doc='output')
+
+    # Variables
+    model.ep = Var(model.o, bounds=(0.0, None), doc='error term plus')
+    model.em = Var(model.o, bounds=(0.0, None), doc='error term minus')
+
+    # Objective function
+    def objective_rule(model):
+        if loss == "cer":
+            return model.tau * sum(model.ep[o] ** 2 for o in model.o) + (1 - model.tau) * sum(
+                model.em[o] ** 2 for o in model.o)
+        return model.tau * sum(model.ep[o] for o in model.o) + (1 - model.tau) * sum(model.em[o] for o in model.o)
+
+    model.objective = Objective(rule=objective_rule, sense=minimize, doc='objective function')
+
+    # Additive composite error term
+    if cet == "addi":
+
+        def reg_rule(model, o):
+            return model.y[o] == hyper(model, grp[o]) + model.ep[o] - model.em[o]
+
+        model.reg = Constraint(model.o, rule=reg_rule, doc='regression equation')
+
+    # Multiplicative composite error term
+    if cet == "mult":
+
+        def qreg_rule(model, o):
+            return log(model.y[o]) == log(model.f[grp[o]] + 1) + model.ep[o] - model.em[o]
+
+        model.qreg = Constraint(model.o, rule=qreg_rule, doc='log-transformed regression equation')
+
+    model.grp = grp
+
+    return model
+
+
+def expand(model, est):
+    # estimates per DMU from the estimates per group (the model has the attribute grp)
+
+    grp = model.grp
+
+    # hyperplanes
+    est = dict(est)
+    for name in ("a", "b", "f"):
+        if name in est and np.ndim(est[name]) > 0:
+            est[name] = est[name][grp]
+
+    # weighted least squares: the residual of a DMU is the residual of its group plus its deviation
+    # from the group mean (of the outputs net of the contextual variables)
+    if hasattr(model, "dev"):
+        e = est['e'][grp] + model.dev
+        if hasattr(model, "zdev"):
+            e = e - model.zdev @ np.asarray(est['d'], dtype=float).reshape(-1)
+        est['e'] = e
+
+    return est
@@ -0,0 +1,354 @@
+"""
+@Title   : executors of the parallel workloads: in-process, threads, local processes or worker nodes
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+# python -m pystoned.executor [--host HOST] [--port PORT] [--workers N]
+# starts N worker nodes on the ports PORT, PORT+1, ...; the clients connect with
+# get("socket", hosts=["node1:6000", "node1:6001", ...]). Client and nodes share the key in
+# $PYSTONED_AUTHKEY and the same pystoned version (the tasks are pickled functions and arguments).
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from multiprocessing.connection import Client, Listener
+import multiprocessing
+import argparse
+import os
+import queue
+import threading
+
+KINDS = ("inprocess", "thread", "process", "socket")
+
+
+def get(kind="process", workers=None, hosts=None, authkey=None):
+    # kind    = "inprocess": the tasks run in the calling thread, one after the other
+    #         = "thread"   : thread pool (solvers and scipy release the GIL while solving)
+    #         = "process"  : pool of local processes
+    #         = "socket"   : worker nodes started with python -m pystoned.executor (or local())
+    # workers = number of threads or processes (None: one per CPU)
+    # hosts   = addresses "host:port" of the worker nodes, one task at a time per address
+    # authkey = key shared with the worker nodes (default: $PYSTONED_AUTHKEY)
+
+    if kind == "inprocess":
+        return InProcessExecutor()
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    if kind == "socket":
+        return SocketExecutor(hosts, authkey)
+
+    raise ValueError("executor %s is not one of %s" % (kind, ", ".join(KINDS)))
+
+
+@contextmanager
+def pool(workers):
+    # executor of a parallel workload
+    # workers = number of local processes (None: one per CPU), or an executor: used as it is and
+    #           left open for the next workload
+
+    if isinstance(workers, Executor):
+        yield workers
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        yield ex
+
+
+def slots(workers):
+    # number of tasks running at the same time
+
+    if isinstance(workers, InProcessExecutor):
+        return 1
+    if isinstance(workers, SocketExecutor):
+        return len(workers.addresses)
+    if isinstance(workers, Executor):
+        return getattr(workers, "_max_workers", None) or os.cpu_count() or 1
+
+    return workers or os.cpu_count() or 1
+
+
+def remote(workers):
+    # True if the tasks may run on another host: the data has to travel with them
+
+    return isinstance(workers, SocketExecutor)
+
+
+def threaded(workers):
+    # True if the tasks run in the calling process (in-process or thread executors): they use the
+    # arrays of the caller, without shared memory
+
+    return isinstance(workers, (InProcessExecutor, ThreadPoolExecutor))
+
+
+class InProcessExecutor(Executor):
+    # runs each task when it is submitted (debugging, profiling, nested workloads)
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as err:
+            future.set_exception(err)
+
+        return future
+
+
+class SocketExecutor(Executor):
+    # one connection per worker node address; a thread per connection sends the next task of the
+    # queue and waits for its result. The task of a lost node is run by another node. The threads
+    # are stopped (one None per thread in the queue) once the executor is shut down and no task is
+    # outstanding, so a task put back by a lost node is never queued behind them.
+
+    def __init__(self, hosts, authkey=None):
+        if not hosts:
+            raise ValueError("the socket executor needs the addresses of the worker nodes")
+
+        self.addresses = [_address(host) for host in hosts]
+        self.authkey = _authkey(authkey)
+        self._tasks = queue.Queue()
+        # reentrant: a future completed under the lock calls _finished()
+        self._lock = threading.RLock()
+        self._alive = len(self.addresses)
+        self._closed = False
+        self._pending = 0
+        self._stopped = False
+
+        self._threads = [threading.Thread(target=self._run, args=(address,), daemon=True)
+                         for address in self.addresses]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("cannot submit after shutdown")
+            if self._alive == 0:
+                raise RuntimeError("no worker node is reachable")
+            future = Future()
+            self._pending += 1
+            future.add_done_callback(self._finished)
+            self._tasks.put((future, fn, args, kwargs, False))
+
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._lock:
+            self._closed = True
+            if cancel_futures:
+                self._drain(None)
+            if self._pending == 0:
+                self._stop()
+
+        if wait:
+            for thread in self._threads:
+                thread.join()
+            self._drain(RuntimeError("the executor was shut down before the task ran"))
+
+    def _run(self, address):
+        try:
+            conn = Client(address, authkey=self.authkey)
+        except (OSError, multiprocessing.AuthenticationError) as err:
+            self._lost(err)
+            return
+
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                conn.close()
+                return
+
+            future, fn, args, kwargs, started = task
+            if not started and not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                conn.send((fn, args, kwargs))
+            except (OSError, EOFError) as err:
+                self._tasks.put((future, fn, args, kwargs, True))
+                self._lost(err)
+                return
+            except Exception as err:
+                # the task cannot be pickled
+                future.set_exception(err)
+                continue
+
+            try:
+                status, result = conn.recv()
+            except (OSError, EOFError) as err:
+                self._tasks.put((future, fn, args, kwargs, True))
+                self._lost(err)
+                return
+
+            if status == "ok":
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+
+    def _finished(self, future):
+        # done callback of the futures (result, exception or cancelled)
+
+        with self._lock:
+            self._pending -= 1
+            if self._closed and self._pending == 0:
+                self._stop()
+
+    def _stop(self):
+
+        if not self._stopped:
+            self._stopped = True
+            for _ in self._threads:
+                self._tasks.put(None)
+
+    def _lost(self, err):
+        # a node is unreachable; the queued tasks fail when no node is left
+
+        with self._lock:
+            self._alive -= 1
+            if self._alive == 0:
+                self._drain(ConnectionError("no worker node is reachable: %s" % err))
+
+    def _drain(self, err):
+        # cancel (err = None) or fail the queued tasks; the queue is emptied first, so that the
+        # stop markers queued when the last future is done (_finished) stay in it
+
+        tasks = []
+        while True:
+            try:
+                tasks.append(self._tasks.get_nowait())
+            except queue.Empty:
+                break
+
+        for task in tasks:
+            if task is None:
+                continue
+            future, started = task[0], task[4]
+            if err is None and not started:
+                future.cancel()
+            elif started or future.set_running_or_notify_cancel():
+                future.set_exception(err or RuntimeError("the executor was shut down"))
+
+
+def serve(address=("0.0.0.0", 6000), authkey=None, ready=None):
+    # worker node: runs the tasks of each client connection in a thread of its own
+    # ready = connection to send the listening address to (local())
+
+    listener = Listener(address, authkey=_authkey(authkey))
+    if ready is not None:
+        ready.send(listener.address)
+        ready.close()
+
+    while True:
+        try:
+            conn = listener.accept()
+        except (OSError, EOFError, multiprocessing.AuthenticationError):
+            continue
+        threading.Thread(target=_work, args=(conn,), daemon=True).start()
+
+
+def _work(conn):
+    # the tasks of one client: (fn, args, kwargs) in, ("ok", result) or ("error", exception) out
+
+    while True:
+        try:
+            fn, args, kwargs = conn.recv()
+        except (OSError, EOFError):
+            conn.close()
+            return
+
+        try:
+            reply = ("ok", fn(*args, **kwargs))
+        except Exception as err:
+            reply = ("error", err)
+
+        try:
+            conn.send(reply)
+        except (OSError, EOFError):
+            conn.close()
+            return
+        except Exception as err:
+            # the result or the exception cannot be pickled
+            conn.send(("error", RuntimeError("%s: %s" % (type(err).__name__, err))))
+
+
+@contextmanager
+def local(workers=2, authkey=None):
+    # worker nodes in local processes standing in for remote hosts; yields their addresses,
+    # e.g. with local(4) as hosts: ex = get("socket", hosts=hosts)
+    # authkey = key of the nodes (default: $PYSTONED_AUTHKEY, else a random key in $PYSTONED_AUTHKEY
+    #           for the with block only, so that get("socket", hosts=hosts) finds it)
+
+    saved = os.environ.get("PYSTONED_AUTHKEY")
+    if authkey is None and not saved:
+        os.environ["PYSTONED_AUTHKEY"] = os.urandom(16).hex()
+
+    nodes = []
+    hosts = []
+    try:
+        authkey = _authkey(authkey)
+        for _ in range(workers):
+            recv, send = multiprocessing.Pipe(duplex=False)
+            node = multiprocessing.Process(target=serve, args=(("127.0.0.1", 0), authkey, send), daemon=True)
+            node.start()
+            nodes.append(node)
+            host, port = recv.recv()
+            hosts.append("%s:%d" % (host, port))
+        yield hosts
+    finally:
+        for node in nodes:
+            node.terminate()
+            node.join()
+        if saved is None:
+            os.environ.pop("PYSTONED_AUTHKEY", None)
+        else:
+            os.environ["PYSTONED_AUTHKEY"] = saved
+
+
+def _address(host):
+    # "host:port" or (host, port)
+
+    if isinstance(host, str):
+        name, port = host.rsplit(":", 1)
+        return name, int(port)
+
+    return host[0], int(host[1])
+
+
+def _authkey(authkey):
+
+    if authkey is None:
+        authkey = os.environ.get("PYSTONED_AUTHKEY")
+    if not authkey:
+        raise ValueError("the worker nodes need a key: authkey or $PYSTONED_AUTHKEY")
+    if isinstance(authkey, str):
+        authkey = authkey.encode()
+
+    return authkey
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog="python -m pystoned.executor", description="start pystoned worker nodes")
+    parser.add_argument("--host", default="0.0.0.0", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=6000, help="port of the first node")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="number of nodes (ports PORT, PORT+1, ...)")
+    args = parser.parse_args(argv)
+
+    authkey = _authkey(None)
+
+    nodes = [multiprocessing.Process(target=serve, args=((args.host, args.port + k), authkey))
+             for k in range(args.workers)]
+    for node in nodes:
+        node.start()
+    print(" ".join("%s:%d" % (args.host, args.port + k) for k in range(args.workers)), flush=True)
+    for node in nodes:
+        node.join()
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
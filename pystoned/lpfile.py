@@ -0,0 +1,346 @@
+"""
+@Title   : write CNLS/CQR/CER and DEA problems as LP/MPS/QPS files and read the solutions back
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+# the files are written row by row (LP) or column by column (MPS/QPS) from the data, without
+# building a pyomo model; the variables are named as in the pyomo models:
+#   a_i, b_i_j, e_i, ep_i, em_i (CNLS, CQR, CER) and theta_o, lamda_o_r (DEA)
+
+import numpy as np
+import os
+import re
+
+# variable names in the solution files
+NAME = re.compile(r"^(a|b|e|ep|em|theta|lamda)((?:_\d+)+)$")
+
+# numbers with full precision
+_num = "%.17g"
+
+
+def writecnls(path, y, x, fun, rts, loss="cnls", tau=None):
+    # path    = .lp (CPLEX LP format) or .mps (free MPS, QUADOBJ for the quadratic objectives of cnls
+    #           and cer; read by HiGHS, Gurobi, CPLEX); .qps writes the same free MPS for the solvers
+    #           that recognize that extension (Gurobi, CPLEX), HiGHS refuses it
+    # fun     = "prod" : production frontier
+    #         = "cost" : cost frontier
+    # rts     = "vrs"  : variable returns to scale
+    #         = "crs"  : constant returns to scale
+    # loss    = "cnls" : least squares (additive CNLS)
+    #         = "cqr"  : quantile regression
+    #         = "cer"  : expectile regression
+    # tau     = quantile/expectile (ignored by "cnls")
+
+    # transform data
+    y = np.asarray(y, dtype=float).reshape(-1)
+
+    # number of DMUs
+    n = len(y)
+
+    x = np.asarray(x, dtype=float).reshape(n, -1)
+
+    with open(path, "w") as f:
+        if _ext(path) == ".lp":
+            _cnlslp(f, y, x, fun, rts, loss, tau)
+        else:
+            _cnlsmps(f, y, x, fun, rts, loss, tau)
+
+
+def writedea(path, y, x, orient, rts):
+    # path    = .lp or .mps file
+    # orient  = "io" : input orientation
+    #         = "oo" : output orientation
+    # rts     = "vrs": variable returns to scale
+    #         = "crs": constant returns to scale
+
+    # transform data
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    y = y.reshape(n, -1)
+    x = np.asarray(x, dtype=float).reshape(n, -1)
+
+    with open(path, "w") as f:
+        if _ext(path) == ".lp":
+            _dealp(f, y, x, orient, rts)
+        else:
+            _deamps(f, y, x, orient, rts)
+
+
+def readsol(path):
+    # read a solution file (e.g. Gurobi .sol, HiGHS, CBC) into arrays of the variable values,
+    # indexed as in the written problem; the objective value is returned under 'objective'
+
+    vals = {}
+    objective = np.nan
+
+    with open(path) as f:
+        for line in f:
+            low = line.lower()
+
+            # primal values only
+            if "dual" in low:
+                break
+
+            if "objective" in low:
+                num = re.findall(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?", line)
+                if num:
+                    objective = float(num[-1])
+                continue
+
+            tokens = line.split()
+            for k, token in enumerate(tokens[:-1]):
+                match = NAME.match(token)
+                if match is None:
+                    continue
+                try:
+                    val = float(tokens[k + 1])
+                except ValueError:
+                    break
+                idx = tuple(int(s) for s in match.group(2)[1:].split("_"))
+                vals.setdefault(match.group(1), []).append((idx, val))
+                break
+
+    est = {}
+    for name, items in vals.items():
+        idx = np.array([k for k, _ in items])
+        arr = np.full(tuple(idx.max(axis=0) + 1), np.nan)
+        arr[tuple(idx.T)] = [v for _, v in items]
+        est[name] = arr
+
+    est['objective'] = np.array(objective)
+
+    return est
+
+
+def _ext(path):
+
+    return os.path.splitext(path)[1].lower()
+
+
+def _terms(coef, names):
+    # " + c1 v1 - c2 v2 ..." of an LP file (zero coefficients dropped)
+
+    return "".join(("\n - " if c < 0 else "\n + ") + (_num % abs(c)) + " " + v
+                   for c, v in zip(coef, names) if c != 0)
+
+
+def _cnlslp(f, y, x, fun, rts, loss, tau):
+    # CNLS-family problem in CPLEX LP format, one row at a time
+
+    n, m = x.shape
+    vrs = rts == "vrs"
+
+    f.write("\\ %s problem written by pystoned\n" % loss)
+    f.write("Minimize\n obj:")
+
+    # Objective function
+    if loss == "cnls":
+        f.write(" [" + "".join("\n + 2 e_%d ^2" % i for i in range(n)) + "\n ] / 2\n")
+    if loss == "cqr":
+        f.write(_terms([tau] * n, ["ep_%d" % i for i in range(n)]))
+        f.write(_terms([1 - tau] * n, ["em_%d" % i for i in range(n)]) + "\n")
+    if loss == "cer":
+        f.write(" [" + "".join("\n + %s ep_%d ^2 + %s em_%d ^2" % (_num % (2 * tau), i, _num % (2 * (1 - tau)), i)
+                               for i in range(n)) + "\n ] / 2\n")
+
+    f.write("Subject To\n")
+
+    # regression equation
+    for i in range(n):
+        f.write(" reg_%d:" % i)
+        if vrs:
+            f.write(" a_%d" % i)
+        f.write(_terms(x[i], ["b_%d_%d" % (i, j) for j in range(m)]))
+        if loss == "cnls":
+            f.write("\n + e_%d" % i)
+        else:
+            f.write("\n + ep_%d\n - em_%d" % (i, i))
+        f.write("\n = " + _num % y[i] + "\n")
+
+    # concavity (prod) or convexity (cost) constraints
+    sense = ">=" if fun == "cost" else "<="
+    for i in range(n):
+        own = _terms(x[i], ["b_%d_%d" % (i, j) for j in range(m)])
+        rows = []
+        for h in range(n):
+            if i == h:
+                continue
+            row = " afriat_%d_%d:" % (i, h)
+            if vrs:
+                row += " a_%d - a_%d" % (i, h)
+            row += own + _terms(-x[i], ["b_%d_%d" % (h, j) for j in range(m)])
+            rows.append(row + "\n " + sense + " 0\n")
+        f.write("".join(rows))
+
+    # Bounds: beta and the error terms of CQR/CER are nonnegative by default
+    f.write("Bounds\n")
+    if vrs:
+        f.write("".join(" a_%d free\n" % i for i in range(n)))
+    if loss == "cnls":
+        f.write("".join(" e_%d free\n" % i for i in range(n)))
+
+    f.write("End\n")
+
+
+def _cnlsmps(f, y, x, fun, rts, loss, tau):
+    # CNLS-family problem in free MPS format, one column at a time
+
+    n, m = x.shape
+    vrs = rts == "vrs"
+
+    f.write("NAME %s\n" % loss)
+
+    # rows
+    f.write("ROWS\n N obj\n")
+    f.write("".join(" E reg_%d\n" % i for i in range(n)))
+    sense = "G" if fun == "cost" else "L"
+    for i in range(n):
+        f.write("".join(" %s afriat_%d_%d\n" % (sense, i, h) for h in range(n) if h != i))
+
+    # columns: a_h and b_h_j appear in reg_h, afriat_h_i (own hyperplane) and afriat_i_h
+    f.write("COLUMNS\n")
+    for h in range(n):
+        other = np.arange(n) != h
+        rows = ["afriat_%d_%d" % (h, i) for i in range(n) if i != h]
+        cols = ["afriat_%d_%d" % (i, h) for i in range(n) if i != h]
+
+        if vrs:
+            f.write(" a_%d reg_%d 1\n" % (h, h))
+            f.write("".join(" a_%d %s 1\n" % (h, r) for r in rows))
+            f.write("".join(" a_%d %s -1\n" % (h, r) for r in cols))
+
+        for j in range(m):
+            name = "b_%d_%d" % (h, j)
+            out = []
+            if x[h, j] != 0:
+                out.append(" %s reg_%d %s\n" % (name, h, _num % x[h, j]))
+                out.extend(" %s %s %s\n" % (name, r, _num % x[h, j]) for r in rows)
+            out.extend(" %s %s %s\n" % (name, r, _num % -c) for r, c in zip(cols, x[other, j]) if c != 0)
+            f.write("".join(out))
+
+    for i in range(n):
+        if loss == "cnls":
+            f.write(" e_%d reg_%d 1\n" % (i, i))
+        else:
+            # the entries of a column are contiguous
+            f.write(" ep_%d reg_%d 1\n" % (i, i))
+            if loss == "cqr":
+                f.write(" ep_%d obj %s\n" % (i, _num % tau))
+            f.write(" em_%d reg_%d -1\n" % (i, i))
+            if loss == "cqr":
+                f.write(" em_%d obj %s\n" % (i, _num % (1 - tau)))
+
+    # right-hand side
+    f.write("RHS\n")
+    f.write("".join(" rhs reg_%d %s\n" % (i, _num % y[i]) for i in range(n)))
+
+    # Bounds: beta and the error terms of CQR/CER are nonnegative by default
+    f.write("BOUNDS\n")
+    if vrs:
+        f.write("".join(" FR bnd a_%d\n" % i for i in range(n)))
+    if loss == "cnls":
+        f.write("".join(" FR bnd e_%d\n" % i for i in range(n)))
+
+    # quadratic objective: 1/2 x'Qx
+    if loss == "cnls":
+        f.write("QUADOBJ\n")
+        f.write("".join(" e_%d e_%d 2\n" % (i, i) for i in range(n)))
+    if loss == "cer":
+        f.write("QUADOBJ\n")
+        f.write("".join(" ep_%d ep_%d %s\n em_%d em_%d %s\n" % (i, i, _num % (2 * tau), i, i, _num % (2 * (1 - tau)))
+                        for i in range(n)))
+
+    f.write("ENDATA\n")
+
+
+def _dealp(f, y, x, orient, rts):
+    # DEA of all DMUs as one LP (one block per evaluated DMU) in CPLEX LP format
+
+    n, m = x.shape
+    p = y.shape[1]
+
+    f.write("\\ DEA problem written by pystoned\n")
+    if orient == "io":
+        f.write("Minimize\n obj:")
+    else:
+        f.write("Maximize\n obj:")
+    f.write("".join("\n + theta_%d" % o for o in range(n)) + "\n")
+
+    f.write("Subject To\n")
+    for o in range(n):
+        lam = ["lamda_%d_%d" % (o, r) for r in range(n)]
+
+        # input constraints
+        for j in range(m):
+            f.write(" in_%d_%d:" % (o, j) + _terms(x[:, j], lam))
+            if orient == "io":
+                f.write(_terms([-x[o, j]], ["theta_%d" % o]) + "\n <= 0\n")
+            else:
+                f.write("\n <= " + _num % x[o, j] + "\n")
+
+        # output constraints
+        for k in range(p):
+            f.write(" out_%d_%d:" % (o, k) + _terms(y[:, k], lam))
+            if orient == "io":
+                f.write("\n >= " + _num % y[o, k] + "\n")
+            else:
+                f.write(_terms([-y[o, k]], ["theta_%d" % o]) + "\n >= 0\n")
+
+        if rts == "vrs":
+            f.write(" vrs_%d:" % o + "".join("\n + " + v for v in lam) + "\n = 1\n")
+
+    f.write("Bounds\n")
+    f.write("".join(" theta_%d free\n" % o for o in range(n)))
+    f.write("End\n")
+
+
+def _deamps(f, y, x, orient, rts):
+    # DEA of all DMUs as one LP in free MPS format
+
+    n, m = x.shape
+    p = y.shape[1]
+
+    f.write("NAME dea\n")
+    if orient == "oo":
+        f.write("OBJSENSE\n MAX\n")
+
+    f.write("ROWS\n N obj\n")
+    for o in range(n):
+        f.write("".join(" L in_%d_%d\n" % (o, j) for j in range(m)))
+        f.write("".join(" G out_%d_%d\n" % (o, k) for k in range(p)))
+        if rts == "vrs":
+            f.write(" E vrs_%d\n" % o)
+
+    f.write("COLUMNS\n")
+    for o in range(n):
+        name = "theta_%d" % o
+        f.write(" %s obj 1\n" % name)
+        if orient == "io":
+            f.write("".join(" %s in_%d_%d %s\n" % (name, o, j, _num % -x[o, j]) for j in range(m) if x[o, j] != 0))
+        else:
+            f.write("".join(" %s out_%d_%d %s\n" % (name, o, k, _num % -y[o, k]) for k in range(p) if y[o, k] != 0))
+
+        out = []
+        for r in range(n):
+            name = "lamda_%d_%d" % (o, r)
+            out.extend(" %s in_%d_%d %s\n" % (name, o, j, _num % x[r, j]) for j in range(m) if x[r, j] != 0)
+            out.extend(" %s out_%d_%d %s\n" % (name, o, k, _num % y[r, k]) for k in range(p) if y[r, k] != 0)
+            if rts == "vrs":
+                out.append(" %s vrs_%d 1\n" % (name, o))
+        f.write("".join(out))
+
+    f.write("RHS\n")
+    for o in range(n):
+        if orient == "io":
+            f.write("".join(" rhs out_%d_%d %s\n" % (o, k, _num % y[o, k]) for k in range(p)))
+        else:
+            f.write("".join(" rhs in_%d_%d %s\n" % (o, j, _num % x[o, j]) for j in range(m)))
+        if rts == "vrs":
+            f.write(" rhs vrs_%d 1\n" % o)
+
+    f.write("BOUNDS\n")
+    f.write("".join(" FR bnd theta_%d\n" % o for o in range(n)))
+
+    f.write("ENDATA\n")
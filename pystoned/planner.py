@@ -0,0 +1,256 @@
+"""
+@Title   : predict the size and memory of an estimation and choose how to estimate it
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+import numpy as np
+import inspect
+import os
+
+# bytes of the pyomo model per constraint, nonzero and variable: least squares fit of the python
+# allocations while CNLS (m = 1, 3), CNLSDDF and DEA models of 400 to 40000 rows are built
+# (benchmarks/planner.py; the fit is within 0.75-1.05 of each model)
+BUILD = {'constraint': 380, 'nonzero': 105, 'variable': 100}
+
+# bytes of the solver per constraint, nonzero and variable: least squares fit of the growth of the
+# peak resident memory while HiGHS reads and solves the same models (benchmarks/planner.py), without
+# its fixed 4 MB; within 0.75-1.6 of each model. A rough guide: the fill-in depends on the solver and
+# the data, e.g. the active set QP of HiGHS took 15 KB per row on single-input CNLS with 6400 DMUs
+SOLVER = {'constraint': 700, 'nonzero': 210, 'variable': 400}
+
+# estimators with residuals e (one per DMU) or ep and em (two per DMU)
+RESIDUALS = {
+    'cnls': 1, 'ccnls': 1, 'icnls': 1, 'cnlsz': 1, 'cnlsddf': 1, 'cnlsddfb': 1,
+    'cqr': 2, 'cer': 2, 'cqrz': 2, 'cerz': 2, 'cqrddf': 2, 'cerddf': 2, 'cqrddfb': 2, 'cerddfb': 2,
+}
+
+# single-input estimators with concavity/convexity constraints between neighbours only (afriat.sorted1d)
+SORTED = ('cnls', 'ccnls', 'cqr', 'cer')
+
+# optional arguments of the estimators that each strategy supports: the estimates of "1d" do not
+# depend on dup (DMUs with tied inputs get the same fitted value and slope), screen only changes the
+# speed of DEA.dea/deaddf; the DEADEC estimators themselves are always estimated as they are called
+SUPPORTED = {
+    '1d': ('dup',),
+    'cnlsdc': (),
+    'deadec': ('screen',),
+}
+
+
+def size(estimator, n, m, p=1, q=0, k=0, cet="addi", rts="vrs"):
+    # estimator = name of the estimator, e.g. "cnls", "cqrz", "cnlsddf", "dea", "deadec", "cnls1d"
+    # n, m, p   = number of DMUs, inputs and outputs
+    # q         = number of undesirable outputs (cnlsddfb, ..., deaddfb)
+    # k         = number of z-variables (cnlsz, cqrz, cerz)
+    # returns the number of variables, constraints and nonzeros of the model
+
+    # models without a pyomo model: one DMU (deadec) or the data (cnls1d) at a time
+    if estimator == "deadec":
+        return {'variables': n + 1, 'constraints': m + p + 1, 'nonzeros': (n + 1) * (m + p + 1)}
+    if estimator == "cnls1d":
+        return {'variables': 0, 'constraints': 0, 'nonzeros': 0}
+
+    # envelopment form: the intensity variables of every evaluated DMU
+    if estimator in ("dea", "deaddf", "deaddfb"):
+        rows = n * (m + p + q)
+        nz = n * (m + p + q) * (n + 1)
+        if rts == "vrs":
+            rows += n
+            nz += n * n
+        return {'variables': n * (n + 1), 'constraints': rows, 'nonzeros': nz}
+
+    if estimator not in RESIDUALS:
+        raise ValueError("size of %s is not known" % estimator)
+
+    ddf = "ddf" in estimator
+
+    # hyperplane of each DMU: alpha, beta, and gamma and delta under DDF
+    width = m + (rts == "vrs")
+    if ddf:
+        width += p + q
+    r = RESIDUALS[estimator]
+
+    variables = n * (width + r) + k
+
+    # the regression models declare alpha (also under crs) and the frontier f (also under "addi")
+    if not ddf:
+        variables += n * (1 + (rts == "crs"))
+    rows = n
+    nz = n * (width + r + k)
+
+    # normalization of the directions
+    if ddf:
+        rows += n
+        nz += n * (m + p + q)
+
+    # frontier f of the multiplicative models: log(y) = log(f + 1) + e
+    if cet == "mult" and not ddf:
+        rows += n
+        nz += n * (width + 2)
+
+    # concavity/convexity: both hyperplanes of each pair of DMUs
+    if m == 1 and estimator in SORTED:
+        rows += 3 * (n - 1)
+        nz += 2 * (n - 1) * 2 * width + 2 * (n - 1)
+    else:
+        rows += n * (n - 1)
+        nz += n * (n - 1) * 2 * width
+
+    return {'variables': variables, 'constraints': rows, 'nonzeros': nz}
+
+
+def memory(sz):
+    # predicted bytes of the pyomo model ('build') and of the solver ('solver') of a size()
+
+    build = sum(BUILD[key] * sz[key + 's'] for key in BUILD)
+    solver = sum(SOLVER[key] * sz[key + 's'] for key in SOLVER)
+
+    return {'build': int(build), 'solver': int(solver)}
+
+
+def budget():
+    # default memory budget: $PYSTONED_MEMORY (bytes), else half of the physical memory
+
+    if os.environ.get("PYSTONED_MEMORY"):
+        return int(float(os.environ["PYSTONED_MEMORY"]))
+
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 2
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def plan(estimator, n, m, p=1, q=0, k=0, cet="addi", rts="vrs", limit=None, extra=()):
+    # size and memory of the full model and the strategy of the estimation within the budget
+    # limit = memory budget in bytes (default: budget())
+    # extra = names of the optional arguments of the estimator that are not at their defaults; a
+    #         strategy is chosen only if it supports all of them (SUPPORTED)
+    # strategy = "1d"     : exact single-input CNLS/C2NLS without a solver (CNLS1D)
+    #          = "full"   : the model of the estimator
+    #          = "cnlsdc" : partitioned estimation merged by constraint generation (CNLSDC.cnlsdc
+    #                       with blocks of 'block' DMUs)
+    #          = "deadec" : one linear program per DMU (DEADEC)
+    #          = None     : no strategy fits the budget
+
+    if limit is None:
+        limit = budget()
+
+    sz = size(estimator, n, m, p, q, k, cet, rts)
+    mem = memory(sz)
+    need = mem['build'] + mem['solver']
+
+    result = dict(sz, **mem)
+    result.update(estimator=estimator, limit=limit, strategy=None)
+
+    # the exact solution of single-input additive CNLS and C2NLS needs no model
+    if m == 1 and k == 0 and cet == "addi" and estimator in ("cnls", "ccnls") and _supports("1d", extra):
+        result['strategy'] = "1d"
+        return result
+
+    if limit is None or need <= limit:
+        result['strategy'] = "full"
+        return result
+
+    if estimator in ("dea", "deaddf") and _supports("deadec", extra):
+        result['strategy'] = "deadec"
+        return result
+
+    # additive CNLS: the largest block that fits, and the merge problem with about 2*(m+2)
+    # concavity/convexity constraints per DMU after the constraint generation
+    if estimator == "cnls" and cet == "addi" and k == 0 and _supports("cnlsdc", extra):
+        merge = {'variables': n * (m + 2), 'constraints': n * (2 * m + 5),
+                 'nonzeros': n * (m + 2) + n * 2 * (m + 2) * 2 * (m + 1)}
+        mem = memory(merge)
+        if mem['build'] + mem['solver'] > limit:
+            return result
+
+        block = n
+        while block > 2 * (m + 2):
+            block = block // 2
+            mem = memory(size("cnls", block, m, rts=rts))
+            if mem['build'] + mem['solver'] <= limit:
+                result.update(strategy="cnlsdc", block=block)
+                break
+
+    return result
+
+
+def _supports(strategy, extra):
+
+    return all(name in SUPPORTED[strategy] for name in extra)
+
+
+def _default(val, default):
+    # the argument is left at its default (arrays are never a default)
+
+    return val is default or (isinstance(val, (str, bool, int, float)) and val == default)
+
+
+def auto(estimator, *args, solver="ipopt", options=None, limit=None, **kwargs):
+    # estimates of estimator(*args, **kwargs) by the strategy of plan() within the memory budget
+    # estimator = pystoned function, e.g. CNLS.cnls, CQER.cqr, DEA.dea
+    # solver, options as in solver.fit(); limit as in plan()
+    # returns the dictionary of solver.fit() whatever the strategy: the variables of the model of the
+    # estimator and 'objective' (e.g. 'a', 'b', 'e', 'f' of CNLS.cnls, NaN where the model leaves them
+    # out); "cnlsdc" adds 'block', 'iterations' and 'converged'; "deadec" gives 'theta' and
+    # 'objective' without the intensities 'lamda' (n x n, the memory it saves)
+
+    from . import CNLS1D, CNLSDC, DEADEC
+    from . import solver as slv
+
+    sig = inspect.signature(estimator)
+    data = sig.bind(*args, **kwargs).arguments
+
+    # optional arguments given with other values than their defaults
+    extra = [name for name, par in sig.parameters.items()
+             if name in data and par.default is not inspect.Parameter.empty and not _default(data[name], par.default)]
+
+    name = estimator.__name__
+    if estimator.__module__.endswith("DEADEC"):
+        name = "deadec"
+
+    dims = {}
+    for key, var in (('y', 'p'), ('x', 'm'), ('b', 'q'), ('z', 'k')):
+        if data.get(key) is not None:
+            v = np.asarray(data[key], dtype=float)
+            dims[var] = 1 if v.ndim == 1 else v.shape[1]
+    n = len(data['y'])
+
+    pl = plan(name, n, dims.get('m', 1), dims.get('p', 1), dims.get('q', 0), dims.get('k', 0),
+              data.get('cet', "addi"), data.get('rts', "vrs"), limit, extra)
+
+    if pl['strategy'] is None:
+        raise MemoryError("%s with %d DMUs needs about %.3g GB, more than the budget of %.3g GB" % (
+            name, n, (pl['build'] + pl['solver']) / 1e9, pl['limit'] / 1e9))
+
+    if pl['strategy'] == "1d":
+        if name == "ccnls":
+            est = CNLS1D.ccnls1d(data['y'], data['x'])
+        else:
+            est = _frontier(CNLS1D.cnls1d(data['y'], data['x'], data['fun'], data['rts']), n)
+        est['objective'] = np.array(np.sum(est['e'] ** 2))
+        return est
+
+    if pl['strategy'] == "cnlsdc":
+        return _frontier(CNLSDC.cnlsdc(data['y'], data['x'], data['fun'], data['rts'], size=pl['block'],
+                                       solver=solver, options=options), n)
+
+    if pl['strategy'] == "deadec":
+        if name == "deaddf":
+            theta = DEADEC.deaddf(data['y'], data['x'], data['gx'], data['gy'], data['rts'])
+        else:
+            theta = DEADEC.dea(data['y'], data['x'], data['orient'], data['rts'])
+        # the objective of DEA.dea/deaddf: the sum of the scores
+        return {'theta': theta, 'objective': np.array(np.sum(theta))}
+
+    return slv.fit(estimator, *args, solver=solver, options=options, **kwargs)
+
+
+def _frontier(est, n):
+    # the frontier f of CNLS.cnls is only set in the multiplicative model: NaN as in solver.fit()
+
+    est['f'] = np.full(n, np.nan)
+
+    return est
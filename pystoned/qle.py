@@ -13,6 +13,9 @@ from scipy.stats import norm
 # production frontier
 def qlep(lamda, eps):
 
+    # scalar lambda (scipy.optimize passes a 1-element array)
+    lamda = float(np.ravel(lamda)[0])
+
     # sigma Eq. (3.26) in Johnson and Kuosmanen (2015)
     sigma = np.sqrt(np.mean(eps ** 2) / (1 - 2 * lamda ** 2 / (math.pi * (1 + lamda ** 2))))
 
@@ -32,6 +35,9 @@ def qlep(lamda, eps):
 # cost frontier
 def qlec(lamda, eps):
 
+    # scalar lambda (scipy.optimize passes a 1-element array)
+    lamda = float(np.ravel(lamda)[0])
+
     # sigma Eq. (3.26) in Johnson and Kuosmanen (2015)
     sigma = np.sqrt(np.mean(eps ** 2) / (1 - 2 * lamda ** 2 / (math.pi * (1 + lamda ** 2))))
 
@@ -46,4 +52,47 @@ def qlec(lamda, eps):
     pn = norm.cdf(epsilon * lamda / sigma)
     logl = -len(eps) * math.log(sigma) + np.sum(np.log(pn)) - 0.5 * np.sum(epsilon ** 2) / sigma ** 2
 
-    return -logl
\ No newline at end of file
+    return -logl
+
+# all groups at once: g = group index of each DMU, cnt = number of DMUs per group
+def qlegroup(eps, g, cnt, fun, grid=60, iters=60):
+
+    # mean of the squared residuals per group
+    m2 = np.bincount(g, eps ** 2) / cnt
+
+    # negative log-likelihood of every group at its own lambda
+    def nll(lamda):
+        sigma = np.sqrt(m2 / (1 - 2 * lamda ** 2 / (math.pi * (1 + lamda ** 2))))
+        mu = math.sqrt(2 / math.pi) * sigma * lamda / np.sqrt(1 + lamda ** 2)
+        if fun == "prod":
+            epsilon = eps - mu[g]
+            logpn = norm.logcdf(-epsilon * lamda[g] / sigma[g])
+        if fun == "cost":
+            epsilon = eps + mu[g]
+            logpn = norm.logcdf(epsilon * lamda[g] / sigma[g])
+        logl = -cnt * np.log(sigma) + np.bincount(g, logpn, len(cnt)) \
+               - 0.5 * np.bincount(g, epsilon ** 2, len(cnt)) / sigma ** 2
+        return -logl
+
+    # coarse grid (lambda is unconstrained as in stoned()), then golden-section search in the
+    # bracket around the best grid point
+    points = np.concatenate([-np.logspace(2, -3, grid), [0.0], np.logspace(-3, 2, grid)])
+    vals = np.array([nll(np.full(len(cnt), lam)) for lam in points])
+    k = np.argmin(vals, axis=0)
+    lo = points[np.maximum(k - 1, 0)]
+    hi = points[np.minimum(k + 1, len(points) - 1)]
+
+    r = (math.sqrt(5) - 1) / 2
+    c = hi - r * (hi - lo)
+    d = lo + r * (hi - lo)
+    fc = nll(c)
+    fd = nll(d)
+    for _ in range(iters):
+        left = fc < fd
+        hi = np.where(left, d, hi)
+        lo = np.where(left, lo, c)
+        c, d = np.where(left, hi - r * (hi - lo), d), np.where(left, c, lo + r * (hi - lo))
+        new = nll(np.where(left, c, d))
+        fc, fd = np.where(left, new, fd), np.where(left, fc, new)
+
+    return (lo + hi) / 2
@@ -0,0 +1,134 @@
+"""
+@Title   : rescale the data of an estimator and map the estimates back to the original units
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+import numpy as np
+import inspect
+
+# data arguments of the estimators and the direction vectors in their units
+DATA = ('y', 'x', 'z', 'b', 'yref', 'xref', 'bref')
+DIRECTION = {'gx': 'x', 'gy': 'y', 'gb': 'b'}
+
+
+def scale(estimator, args, kwargs):
+    # estimator = pystoned function, e.g. CNLS.cnls
+    # args, kwargs = its arguments; returns the arguments on the rescaled data and the scaling
+    # each column of y, x, z and b is divided by its root mean square, the direction vectors by
+    # the factors of their variables (the directional distances do not change)
+
+    bound = inspect.signature(estimator).bind(*args, **kwargs)
+    data = bound.arguments
+
+    # residual decompositions take the residuals in the units of y
+    if 'eps' in data:
+        raise ValueError("%s has no data to scale" % estimator.__name__)
+
+    # multiplicative models (cet = "mult", CNLSMULT): the frontier is bounded by f >= 0, which is not
+    # invariant to the units of y; only x and z are scaled
+    cet = data.get('cet', "mult" if estimator.__name__.endswith("mult") else "addi")
+    s = {'kind': kind(estimator, data), 'cet': cet, 'name': estimator.__name__}
+
+    for name in DATA:
+        if cet == "mult" and name in ('y', 'yref'):
+            continue
+        if name in data and data[name] is not None:
+            s[name[0]] = factor(data[name]) if name[0] not in s else s[name[0]]
+            data[name] = _divide(data[name], s[name[0]])
+
+    for name, var in DIRECTION.items():
+        if name in data and var in s:
+            data[name] = _divide(data[name], s[var])
+
+    return bound.args, bound.kwargs, s
+
+
+def kind(estimator, data):
+    # "ddf": directional distance regression (cnlsddf, cqrddf, cerddf)
+    # "dea": data envelopment analysis; the efficiency scores do not depend on the units
+    # "reg": regression of y on x (cnls, cqr, cer, icnls, cnlsz, ...)
+
+    if 'orient' in data or estimator.__module__.endswith(("DEA", "DEADEC")):
+        return "dea"
+    if 'gx' in data or 'gy' in data:
+        return "ddf"
+
+    return "reg"
+
+
+def factor(v):
+    # root mean square of each column (1 for a zero column)
+
+    v = np.asarray(v, dtype=float)
+    n = len(v)
+
+    s = np.sqrt(np.mean(v.reshape(n, -1) ** 2, axis=0))
+    s[~(s > 0)] = 1.0
+
+    return s
+
+
+def _divide(v, s):
+    # v / s by column, in the layout of v (lists stay lists, a vector stays a vector)
+
+    arr = np.asarray(v, dtype=float)
+    if arr.ndim == 2 or (arr.ndim == 1 and len(s) > 1 and len(arr) == len(s)):
+        out = arr / s
+    else:
+        out = arr / s[0]
+
+    if isinstance(v, list):
+        return out.tolist()
+    if np.ndim(v) == 0:
+        return float(out)
+    return out
+
+
+def unscale(est, s):
+    # estimates of the rescaled problem in the original units
+    # reg, cet = "addi": y = a + b*x + d*z + e, all terms in units of y
+    # reg, cet = "mult": log(y) = log(a + b*x) + d*z + e, the hyperplanes in units of y
+    # ddf: g*y = a + b*x - d*b - e with b*gx + g*gy = 1, the distance e has no units
+
+    est = dict(est)
+    sy = s.get('y', np.ones(1))
+    sx = s.get('x', np.ones(1))
+
+    if s['kind'] == "reg":
+        sy = sy[0]
+        _mul(est, 'a', sy)
+        _mul(est, 'b', sy / sx)
+        if 'f' in est:
+            est['f'] = sy * (est['f'] + 1) - 1
+        if s['cet'] == "addi":
+            for name in ('e', 'ep', 'em'):
+                _mul(est, name, sy)
+            _mul(est, 'd', sy / s.get('z', np.ones(1)))
+            # least squares/expectile: squares of y; quantile: y
+            _mul(est, 'objective', sy if "cqr" in s['name'] else sy ** 2)
+        else:
+            _mul(est, 'd', 1 / s.get('z', np.ones(1)))
+
+    if s['kind'] == "ddf":
+        _mul(est, 'b', 1 / sx)
+        _mul(est, 'g', 1 / sy)
+        _mul(est, 'd', 1 / s.get('b', np.ones(1)))
+
+    return est
+
+
+def _mul(est, name, f):
+    # est[name] * f, by the last axis (inputs, outputs, z-variables) when f has one factor per column
+
+    if name not in est:
+        return
+
+    v = np.asarray(est[name], dtype=float)
+    f = np.asarray(f, dtype=float).reshape(-1)
+
+    if len(f) > 1 and v.ndim >= 1 and v.shape[-1] == len(f):
+        est[name] = v * f
+    else:
+        est[name] = v * f[0]
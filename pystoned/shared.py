@@ -0,0 +1,133 @@
+"""
+@Title   : shared data of parallel workers: arrays published once, zero-copy views in the workers
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+import os
+import tempfile
+import threading
+
+# shared memory blocks attached in this process: name -> [block, number of attach() not detached];
+# a block stays open while a task uses its views
+_ATTACHED = {}
+_LOCK = threading.Lock()
+
+
+@contextmanager
+def plane(directory=None, inline=False, **arrays):
+    # publish the arrays (e.g. y=y, x=x, a=alpha, b=beta) for the workers of the with block
+    # directory = None : POSIX/Windows shared memory (multiprocessing.shared_memory)
+    #           = path : memory-mapped .npy files in a new directory under path (e.g. for workers
+    #                    that outlive the shared memory or data larger than /dev/shm)
+    # inline    = True : the arrays travel in the handle (workers on other hosts, executor.remote())
+    # yields the handle, a small picklable dictionary to pass to the workers instead of the data;
+    # attach(handle) gives the arrays, detach(handle) releases them when the task is done. The shared
+    # memory (or the files) is released on exit.
+
+    handle = {}
+    blocks = []
+    folder = None
+
+    try:
+        if directory is not None:
+            folder = tempfile.mkdtemp(prefix="pystoned-", dir=directory)
+
+        for key, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+
+            if inline:
+                handle[key] = ("array", arr)
+                continue
+
+            if folder is not None:
+                path = os.path.join(folder, key + ".npy")
+                np.save(path, arr)
+                handle[key] = ("file", path)
+                continue
+
+            # a block of at least one byte: empty arrays are allowed (registered with the resource
+            # tracker outside of _open())
+            with _LOCK:
+                shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            blocks.append(shm)
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            handle[key] = ("shm", shm.name, arr.shape, arr.dtype.str)
+
+        yield handle
+
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+        if folder is not None:
+            for spec in handle.values():
+                if spec[0] == "file":
+                    os.remove(spec[1])
+            os.rmdir(folder)
+
+
+def attach(handle):
+    # read-only numpy views of the published arrays; no copy of the data
+    # each attach(handle) is followed by detach(handle) when the views are no longer used
+
+    arrays = {}
+    for key, spec in handle.items():
+        if spec[0] == "array":
+            arrays[key] = spec[1]
+            continue
+        if spec[0] == "file":
+            arrays[key] = np.load(spec[1], mmap_mode="r")
+            continue
+
+        _, name, shape, dtype = spec
+        # threads of one process share the block
+        with _LOCK:
+            if name not in _ATTACHED:
+                _ATTACHED[name] = [_open(name), 0]
+            _ATTACHED[name][1] += 1
+            shm = _ATTACHED[name][0]
+        arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        arr.flags.writeable = False
+        arrays[key] = arr
+
+    return arrays
+
+
+def detach(handle):
+    # release the views of an attach(handle); a block is closed when its last task detaches
+
+    with _LOCK:
+        for spec in handle.values():
+            if spec[0] != "shm" or spec[1] not in _ATTACHED:
+                continue
+            entry = _ATTACHED[spec[1]]
+            entry[1] -= 1
+            if entry[1] > 0:
+                continue
+            try:
+                entry[0].close()
+            except BufferError:
+                # views of the block are still referenced: it stays open for the next attach()
+                continue
+            del _ATTACHED[spec[1]]
+
+
+def _open(name):
+    # the owner unlinks the block: the worker must not register it with the resource tracker,
+    # which would unlink it (or report it as leaked) when the worker exits; called under _LOCK
+
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before python 3.13 the block is always registered: the registration is skipped
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
@@ -0,0 +1,442 @@
+"""
+@Title   : solve the estimated model and retrieve the estimates
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+# Import of the pyomo module
+from pyomo.environ import SolverFactory, Var, Objective, value
+from pyomo.opt import SolverResults, TerminationCondition
+from . import dupx, scaling
+import numpy as np
+import inspect
+import os
+import tempfile
+import threading
+import time
+import warnings
+
+# option names of the time limit (seconds) and the iteration limit(s) of each solver family
+LIMITS = {
+    'ipopt': ('max_cpu_time', ['max_iter']),
+    'gurobi': ('TimeLimit', ['BarIterLimit', 'IterationLimit']),
+    'mosek': ('dparam.optimizer_max_time', ['iparam.intpnt_max_iterations', 'iparam.sim_max_iterations']),
+    'cplex': ('timelimit', ['barrier.limits.iteration', 'simplex.limits.iterations']),
+    'highs': ('time_limit', ['ipm_iteration_limit', 'simplex_iteration_limit', 'qp_iteration_limit']),
+    'knitro': ('maxtime_real', ['maxit']),
+    'xpress': ('maxtime', ['bariterlimit', 'lpiterlimit']),
+    'glpk': ('tmlim', []),
+    'cbc': ('sec', []),
+}
+
+# termination conditions of a solve that reached its optimum, and of a solve stopped by a limit
+OPTIMAL = (TerminationCondition.optimal, TerminationCondition.locallyOptimal, TerminationCondition.globallyOptimal)
+LIMIT = (TerminationCondition.maxTimeLimit, TerminationCondition.maxIterations, TerminationCondition.maxEvaluations)
+
+# appsi interfaces by their native classes (pyomo.contrib.appsi.solvers): their own solve() reports
+# the termination condition also when a limit stops the solve before the first solution
+APPSI = {'appsi_gurobi': 'Gurobi', 'appsi_highs': 'Highs', 'appsi_cplex': 'Cplex', 'appsi_ipopt': 'Ipopt',
+         'appsi_cbc': 'Cbc'}
+
+# option names of the log file of the solvers that do not write pyomo's logfile while solving
+LOGFILE = {
+    'gurobi': 'LogFile',
+    'ipopt': 'output_file',
+    'highs': 'log_file',
+}
+
+
+def solve(model, solver="ipopt", options=None, warmstart=False):
+    # solver    = name of the solver passed to pyomo's SolverFactory, e.g. "ipopt", "mosek"
+    # options   = dictionary of solver options
+    # warmstart = start from the current values of the variables (e.g. after CNLS.cnlsadd)
+
+    opt = _factory(solver, options)
+
+    # persistent interfaces (e.g. "gurobi_persistent") solve the instance they hold
+    if hasattr(opt, "set_instance"):
+        opt.set_instance(model)
+
+    # appsi interfaces: the termination condition also without a solution (_solve)
+    if hasattr(opt, "update_config"):
+        results = _solve(opt, model)
+        _load(opt, model, results)
+    # solvers that cannot be warm started ignore the starting point
+    elif warmstart and getattr(opt, "warm_start_capable", lambda: False)():
+        results = opt.solve(model, warmstart=True)
+    else:
+        results = opt.solve(model)
+
+    return results
+
+
+def values(model):
+    # retrieve the values of all variables (alpha, beta, residuals, ...) as numpy arrays
+
+    est = {}
+
+    for var in model.component_objects(Var, active=True):
+
+        # scalar variables (e.g. the z-coefficient with one z-variable)
+        if not var.is_indexed():
+            est[var.local_name] = np.array(var.value, dtype=float)
+            continue
+
+        keys = list(var.keys())
+        val = np.array([var[key].value for key in keys], dtype=float)
+
+        if len(keys) == 0:
+            est[var.local_name] = val
+            continue
+
+        # variables indexed by DMUs, or by DMUs and inputs/outputs
+        idx = np.array(keys).reshape(len(keys), -1)
+        arr = np.full(tuple(idx.max(axis=0) + 1), np.nan)
+        arr[tuple(idx.T)] = val
+        est[var.local_name] = arr
+
+    # value of the objective function
+    for obj in model.component_objects(Objective, active=True):
+        est[obj.local_name] = np.array(value(obj, exception=False), dtype=float)
+
+    # DMUs sharing the hyperplane of their distinct input vector (dup = True)
+    if hasattr(model, "grp"):
+        est = dupx.expand(model, est)
+
+    return est
+
+
+def fit(estimator, *args, solver="ipopt", options=None, timelimit=None, iterlimit=None, callback=None,
+        scale=False, **kwargs):
+    # estimator = pystoned function returning the model, e.g. CNLS.cnls
+    # args      = arguments of the estimator, e.g. y, x, cet, fun, rts
+    # timelimit, iterlimit, callback as in run()
+    # scale     = solve the problem on data with unit root mean square columns (y, x, z, b and the
+    #             direction vectors) and return the estimates in the original units
+    # estimators that solve their own models (e.g. CNLSDC.cnlsdc, CNLSMULT.cnlsmult) get solver and options
+    # a solve without a solution (infeasible, unbounded, error, or a limit hit before the first
+    # solution) raises RuntimeError; a limit hit after a solution was found returns that solution
+    # with a RuntimeWarning
+
+    if 'solver' in inspect.signature(estimator).parameters:
+        kwargs = dict(kwargs, solver=solver, options=options)
+
+    if scale:
+        args, kwargs, factors = scaling.scale(estimator, args, kwargs)
+
+    model = estimator(*args, **kwargs)
+
+    # the residual decomposition (e.g. StoNED.stoned) does not need a solver
+    if not hasattr(model, "component_objects"):
+        return scaling.unscale(model, factors) if scale else model
+
+    if timelimit is None and iterlimit is None and callback is None:
+        results = solve(model, solver, options)
+    else:
+        results = run(model, solver, options, timelimit, iterlimit, callback)
+
+    est = values(model)
+    _check(results, est)
+
+    return scaling.unscale(est, factors) if scale else est
+
+
+def persistent(model, solver="appsi_highs", options=None):
+    # solver  = persistent interface, e.g. "appsi_highs" (LPs such as cqr and dea; open source and
+    #           in-process, no commercial binaries), "appsi_gurobi", "gurobi_persistent", "cplex_persistent"
+    # the model is sent to the solver once; resolve() then only pushes the changed coefficients
+
+    opt = _factory(solver, options)
+    opt.set_instance(model)
+
+    return opt
+
+
+def resolve(opt, model, **data):
+    # data    = new values of the mutable parameters of the model, e.g.
+    #           y=ystar (bootstrap), tau=0.9 (tau sweep) for cnls, cqr and cer
+
+    changed = update(model, data)
+
+    # appsi interfaces detect the changed parameters themselves; the older persistent interfaces
+    # need the regression equations (the only constraints with y) and the objective re-sent
+    if not hasattr(opt, "update_config"):
+        for name in ("reg", "qreg"):
+            con = getattr(model, name, None)
+            if con is None or 'y' not in changed:
+                continue
+            for i in changed['y']:
+                opt.remove_constraint(con[i])
+                opt.add_constraint(con[i])
+        # the trust region of CNLSMULT follows the frontier and the radius
+        con = getattr(model, "trust", None)
+        if con is not None and changed:
+            for c in con.values():
+                opt.remove_constraint(c)
+                opt.add_constraint(c)
+        if changed:
+            for obj in model.component_objects(Objective, active=True):
+                opt.set_objective(obj)
+
+    results = _solve(opt, model)
+    _load(opt, model, results)
+
+    return results
+
+
+def update(model, data):
+    # set the mutable parameters; returns the indices whose values changed
+
+    changed = {}
+
+    for name in data:
+        par = getattr(model, name)
+
+        if not par.is_indexed():
+            if value(par) != data[name]:
+                par.value = data[name]
+                changed[name] = [None]
+            continue
+
+        new = np.asarray(data[name], dtype=float).reshape(-1)
+        # one output per distinct input vector in the weighted model of cnls(..., dup=True)
+        if name == "y" and hasattr(model, "dev"):
+            new = dupx.regroup(model, new)
+        idx = []
+        for k, v in zip(list(par.keys()), new):
+            if value(par[k]) != v:
+                par[k] = float(v)
+                idx.append(k)
+        if idx:
+            changed[name] = idx
+
+    return changed
+
+
+def run(model, solver="ipopt", options=None, timelimit=None, iterlimit=None, callback=None, interval=1.0):
+    # timelimit = time limit of the solve in seconds
+    # iterlimit = iteration limit of the solve
+    # callback  = function called with the progress of the solve, a dictionary with 'elapsed' and,
+    #             when the solver log reports them, 'iteration', 'objective', 'gap' and 'residual';
+    #             the last call has the 'status' and the number of 'iterations' of the solve
+    # interval  = minimum time in seconds between two calls of the callback
+    # when a limit is hit, the best solution found (if any) is loaded into the model; without a
+    # solution the variables are cleared (nan in values())
+
+    family = _family(solver)
+    options = dict(options or {})
+    if family in LIMITS:
+        timeopt, iteropt = LIMITS[family]
+        if timelimit is not None:
+            options.setdefault(timeopt, timelimit)
+        if iterlimit is not None:
+            for name in iteropt:
+                options.setdefault(name, iterlimit)
+
+    opt = _factory(solver, options)
+
+    # persistent interfaces (e.g. "gurobi_persistent", "appsi_gurobi") solve the instance they hold
+    if hasattr(opt, "set_instance"):
+        opt.set_instance(model)
+
+    start = time.perf_counter()
+
+    if callback is None:
+        results = _solve(opt, model)
+    else:
+        # a thread follows the solver log file and parses the progress lines
+        fd, logfile = tempfile.mkstemp(suffix=".log")
+        os.close(fd)
+        stop = threading.Event()
+        seen = {}
+        reader = threading.Thread(target=_monitor, args=(logfile, stop, family, callback, start, interval, seen))
+        reader.start()
+        try:
+            if family in LOGFILE:
+                _options(opt)[LOGFILE[family]] = logfile
+                results = _solve(opt, model)
+            else:
+                results = _solve(opt, model, logfile)
+        finally:
+            stop.set()
+            reader.join()
+            os.remove(logfile)
+        info = {'elapsed': time.perf_counter() - start, 'status': str(results.solver.termination_condition)}
+        if 'iteration' in seen:
+            info['iterations'] = seen['iteration']
+        callback(info)
+
+    _load(opt, model, results)
+
+    return results
+
+
+def _factory(solver, options=None):
+    # solver interface with the options set; appsi interfaces by their native class (APPSI)
+
+    if solver in APPSI:
+        from pyomo.contrib.appsi import solvers
+        opt = getattr(solvers, APPSI[solver])()
+    else:
+        opt = SolverFactory(solver)
+
+    for key in options or {}:
+        _options(opt)[key] = options[key]
+
+    return opt
+
+
+def _options(opt):
+    # option dictionary of the solver interface (appsi: e.g. highs_options)
+
+    if hasattr(opt, "update_config"):
+        for family in LIMITS:
+            if hasattr(opt, family + "_options"):
+                return getattr(opt, family + "_options")
+
+    return opt.options
+
+
+def _solve(opt, model, logfile=None):
+    # solve without loading the solution (_load() loads it)
+
+    # appsi interfaces: their termination condition is reported in a SolverResults
+    if hasattr(opt, "update_config"):
+        from pyomo.contrib.appsi.base import legacy_termination_condition_map
+
+        opt.config.load_solution = False
+        native = opt.solve(model)
+        results = SolverResults()
+        results.solver.termination_condition = legacy_termination_condition_map[native.termination_condition]
+        results.loader = native.solution_loader
+        return results
+
+    if logfile is None:
+        return opt.solve(model, load_solutions=False)
+
+    return opt.solve(model, load_solutions=False, logfile=logfile)
+
+
+def _family(solver):
+    # "gurobi_persistent", "appsi_gurobi" -> "gurobi"
+
+    for family in LIMITS:
+        if family in solver:
+            return family
+
+    return solver
+
+
+def _monitor(logfile, stop, family, callback, start, interval, seen):
+    # the log file is re-opened at every poll: some solvers recreate it
+    # seen = the last iteration of the log, also when the callback was not called for it
+
+    last = -np.inf
+    pos = 0
+    rest = ""
+    while True:
+        done = stop.is_set()
+        try:
+            with open(logfile) as stream:
+                stream.seek(0, os.SEEK_END)
+                if stream.tell() < pos:
+                    pos = 0
+                stream.seek(pos)
+                text = stream.read()
+                pos = stream.tell()
+        except OSError:
+            text = ""
+
+        lines = (rest + text).split("\n")
+        rest = lines.pop()
+        for line in lines:
+            info = _progress(family, line)
+            now = time.perf_counter()
+            if info is not None:
+                seen['iteration'] = info['iteration']
+            if info is None or now - last < interval:
+                continue
+            last = now
+            info['elapsed'] = now - start
+            callback(info)
+
+        if done:
+            break
+        time.sleep(0.05)
+
+
+def _progress(family, line):
+    # progress of an iteration line of the solver log: iteration number followed by numbers
+
+    tokens = line.split()
+    if len(tokens) < 2 or not tokens[0].rstrip("r").isdigit():
+        return None
+
+    vals = []
+    for token in tokens[1:]:
+        try:
+            vals.append(float(token))
+        except ValueError:
+            break
+
+    info = {'iteration': int(tokens[0].rstrip("r"))}
+
+    # ipopt: objective, primal and dual infeasibility
+    if family == "ipopt" and len(vals) >= 3:
+        info.update(objective=vals[0], residual=max(vals[1], vals[2]))
+
+    # gurobi barrier: primal and dual objective, primal and dual infeasibility
+    elif family == "gurobi" and len(vals) >= 4:
+        info.update(objective=vals[0], gap=_gap(vals[0], vals[1]), residual=max(vals[2], vals[3]))
+
+    # mosek interior point: primal/dual/gap feasibility, status, primal and dual objective
+    elif family == "mosek" and len(vals) >= 6:
+        info.update(objective=vals[4], gap=_gap(vals[4], vals[5]), residual=max(vals[0], vals[1]))
+
+    elif len(vals) >= 1:
+        info.update(objective=vals[0])
+
+    else:
+        return None
+
+    return info
+
+
+def _gap(primal, dual):
+
+    return abs(primal - dual) / max(1.0, abs(primal))
+
+
+def _check(results, est):
+    # termination condition of the solve behind the estimates est
+
+    cond = results.solver.termination_condition
+    if cond in OPTIMAL:
+        return
+
+    if cond in LIMIT and np.isfinite(est.get('objective', np.nan)):
+        warnings.warn("the solve stopped with %s; the estimates are the best solution found" % cond,
+                      RuntimeWarning)
+        return
+
+    raise RuntimeError("the solve stopped with %s without a solution" % cond)
+
+
+def _load(opt, model, results):
+    # load the solution of the solver results, also when a limit stopped the solve
+
+    if hasattr(results, "solution") and len(results.solution) > 0 and len(results.solution(0).variable) > 0:
+        model.solutions.load_from(results)
+        return
+
+    # direct, persistent and appsi interfaces keep the solution in the solver; without a solution
+    # (e.g. a limit hit before the first feasible point) the variables are cleared
+    try:
+        if hasattr(results, "loader"):
+            results.loader.load_vars()
+        else:
+            opt.load_vars()
+    except Exception:
+        for var in model.component_data_objects(Var, active=True):
+            var.value = None
@@ -13,7 +13,7 @@ setup_args = dict(
     long_description_content_type="text/markdown",
     long_description=README + '\n\n' + HISTORY,
     license='GPLv3',
-    packages=find_packages(),
+    packages=find_packages(exclude=['tests', 'tests.*']),
     author='Sheng Dai, Timo Kuosmanen',
     author_email='sheng.dai@aalto.fi',
     keywords=['StoNED', 'CNLS', 'CER', 'CQR', 'Z-variables'],
@@ -21,6 +21,9 @@ setup_args = dict(
     download_url='https://pypi.org/project/pystoned/',
     include_package_data=True,
     zip_safe=False,
+    entry_points={
+        'console_scripts': ['pystoned=pystoned.cli:main'],
+    },
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Science/Research',
@@ -0,0 +1,42 @@
+"""
+@Title   : solvers of the tests: the first one installed, or the test is skipped
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+import pytest
+
+
+def available(name):
+
+    from pyomo.environ import SolverFactory
+
+    try:
+        return bool(SolverFactory(name).available(exception_flag=False))
+    except Exception:
+        return False
+
+
+def first(names):
+
+    for name in names:
+        if available(name):
+            return name
+    pytest.skip("none of the solvers %s is available" % ", ".join(names))
+
+
+@pytest.fixture(scope="session")
+def qp():
+    # quadratic programs; the models of the tests stay within the restricted Gurobi license (200
+    # QP variables, 2000 rows). HiGHS comes last: its active set QP solver stops on some of the
+    # degenerate CNLSDC merge problems ("Non-convex")
+
+    return first(("gurobi_direct", "mosek", "highs"))
+
+
+@pytest.fixture(scope="session")
+def nlp():
+    # global optimum of the multiplicative models
+
+    return first(("gurobi_direct_minlp",))
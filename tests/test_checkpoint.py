@@ -0,0 +1,53 @@
+"""
+@Title   : a resumed run loads the finished units instead of running them again
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+from pystoned import checkpoint
+import numpy as np
+import pytest
+
+# replicates run in this process and the replicate that stops the run (None: none)
+CALLS = []
+STOP = {'at': None}
+
+
+def _draw(rng, scale):
+    CALLS.append(1)
+    if len(CALLS) == STOP['at']:
+        raise KeyboardInterrupt
+    return {'u': scale * rng.normal(size=3), 'n': len(CALLS) % 2}
+
+
+def test_resume_skips_finished_units(tmp_path):
+    expected = checkpoint.replicate(_draw, 6, seed=3, args=(2.0,))
+
+    # the first run is interrupted at the fourth replicate, after three were stored
+    del CALLS[:]
+    STOP['at'] = 4
+    with pytest.raises(KeyboardInterrupt):
+        checkpoint.replicate(_draw, 6, str(tmp_path), seed=3, args=(2.0,))
+
+    del CALLS[:]
+    STOP['at'] = None
+    resumed = checkpoint.replicate(_draw, 6, str(tmp_path), seed=3, args=(2.0,))
+
+    assert len(CALLS) == 3
+    for got, want in zip(resumed, expected):
+        assert np.array_equal(got['u'], want['u'])
+        assert type(got['n']) is int
+
+    # nothing is left to run
+    del CALLS[:]
+    checkpoint.replicate(_draw, 6, str(tmp_path), seed=3, args=(2.0,))
+    assert len(CALLS) == 0
+
+
+def test_other_arguments_do_not_resume(tmp_path):
+    del CALLS[:]
+    checkpoint.replicate(_draw, 2, str(tmp_path), seed=3, args=(2.0,))
+    checkpoint.replicate(_draw, 2, str(tmp_path), seed=3, args=(3.0,))
+
+    assert len(CALLS) == 4
@@ -0,0 +1,44 @@
+"""
+@Title   : single-input CNLS: the exact solution, the sorted constraints and the full Afriat model agree
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+from pystoned import CNLS, CNLS1D, CNLSDC
+from pystoned import solver as slv
+import numpy as np
+import pytest
+
+
+def _data(fun, n=40):
+    rng = np.random.default_rng(1)
+    x = rng.uniform(1, 10, n)
+    # tied inputs
+    x[:5] = x[5]
+    if fun == "cost":
+        return x ** 2 + rng.normal(0, 2, n), x
+    return np.log(x) + rng.normal(0, 0.2, n), x
+
+
+@pytest.mark.parametrize("fun", ["prod", "cost"])
+def test_sorted_and_exact_match_afriat(qp, fun):
+    y, x = _data(fun)
+    n = len(y)
+
+    # all n*(n-1) concavity/convexity constraints
+    pairs = {(i, h) for i in range(n) for h in range(n) if i != h}
+    full = CNLSDC.frontier(y, x.reshape(-1, 1), pairs, fun, "vrs")
+    slv.solve(full, qp)
+    afriat = slv.values(full)
+
+    # 3*(n-1) constraints between neighbours (afriat.sorted1d)
+    sorted1d = slv.fit(CNLS.cnls, y, x, "addi", fun, "vrs", solver=qp)
+
+    exact = CNLS1D.cnls1d(y, x, fun, "vrs")
+
+    # within the tolerances of the QP solver
+    tol = 1e-5 * np.ptp(y)
+    assert np.allclose(sorted1d['e'], afriat['e'], atol=tol)
+    assert np.allclose(exact['e'], afriat['e'], atol=tol)
+    assert np.isclose(np.sum(exact['e'] ** 2), float(afriat['objective']), rtol=1e-6)
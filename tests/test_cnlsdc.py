@@ -0,0 +1,26 @@
+"""
+@Title   : divide-and-conquer CNLS gives the CNLS estimate of the whole sample
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+from pystoned import CNLS, CNLSDC
+from pystoned import solver as slv
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_cnlsdc_matches_cnls(qp, seed):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(1, 10, (30, 2))
+    y = x[:, 0] ** 0.4 * x[:, 1] ** 0.3 + rng.normal(0, 0.2, 30)
+
+    full = slv.fit(CNLS.cnls, y, x, "addi", "prod", "vrs", solver=qp)
+    dc = CNLSDC.cnlsdc(y, x, "prod", "vrs", size=10, solver=qp, workers=1)
+
+    assert bool(dc['converged'])
+    assert len(np.unique(dc['block'])) > 1
+    assert np.isclose(float(dc['objective']), float(full['objective']), rtol=1e-5, atol=1e-8)
+    assert np.allclose(y - dc['e'], y - full['e'], atol=1e-4)
@@ -0,0 +1,49 @@
+"""
+@Title   : multiplicative models by linearization reach the optimum of the nonlinear model
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+from pyomo.environ import value
+from pystoned import CNLS, CNLSMULT, CQER
+from pystoned import solver as slv
+import numpy as np
+import pytest
+
+# the nonlinear models to a proven global optimum
+TIGHT = {'TimeLimit': 60, 'FeasibilityTol': 1e-9, 'OptimalityTol': 1e-9, 'MIPGap': 0, 'MIPGapAbs': 0}
+
+
+def _data(fun, n=12):
+    rng = np.random.default_rng(0)
+    x = rng.uniform(1, 10, (n, 2))
+    u = np.exp(rng.normal(0, 0.15, n))
+    if fun == "cost":
+        return 2 * x[:, 0] ** 0.4 * x[:, 1] ** 0.7 * u, x
+    return 2 * x[:, 0] ** 0.4 * x[:, 1] ** 0.3 * u, x
+
+
+@pytest.mark.parametrize("fun, rts", [("prod", "vrs"), ("cost", "crs")])
+def test_cnlsmult_matches_nlp(qp, nlp, fun, rts):
+    y, x = _data(fun)
+
+    est = CNLSMULT.cnlsmult(y, x, fun, rts, solver=qp)
+
+    model = CNLS.cnls(y, x, "mult", fun, rts)
+    slv.solve(model, nlp, TIGHT)
+
+    assert bool(est['converged'])
+    assert np.isclose(float(est['objective']), value(model.objective), rtol=1e-5, atol=1e-8)
+
+
+def test_cqrmult_matches_nlp(qp, nlp):
+    y, x = _data("prod")
+
+    est = CNLSMULT.cqrmult(y, x, 0.5, "prod", "vrs", solver=qp)
+
+    model = CQER.cqr(y, x, 0.5, "mult", "prod", "vrs")
+    slv.solve(model, nlp, TIGHT)
+
+    assert bool(est['converged'])
+    assert np.isclose(float(est['objective']), value(model.objective), rtol=1e-5, atol=1e-8)
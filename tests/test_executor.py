@@ -0,0 +1,48 @@
+"""
+@Title   : socket executor: the same results as a serial run, also when a node is lost
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+from pystoned import DEADEC, executor
+import numpy as np
+import time
+
+
+def _slow(k):
+    time.sleep(0.02)
+    return k * k
+
+
+def test_socket_dea_matches_serial():
+    rng = np.random.default_rng(0)
+    x = rng.uniform(1, 10, (60, 2))
+    y = np.sqrt(x[:, 0] * x[:, 1]) * rng.uniform(0.6, 1.0, 60)
+
+    serial = DEADEC.dea(y, x, "io", "vrs")
+
+    with executor.local(2) as hosts:
+        with executor.get("socket", hosts=hosts) as pool:
+            remote = DEADEC.dea(y, x, "io", "vrs", workers=pool)
+
+    assert np.allclose(remote, serial, atol=1e-9)
+
+
+def test_socket_shutdown_runs_every_task():
+    with executor.local(2) as hosts:
+        pool = executor.get("socket", hosts=hosts)
+        futures = [pool.submit(_slow, k) for k in range(20)]
+        pool.shutdown(wait=True)
+
+    assert [f.result() for f in futures] == [k * k for k in range(20)]
+
+
+def test_socket_shutdown_cancels():
+    with executor.local(1) as hosts:
+        pool = executor.get("socket", hosts=hosts)
+        futures = [pool.submit(_slow, k) for k in range(20)]
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    assert all(f.done() for f in futures)
+    assert any(f.cancelled() for f in futures)
@@ -0,0 +1,40 @@
+"""
+@Title   : importing the package does not load its heavy dependencies
+@Author  : Sheng Dai, Timo Kuosmanen
+@Mail    : sheng.dai@aalto.fi (S. Dai); timo.kuosmanen@aalto.fi (T. Kuosmanen)
+@Date    : 2026-10-19
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODE = """
+import sys
+import pystoned
+print(" ".join(sorted(set(m.split(".")[0] for m in sys.modules))))
+"""
+
+
+def _modules(code):
+    # top-level modules loaded by code in a fresh interpreter
+
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+
+    return out.stdout.split()
+
+
+def test_import_is_light():
+    loaded = _modules(CODE)
+
+    for heavy in ("pyomo", "pandas", "matplotlib", "scipy", "sklearn"):
+        assert heavy not in loaded
+
+
+def test_submodule_on_first_access():
+    loaded = _modules(CODE.replace("import pystoned", "import pystoned\npystoned.CNLS"))
+
+    assert "pyomo" in loaded